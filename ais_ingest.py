@@ -0,0 +1,267 @@
+"""
+Akışlı Toplu AIS Yükleme
+========================
+Bölgesel AIS anlık görüntüleri 100 bin+ gemi ve yüzlerce MB JSON olabilir.
+json.load tüm belgeyi (her gemi için bir dict) bellekte kurar. Bu yükleyici
+dosyayı parça parça okur, "sample_vessels" dizisindeki gemileri okunan parça
+kadar bloklar halinde çözer ve alanları doğrudan sütunlara yazar:
+
+    mmsi (int64), lat, lon, length, width (float64), ship_type (int16 kod)
+
+Sütunlar array.array olarak büyür (eleman başına 8 bayt, Python nesnesi yok)
+ve sonunda kopyasız NumPy görünümüne dönüşür. Tepe bellek belgeyle değil,
+sütunlarla (gemi başına ~42 bayt) ve okuma parçasıyla orantılıdır.
+"""
+
+import json
+import re
+import time
+from array import array
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+VESSEL_KEY = 'sample_vessels'
+# create_sample_ais_data ile aynı eksik alan varsayılanları
+DEFAULTS = {'mmsi': 123456000, 'lat': 40.0, 'lon': 32.0, 'length': 100.0, 'width': 20.0}
+
+_DECODER = json.JSONDecoder()
+_NON_WHITESPACE = re.compile(r'\S')
+
+class _JSONStream:
+    """Parça parça okunan metin üzerinde JSON değerleri (raw_decode) ve yapı karakterleri"""
+    
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.blocks = True  # Blok çözme bir kez başarısız olursa (iç içe nesneler) tek tek çözülür
+    
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos > len(self.buffer) // 2:  # Tüketilmiş baş kısım atılır
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        self.buffer += chunk
+        return True
+    
+    def peek(self) -> str:
+        """Boşlukları atlayıp sıradaki karakter"""
+        while True:
+            match = _NON_WHITESPACE.search(self.buffer, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buffer[self.pos]
+            self.pos = len(self.buffer)
+            if not self._fill():
+                raise ValueError("Beklenmeyen dosya sonu")
+    
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"'{char}' bekleniyordu, '{self.buffer[self.pos]}' bulundu")
+        self.pos += 1
+    
+    def skip_comma(self):
+        if self.peek() == ',':
+            self.pos += 1
+    
+    def value(self):
+        """Sıradaki JSON değeri; parça sonunda yarım kalmışsa okumaya devam eder"""
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buffer, self.pos)
+                # Parçanın tam sonunda biten sayı yarım olabilir; dosya bitmediyse devamı okunur
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+    
+    def array_block(self) -> list:
+        """Tampondaki tam dizi elemanları tek json.loads ile; son '}' eleman sınırı değilse boş liste"""
+        last = self.buffer.rfind('}', self.pos)
+        if not self.blocks or last < 0:
+            return []
+        try:
+            # Başarılı çözüm, kesimin eleman sınırında olduğunu garanti eder
+            block = json.loads('[' + self.buffer[self.pos:last + 1] + ']')
+        except json.JSONDecodeError:
+            self.blocks = False
+            return []
+        self.pos = last + 1
+        return block
+
+def iter_vessel_blocks(json_path, key: str = VESSEL_KEY, chunk_size: int = 1 << 20) -> Iterator[list]:
+    """Üst seviye nesnedeki key dizisinin elemanlarını okunan parça kadar listeler halinde verir
+    (diğer alanlar çözülüp atılır)"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        stream = _JSONStream(f, chunk_size)
+        stream.expect('{')
+        while stream.peek() != '}':
+            name = stream.value()
+            stream.expect(':')
+            if name == key and stream.peek() == '[':
+                stream.pos += 1
+                while stream.peek() != ']':
+                    yield stream.array_block() or [stream.value()]
+                    stream.skip_comma()
+                stream.pos += 1
+            else:
+                stream.value()
+            stream.skip_comma()
+
+def iter_vessels(json_path, key: str = VESSEL_KEY, chunk_size: int = 1 << 20) -> Iterator[dict]:
+    """Dizinin elemanları tek tek (ilk elemanlar için dosyanın sadece başı okunur)"""
+    for block in iter_vessel_blocks(json_path, key, chunk_size):
+        yield from block
+
+class AISColumns:
+    """Gemi başına bir satır, alan başına bir NumPy sütunu"""
+    
+    def __init__(self, mmsi, lat, lon, length, width, ship_type, ship_type_names: List[str],
+                 names: Optional[List[str]] = None):
+        self.mmsi = mmsi
+        self.lat = lat
+        self.lon = lon
+        self.length = length
+        self.width = width
+        self.ship_type = ship_type  # ship_type_names indeksi; -1: belirtilmemiş
+        self.ship_type_names = ship_type_names
+        self.names = names  # Sadece names=True ile yüklenince
+    
+    def __len__(self):
+        return len(self.mmsi)
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in (self.mmsi, self.lat, self.lon, self.length, self.width, self.ship_type))
+    
+    def targets(self, count: Optional[int] = None) -> list:
+        """İlk count gemi için AISTarget listesi (eşleştiriciye nesne gerektiğinde)"""
+        from ais_matcher import AISTarget
+        
+        count = len(self) if count is None else min(count, len(self))
+        return [AISTarget(int(mmsi), lat, lon, length, width) for mmsi, lat, lon, length, width in
+                zip(self.mmsi[:count].tolist(), self.lat[:count].tolist(), self.lon[:count].tolist(),
+                    self.length[:count].tolist(), self.width[:count].tolist())]
+
+def load_ais_columns(json_path, names: bool = False, chunk_size: int = 1 << 20,
+                     defaults: Optional[dict] = None) -> AISColumns:
+    """AIS JSON dosyasını akışlı okuyup sütunlara yazar (names=True ise gemi adları da tutulur;
+    defaults: eksik alanlar için DEFAULTS üzerine yazılan değerler)"""
+    mmsi, lat, lon = array('q'), array('d'), array('d')
+    length, width, ship_type = array('d'), array('d'), array('h')
+    type_codes = {}
+    ship_names = [] if names else None
+    defaults = DEFAULTS if defaults is None else {**DEFAULTS, **defaults}
+    
+    for block in iter_vessel_blocks(json_path, chunk_size=chunk_size):
+        for vessel in block:
+            get = vessel.get
+            mmsi.append(int(get('mmsi', defaults['mmsi'])))
+            lat.append(get('lat', defaults['lat']))
+            lon.append(get('lon', defaults['lon']))
+            length.append(get('length', defaults['length']))
+            width.append(get('width', defaults['width']))
+            type_name = get('ship_type')
+            ship_type.append(-1 if type_name is None else type_codes.setdefault(type_name, len(type_codes)))
+            if ship_names is not None:
+                ship_names.append(get('ship_name', ''))
+    
+    # array.array tamponları kopyasız NumPy görünümü olur
+    columns = [np.frombuffer(column, dtype=dtype) if len(column) else np.zeros(0, dtype=dtype)
+               for column, dtype in ((mmsi, np.int64), (lat, np.float64), (lon, np.float64), (length, np.float64),
+                                     (width, np.float64), (ship_type, np.int16))]
+    return AISColumns(*columns, list(type_codes), ship_names)
+
+def write_synthetic_snapshot(json_path, num_vessels: int = 100000, seed: int = 0, center=(40.0, 32.0)):
+    """Ölçüm için bölgesel anlık görüntü biçiminde büyük AIS JSON dosyası (sample_ais.json ile aynı alanlar)"""
+    rng = np.random.default_rng(seed)
+    types = ['Cargo', 'Passenger', 'Container', 'Tanker', 'Fishing', 'Tug']
+    with open(json_path, 'w', encoding='utf-8') as f:
+        f.write('{\n  "sample_vessels": [\n')
+        for start in range(0, num_vessels, 10000):
+            count = min(10000, num_vessels - start)
+            lats = center[0] + rng.uniform(-1, 1, count)
+            lons = center[1] + rng.uniform(-1, 1, count)
+            lengths = rng.uniform(10, 350, count)
+            rows = [json.dumps({'mmsi': 200000000 + start + i, 'ship_name': f"VESSEL {start + i}",
+                                'lat': round(float(lats[i]), 6), 'lon': round(float(lons[i]), 6),
+                                'length': round(float(lengths[i]), 1), 'width': round(float(lengths[i]) / 6, 1),
+                                'ship_type': types[(start + i) % len(types)]}, indent=6)
+                    for i in range(count)]
+            f.write(',\n'.join(rows))
+            f.write(',\n' if start + count < num_vessels else '\n')
+        f.write('  ]\n}\n')
+
+def _measure_in_subprocess(mode: str, json_path: str, result_queue):
+    """Ayrı süreçte yükleme: süre ve tepe RSS (ru_maxrss) diğer ölçümlerden etkilenmez"""
+    import resource
+    
+    start = time.perf_counter()
+    count = 0
+    if mode == 'json.load':
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        vessels = [(v.get('mmsi'), v.get('lat'), v.get('lon'), v.get('length'), v.get('width'), v.get('ship_type'))
+                   for v in data.get(VESSEL_KEY, [])]
+        count = len(vessels)
+    elif mode == 'akışlı sütun':
+        count = len(load_ais_columns(json_path))
+    elapsed = time.perf_counter() - start
+    result_queue.put((count, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+def benchmark_ingest(num_vessels: int = 100000, json_path: Optional[str] = None):
+    """json.load + dict listesi ile akışlı sütun yükleme: süre, tepe RSS ve sütun/sonuç parite kontrolü"""
+    import multiprocessing as mp
+    import os
+    import tempfile
+    
+    tmp_dir = None
+    if json_path is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        json_path = os.path.join(tmp_dir.name, "snapshot.json")
+        write_synthetic_snapshot(json_path, num_vessels)
+    
+    try:
+        size_mb = os.path.getsize(json_path) / 1e6
+        context = mp.get_context('spawn')
+        print(f"📥 AIS yükleme: {json_path if tmp_dir is None else 'sentetik'} ({size_mb:.1f} MB)")
+        # taban: hiçbir şey yüklemeyen süreç (Python + NumPy RSS'i)
+        for mode in ('taban', 'json.load', 'akışlı sütun'):
+            result_queue = context.Queue()
+            process = context.Process(target=_measure_in_subprocess, args=(mode, json_path, result_queue))
+            process.start()
+            count, elapsed, peak_mb = result_queue.get()
+            process.join()
+            print(f"  {mode:<14} {count:>8} gemi  {elapsed:7.2f} s  tepe RSS {peak_mb:7.1f} MB")
+        
+        columns = load_ais_columns(json_path)
+        with open(json_path, 'r', encoding='utf-8') as f:
+            vessels = json.load(f).get(VESSEL_KEY, [])
+        same = (len(columns) == len(vessels)
+                and columns.mmsi.tolist() == [v.get('mmsi', DEFAULTS['mmsi']) for v in vessels]
+                and columns.lat.tolist() == [v.get('lat', DEFAULTS['lat']) for v in vessels]
+                and [columns.ship_type_names[c] if c >= 0 else None for c in columns.ship_type.tolist()]
+                == [v.get('ship_type') for v in vessels])
+        print(f"  {'✅' if same else '❌'} Sütunlar json.load ile {'aynı' if same else 'FARKLI'} "
+              f"(sütun belleği {columns.nbytes / 1e6:.1f} MB)")
+        return same
+    finally:
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+if __name__ == "__main__":
+    print("🚢 Akışlı AIS Yükleme")
+    print("=" * 40)
+    benchmark_ingest()
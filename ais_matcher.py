@@ -1,10 +1,14 @@
 import numpy as np
-import cv2
-import json
+import itertools
 import math
-from scipy.optimize import linear_sum_assignment
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+from ais_ingest import iter_vessels
+from assignment_solvers import get_solver
+from gating import GateContext, make_cascade
+from labelme_reader import read_labelme_boxes, read_labelme_directory
+from match_results import MatchResult
+from matching_engine import LinearScore, MatchingEngine, PixelSpace
 
 class AISTarget:
     """AIS hedef bilgileri"""
@@ -27,7 +31,7 @@ class DetectedShip:
 class AISMatcher:
     """Basit AIS-Kamera eşleştirici"""
     
-    def __init__(self, camera_params: dict = None):
+    def __init__(self, camera_params: dict = None, solver=None, gating=None):
         # Basit kamera parametreleri
         if camera_params is None:
             camera_params = {'fx': 1600, 'fy': 1600, 'cx': 960, 'cy': 540}
@@ -38,6 +42,13 @@ class AISMatcher:
         self.cy = camera_params['cy']
         
         self.max_distance = 2000  # Maksimum eşleştirme mesafesi (piksel) - artırıldı
+        self.min_score = 0.0  # Bu skorun altındaki çiftler eşleştirilmez (evaluation.py ile ayarlanır)
+        
+        # Atama çözücüsü: 'hungarian' (varsayılan), 'auction', 'greedy' veya AssignmentSolver nesnesi
+        self.solver = get_solver(solver)
+        
+        # Skorlamadan önce ucuz kapılar: None (kapalı), True (varsayılan kaskad) veya GatingCascade
+        self.gating = make_cascade(gating)
     
     def project_ais_to_pixel(self, ais_target: AISTarget, own_position: Tuple[float, float]) -> Optional[Tuple[float, float]]:
         """AIS hedefini piksel koordinatlarına projekte eder"""
@@ -85,46 +96,149 @@ class AISMatcher:
         
         return score * detection.confidence
     
-    def match_targets(self, ais_targets: List[AISTarget], detections: List[DetectedShip], own_position: Tuple[float, float]) -> List[tuple]:
-        """AIS hedefleri ile tespitleri eşleştirir"""
+    @property
+    def engine(self) -> MatchingEngine:
+        """Güncel kamera ve skor ayarlarıyla ortak eşleştirme motoru (ayarlar dışarıdan değiştirilebilir)"""
+        return MatchingEngine(PixelSpace(self.fx, self.cx, self.cy), LinearScore(self.max_distance, self.min_score),
+                              self.solver)
+    
+    def project_ais_arrays(self, lats, lons, own_position: Tuple[float, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """project_ais_to_pixel'in vektörel hali: piksel x dizisi ve geçerlilik maskesi"""
+        return self.polar_to_pixel(*self.ais_polar(lats, lons, own_position))
+    
+    def ais_polar(self, lats, lons, own_position: Tuple[float, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """AIS hedeflerinin menzili (metre) ve kerterizi (radyan)"""
+        own_lat, own_lon = own_position
+        return PixelSpace(self.fx, self.cx, self.cy).polar(lats, lons, own_lat, own_lon)
+    
+    def polar_to_pixel(self, distance_m: np.ndarray, bearing: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Menzil/kerterizden piksel x dizisi ve geçerlilik maskesi"""
+        return PixelSpace(self.fx, self.cx, self.cy).polar_to_pixel(distance_m, bearing)
+    
+    def match_targets(self, ais_targets: List[AISTarget], detections: List[DetectedShip], own_position: Tuple[float, float]) -> MatchResult:
+        """AIS hedefleri ile tespitleri eşleştirir (MatchResult; yinelenince (ais, tespit, güven) demetleri)"""
         if not ais_targets or not detections:
-            return []
+            return MatchResult(ais_targets=ais_targets, detections=detections)
         
         # AIS hedeflerini projekte et
-        projections = []
-        valid_ais = []
+        engine = self.engine
+        space = engine.space
+        lats = np.array([ais_target.lat for ais_target in ais_targets], dtype=float)
+        lons = np.array([ais_target.lon for ais_target in ais_targets], dtype=float)
+        distance_m, bearing = space.polar(lats, lons, *own_position)
+        pixel_x, valid = space.polar_to_pixel(distance_m, bearing)
         
-        for ais_target in ais_targets:
-            projection = self.project_ais_to_pixel(ais_target, own_position)
-            if projection is not None:
-                projections.append(projection)
-                valid_ais.append(ais_target)
+        if not valid.any():
+            return MatchResult(ais_targets=ais_targets, detections=detections)
         
-        if not projections:
-            return []
+        valid_index = np.flatnonzero(valid)
+        pixel_x = pixel_x[valid_index]
+        centers = np.array([detection.center for detection in detections], dtype=float)
+        confidences = np.array([detection.confidence for detection in detections], dtype=float)
         
-        # Maliyet matrisi
-        cost_matrix = np.full((len(valid_ais), len(detections)), np.inf)
+        # Kapılar açıksa sadece makul çiftler skorlanır; yoksa motor seyrek çözücülere
+        # aralık aramasıyla aday listesi, diğerlerine yoğun skor matrisi verir
+        pairs = None
+        if self.gating is not None:
+            targets = [ais_targets[i] for i in valid_index]
+            context = GateContext(self.fx, self.cx, bearing[valid_index], distance_m[valid_index],
+                                  [t.length for t in targets], [t.width for t in targets],
+                                  [detection.bbox for detection in detections])
+            pairs = self.gating.filter(context, (len(valid_index), len(detections)))
+        row_indices, col_indices, pixel_error, match_scores = engine.match(space.ais_points(pixel_x), centers,
+                                                                           confidences, pairs)
+        
+        ais_index = valid_index[row_indices]
+        world_error = space.lateral_error(distance_m[ais_index], pixel_x[row_indices], centers[col_indices, 0])
+        mmsi = np.fromiter((ais_targets[i].mmsi for i in ais_index.tolist()), dtype=np.int64, count=len(ais_index))
+        
+        return MatchResult.from_arrays(ais_index, col_indices, mmsi, pixel_error, world_error, match_scores,
+                                       ais_targets, detections)
+    
+    def match_targets_batch(self, detections_per_frame: List[List[DetectedShip]], ais_targets, own_positions,
+                            chunk_frames: int = 4096) -> List[MatchResult]:
+        """Çok kareyi birlikte eşleştirir; her kare için match_targets ile aynı MatchResult
+        
+        ais_targets: tüm karelerde ortak liste veya kare başına liste listesi.
+        own_positions: ortak (lat, lon) veya kare başına (lat, lon) dizisi.
+        Projeksiyon ve skorlama tüm karelerin birleştirilmiş dizileri üzerinde tek geçişte
+        yapılır; kare başına sadece atama çözülür (solver.solve_batch).
+        """
+        num_frames = len(detections_per_frame)
+        shared = not ais_targets or not isinstance(ais_targets[0], (list, tuple))
+        own = np.asarray(own_positions, dtype=float)
+        if own.ndim == 1:
+            own = np.broadcast_to(own, (num_frames, 2))
+        
+        # Kapılar kare başına bağlam kurar; bu durumda kare kare eşleştirilir
+        if self.gating is not None:
+            return [self.match_targets(ais_targets if shared else ais_targets[f], detections_per_frame[f],
+                                       (float(own[f, 0]), float(own[f, 1]))) for f in range(num_frames)]
+        
+        shared_columns = _ais_columns(ais_targets) if shared else None
+        results = []
+        for start in range(0, num_frames, chunk_frames):
+            stop = min(start + chunk_frames, num_frames)
+            frame_ais = [ais_targets] * (stop - start) if shared else ais_targets[start:stop]
+            if shared:
+                columns = tuple(np.tile(column, stop - start) for column in shared_columns)
+            else:
+                columns = _ais_columns([target for targets in frame_ais for target in targets])
+            results.extend(self._match_chunk(frame_ais, detections_per_frame[start:stop], own[start:stop], columns))
+        return results
+    
+    def _match_chunk(self, frame_ais, frame_detections, own: np.ndarray, columns) -> List[MatchResult]:
+        """match_targets_batch parçası: columns birleştirilmiş AIS (lat, lon, mmsi) dizileri"""
+        lats, lons, mmsi_all = columns
+        engine = self.engine
+        space = engine.space
+        num_frames = len(frame_detections)
+        ais_counts = np.array([len(targets) for targets in frame_ais], dtype=int)
+        det_counts = np.array([len(detections) for detections in frame_detections], dtype=int)
+        ais_start = np.cumsum(ais_counts) - ais_counts
+        det_start = np.cumsum(det_counts) - det_counts
+        ais_frame = np.repeat(np.arange(num_frames), ais_counts)
         
-        for i, (ais_target, projection) in enumerate(zip(valid_ais, projections)):
-            for j, detection in enumerate(detections):
-                score = self.calculate_match_score(ais_target, detection, projection)
-                cost_matrix[i, j] = 1 - score  # Hungarian minimizasyon yapar
+        # ais_polar/polar_to_pixel ile aynı işlemler (kosinüs kare başına math ile)
+        lat_scale = np.array([math.cos(math.radians(lat)) for lat in own[:, 0].tolist()])[ais_frame]
+        distance_m, bearing = space.polar(lats, lons, own[:, 0][ais_frame], own[:, 1][ais_frame], lat_scale)
+        pixel_x, valid = space.polar_to_pixel(distance_m, bearing)
+        valid_index = np.flatnonzero(valid)
+        pixel_x = pixel_x[valid_index]
         
-        # Optimal eşleştirme
-        row_indices, col_indices = linear_sum_assignment(cost_matrix)
+        # Geçerli AIS'ler kare içinde match_targets'taki satır sırasını alır
+        valid_frame = ais_frame[valid_index]
+        valid_counts = np.bincount(valid_frame, minlength=num_frames)
+        valid_start = np.cumsum(valid_counts) - valid_counts
         
-        # Sonuçları döndür
-        matches = []
-        for i, j in zip(row_indices, col_indices):
-            if cost_matrix[i, j] < 1.0:  # Geçerli eşleştirme
-                confidence = 1 - cost_matrix[i, j]
-                matches.append((valid_ais[i], detections[j], confidence))
+        centers = np.array([d.center for detections in frame_detections for d in detections], dtype=float).reshape(-1, 2)
+        confidences = np.array([d.confidence for detections in frame_detections for d in detections], dtype=float)
+        out_rows, out_cols, out_ptr, pixel_error, match_scores = engine.match_batch(
+            space.ais_points(pixel_x), centers, confidences, valid_counts, det_counts)
         
-        return matches
+        # Tüm parçanın sonuçları tek diziye, kareler bu dizinin dilimleri (kopyasız)
+        out_frame = np.repeat(np.arange(num_frames), np.diff(out_ptr))
+        matched = valid_start[out_frame] + out_rows
+        ais_global = valid_index[matched]
+        det_global = det_start[out_frame] + out_cols
+        world_error = space.lateral_error(distance_m[ais_global], pixel_x[matched], centers[det_global, 0])
+        
+        records = MatchResult.from_arrays(ais_global - ais_start[out_frame], out_cols, mmsi_all[ais_global],
+                                          pixel_error, world_error, match_scores).records
+        return [MatchResult(records[out_ptr[f]:out_ptr[f + 1]], frame_ais[f], frame_detections[f])
+                for f in range(num_frames)]
+
+def _ais_columns(ais_targets: List[AISTarget]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """AIS hedeflerinden lat, lon ve MMSI dizileri"""
+    lats = np.array([target.lat for target in ais_targets], dtype=float)
+    lons = np.array([target.lon for target in ais_targets], dtype=float)
+    mmsi = np.array([target.mmsi for target in ais_targets], dtype=np.int64)
+    return lats, lons, mmsi
 
 def load_yolo_annotations(txt_path, image_path):
     """YOLO formatından gemi tespitlerini yükler"""
+    import cv2  # OpenCV sadece görüntü okunurken yüklenir
+    
     ships = []
     
     # Görüntü boyutlarını al
@@ -162,23 +276,14 @@ def load_yolo_annotations(txt_path, image_path):
     return ships
 
 def load_labelme_annotations(json_path):
-    """LabelMe JSON'dan gemi tespitlerini yükler (eski format için)"""
-    with open(json_path, 'r') as f:
-        data = json.load(f)
-    
-    ships = []
-    for shape in data.get('shapes', []):
-        if shape['label'] == 'ship':
-            points = shape['points']
-            x_coords = [p[0] for p in points]
-            y_coords = [p[1] for p in points]
-            x_min, x_max = min(x_coords), max(x_coords)
-            y_min, y_max = min(y_coords), max(y_coords)
-            
-            bbox = (int(x_min), int(y_min), int(x_max - x_min), int(y_max - y_min))
-            ships.append(DetectedShip(bbox))
-    
-    return ships
+    """LabelMe JSON'dan gemi tespitlerini yükler (eski format için; imageData okunmaz)"""
+    boxes, _ = read_labelme_boxes(json_path)
+    return [DetectedShip(bbox) for bbox in boxes]
+
+def load_labelme_directory(json_dir, require_image: bool = True) -> Dict[str, List[DetectedShip]]:
+    """Klasördeki tüm LabelMe dosyaları: {dosya kökü: tespitler} (require_image: sadece .jpg'si olanlar)"""
+    return {stem: [DetectedShip(bbox) for bbox in boxes]
+            for stem, (boxes, _) in read_labelme_directory(json_dir, require_image=require_image).items()}
 
 def create_sample_ais_data(num_ships: int = 3, base_position: Tuple[float, float] = (40.0, 32.0)) -> List[AISTarget]:
     """JSON dosyasından örnek AIS verisi yükler"""
@@ -188,12 +293,8 @@ def create_sample_ais_data(num_ships: int = 3, base_position: Tuple[float, float
         # JSON dosyasından sabit AIS verilerini oku
         json_file = Path("data/sample_ais.json")  # data klasöründe
         if json_file.exists():
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # İstenen sayıda gemi seç
-            vessels = data.get('sample_vessels', [])
-            selected_vessels = vessels[:min(num_ships, len(vessels))]
+            # İstenen sayıda gemi seç; akışlı okuma büyük dosyanın sadece başını çözer
+            selected_vessels = list(itertools.islice(iter_vessels(json_file), num_ships))
             
             for vessel in selected_vessels:
                 ais_target = AISTarget(
@@ -232,6 +333,8 @@ def create_sample_ais_data(num_ships: int = 3, base_position: Tuple[float, float
 
 def visualize_matches(image: np.ndarray, matches: List[tuple]) -> np.ndarray:
     """Eşleştirme sonuçlarını görselleştirir"""
+    import cv2
+    
     result = image.copy()
     
     for ais_target, detection, confidence in matches:
@@ -254,85 +357,79 @@ def visualize_matches(image: np.ndarray, matches: List[tuple]) -> np.ndarray:
     
     return result
 
-def process_test_data(data_dir="data"):
-    """Test verilerini işler - YOLO formatı öncelikli"""
+def find_labelled_images(data_dir="data") -> Tuple[Optional[str], List[Tuple[Path, Path]]]:
+    """('yolo' | 'labelme', [(etiket dosyası, görüntü)]) - YOLO formatı öncelikli; veri yoksa (None, [])"""
     data_path = Path(data_dir)
     txt_path = data_path / "txt"
     json_path = data_path / "json"
-    matcher = AISMatcher()
+    
+    if txt_path.exists() and len(list(txt_path.glob("*.txt"))) > 0:
+        pairs = [(image_path.with_suffix('.txt'), image_path) for image_path in txt_path.glob("*.jpg")]
+        return 'yolo', [(label, image) for label, image in pairs if label.exists()]
+    if json_path.exists():
+        pairs = [(json_file, json_file.with_suffix('.jpg')) for json_file in json_path.glob("*.json")]
+        return 'labelme', [(label, image) for label, image in pairs if image.exists()]
+    return None, []
+
+def match_labelled_image(data_format: str, label_path, image_path, matcher: AISMatcher, own_position: Tuple[float, float]):
+    """Etiketlerden tespitleri yükler, örnek AIS verisiyle eşleştirir: (tespitler, eşleştirmeler)"""
+    if data_format == 'yolo':
+        detections = load_yolo_annotations(label_path, image_path)
+    else:
+        detections = load_labelme_annotations(label_path)
+    ais_targets = create_sample_ais_data(len(detections))
+    return detections, matcher.match_targets(ais_targets, detections, own_position)
+
+def summarize_matches(detections: List[DetectedShip], matches) -> dict:
+    """Görüntü sonucu (manifest önbelleği biçimi): gemi sayısı ve [mmsi, güven, x, y, w, h] listesi"""
+    return {'ships': len(detections),
+            'matches': [[int(ais.mmsi), float(confidence), *map(int, detection.bbox)] for ais, detection, confidence in matches]}
+
+def process_test_data(data_dir="data", match_store=None, gating=None, manifest=None):
+    """Test verilerini işler - YOLO formatı öncelikli (match_store: eşleştirmeleri MatchStore'a kaydeder,
+    gating: AISMatcher kademeli eleme ayarı, manifest: DatasetManifest ile sadece yeni/değişen görüntüler işlenir)"""
+    matcher = AISMatcher(gating=gating)
     own_position = (40.0, 32.0)
     
-    # Önce YOLO formatı var mı kontrol et
-    use_yolo = txt_path.exists() and len(list(txt_path.glob("*.txt"))) > 0
+    data_format, items = find_labelled_images(data_dir)
+    if data_format is None:
+        print("❌ Veri bulunamadı! data/txt/ veya data/json/ klasörlerini kontrol edin.")
+        return
+    print("YOLO formatı kullanılıyor (data/txt/)..." if data_format == 'yolo' else "LabelMe formatı kullanılıyor (data/json/)...")
+    if manifest is not None:
+        manifest.begin(matcher, data_format)
     
-    if use_yolo:
-        print("YOLO formatı kullanılıyor (data/txt/)...")
-        image_files = list(txt_path.glob("*.jpg"))
-        
-        total_ships = 0
-        total_matches = 0
-        
-        for image_path in image_files:
-            txt_file = image_path.with_suffix('.txt')
-            
-            if not txt_file.exists():
-                continue
-            
-            # YOLO formatından tespitleri yükle
-            detections = load_yolo_annotations(txt_file, image_path)
-            
-            # AIS verisi oluştur
-            ais_targets = create_sample_ais_data(len(detections))
-            
-            # Eşleştirme yap
-            matches = matcher.match_targets(ais_targets, detections, own_position)
-            
-            total_ships += len(detections)
-            total_matches += len(matches)
-            
-            print(f"{image_path.name}: {len(detections)} gemi, {len(matches)} eşleştirme")
-            
-            # İlk 3 eşleştirmeyi göster
-            for i, (ais, det, conf) in enumerate(matches[:3]):
-                print(f"  {i+1}. MMSI={ais.mmsi}, Güven={conf:.3f}")
+    total_ships = 0
+    total_matches = 0
     
-    elif json_path.exists():
-        print("LabelMe formatı kullanılıyor (data/json/)...")
-        json_files = list(json_path.glob("*.json"))
+    for label_path, image_path in items:
+        # Dosyalar değişmediyse önbellekteki sonuç kullanılır (eşleştirmeler önceki çalışmada depoya yazılmıştı)
+        result = manifest.lookup(label_path, image_path) if manifest is not None else None
+        if result is None:
+            detections, matches = match_labelled_image(data_format, label_path, image_path, matcher, own_position)
+            result = summarize_matches(detections, matches)
+            if manifest is not None:
+                manifest.update(label_path, image_path, result)
+            if match_store is not None:
+                match_store.add_matches(matches, camera=image_path.stem)
         
-        total_ships = 0
-        total_matches = 0
+        total_ships += result['ships']
+        total_matches += len(result['matches'])
+        print(f"{image_path.name}: {result['ships']} gemi, {len(result['matches'])} eşleştirme")
         
-        for json_file in json_files:
-            image_file = json_file.with_suffix('.jpg')
-            
-            if not image_file.exists():
-                continue
-            
-            # LabelMe formatından tespitleri yükle
-            detections = load_labelme_annotations(json_file)
-            
-            # AIS verisi oluştur
-            ais_targets = create_sample_ais_data(len(detections))
-            
-            # Eşleştirme yap
-            matches = matcher.match_targets(ais_targets, detections, own_position)
-            
-            total_ships += len(detections)
-            total_matches += len(matches)
-            
-            print(f"{image_file.name}: {len(detections)} gemi, {len(matches)} eşleştirme")
-            
-            # İlk 3 eşleştirmeyi göster
-            for i, (ais, det, conf) in enumerate(matches[:3]):
-                print(f"  {i+1}. MMSI={ais.mmsi}, Güven={conf:.3f}")
+        # İlk 3 eşleştirmeyi göster
+        for i, (mmsi, conf, *_) in enumerate(result['matches'][:3]):
+            print(f"  {i+1}. MMSI={mmsi}, Güven={conf:.3f}")
     
-    else:
-        print("❌ Veri bulunamadı! data/txt/ veya data/json/ klasörlerini kontrol edin.")
-        return
+    if manifest is not None:
+        manifest.prune([label_path for label_path, _ in items])
+        manifest.save()
+        print(f"📒 Manifest: {manifest.report()}")
     
     print(f"\nToplam: {total_ships} gemi, {total_matches} eşleştirme")
     print(f"Başarı oranı: {total_matches/total_ships*100:.1f}%" if total_ships > 0 else "Başarı oranı: 0%")
+    if matcher.gating is not None:
+        print(f"Kademeli eleme: {matcher.gating.report()}")
 
 if __name__ == "__main__":
     print("🚢 AIS-Kamera Eşleştirme - Basit Versiyon")
@@ -0,0 +1,612 @@
+"""
+Atama Çözücüleri
+================
+AIS-tespit eşleştirmesi için takılabilir atama çözücüleri.
+
+Tüm çözücüler aynı problemi çözer: seyrek aday listesi (satır, sütun, fayda)
+üzerinde toplam faydayı maksimize eden eşleştirme. Faydası pozitif olmayan
+çiftler aday sayılmaz, eşleşmeyen satır/sütun serbest kalır.
+"""
+
+import time
+from typing import Tuple
+
+import numpy as np
+
+class AssignmentSolver:
+    """Atama çözücüleri için ortak arayüz"""
+    
+    name = 'base'
+    sparse = False  # True ise matcher yoğun matris yerine aday listesi üretir
+    
+    def solve(self, rows, cols, benefits, shape: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Aday çiftler üzerinde toplam faydayı maksimize eden eşleştirme (satıra göre sıralı)"""
+        raise NotImplementedError
+    
+    def solve_dense(self, benefit_matrix) -> Tuple[np.ndarray, np.ndarray]:
+        """Yoğun fayda matrisi üzerinde eşleştirme"""
+        benefit_matrix = np.asarray(benefit_matrix, dtype=float)
+        rows, cols = np.nonzero(benefit_matrix > 0)
+        return self.solve(rows, cols, benefit_matrix[rows, cols], benefit_matrix.shape)
+    
+    def solve_costs(self, cost_matrix) -> Tuple[np.ndarray, np.ndarray]:
+        """Tam maliyet matrisinde en düşük maliyetli tam atama (sonsuz: yasak çift, eşleşmeme seçeneği yok)"""
+        raise NotImplementedError(f"{self.name} çözücüsü tam maliyet matrisini desteklemiyor")
+    
+    def solve_batch(self, edge_ptr, rows, cols, benefits, shapes) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Bağımsız çok sayıda problem: k. problemin adayları edge_ptr[k]:edge_ptr[k+1] aralığında
+        
+        Birleştirilmiş satır/sütun sonuçları ve aynı biçimde sonuç sınırları döndürülür.
+        """
+        out_rows, out_cols = [], []
+        counts = np.zeros(len(shapes), dtype=int)
+        for k in np.flatnonzero(np.diff(edge_ptr)).tolist():
+            start, stop = edge_ptr[k], edge_ptr[k + 1]
+            problem_rows, problem_cols = self.solve(rows[start:stop], cols[start:stop], benefits[start:stop], shapes[k])
+            out_rows.append(problem_rows)
+            out_cols.append(problem_cols)
+            counts[k] = len(problem_rows)
+        return _concat_assignments(out_rows, out_cols, counts)
+
+def _concat_assignments(out_rows, out_cols, counts):
+    out_ptr = np.concatenate(([0], np.cumsum(counts)))
+    if not out_rows:
+        return np.array([], dtype=int), np.array([], dtype=int), out_ptr
+    return np.concatenate(out_rows).astype(int), np.concatenate(out_cols).astype(int), out_ptr
+
+def _empty_assignment():
+    return np.array([], dtype=int), np.array([], dtype=int)
+
+def _prepare_edges(rows, cols, benefits):
+    """Aday listesini dizilere çevirir ve faydası pozitif olmayanları atar"""
+    rows = np.asarray(rows, dtype=int).ravel()
+    cols = np.asarray(cols, dtype=int).ravel()
+    benefits = np.asarray(benefits, dtype=float).ravel()
+    keep = benefits > 0
+    return rows[keep], cols[keep], benefits[keep]
+
+class HungarianSolver(AssignmentSolver):
+    """scipy linear_sum_assignment ile kesin çözüm"""
+    
+    name = 'hungarian'
+    
+    def solve(self, rows, cols, benefits, shape):
+        from scipy.optimize import linear_sum_assignment
+        
+        rows, cols, benefits = _prepare_edges(rows, cols, benefits)
+        if len(benefits) == 0:
+            return _empty_assignment()
+        
+        # Sadece adayı olan satır/sütunlardan küçültülmüş yoğun matris kur
+        unique_rows, row_pos = np.unique(rows, return_inverse=True)
+        unique_cols, col_pos = np.unique(cols, return_inverse=True)
+        
+        cost_matrix = np.zeros((len(unique_rows), len(unique_cols)))
+        cost_matrix[row_pos, col_pos] = -benefits  # Aday olmayan çift 0 maliyet = eşleşmeme
+        
+        row_indices, col_indices = linear_sum_assignment(cost_matrix)
+        valid = cost_matrix[row_indices, col_indices] < 0
+        
+        return unique_rows[row_indices[valid]], unique_cols[col_indices[valid]]
+    
+    def solve_costs(self, cost_matrix):
+        """Tüm matris üzerinde linear_sum_assignment; tam atama yoksa ValueError"""
+        from scipy.optimize import linear_sum_assignment
+        
+        return linear_sum_assignment(cost_matrix)
+    
+    def solve_batch(self, edge_ptr, rows, cols, benefits, shapes, small_cells: int = 1024):
+        """Küçük problemler dolgulu tek bir 3B maliyet dizisinde hazırlanır, döngüde sadece
+        linear_sum_assignment çağrılır; büyük problemler solve ile çözülür"""
+        from scipy.optimize import linear_sum_assignment
+        
+        shapes = np.asarray(shapes, dtype=int).reshape(-1, 2)
+        problem = np.repeat(np.arange(len(shapes)), np.diff(edge_ptr))
+        keep = np.asarray(benefits) > 0
+        problem, rows, cols, benefits = problem[keep], np.asarray(rows)[keep], np.asarray(cols)[keep], np.asarray(benefits, dtype=float)[keep]
+        has_edges = np.bincount(problem, minlength=len(shapes)) > 0
+        small = has_edges & (shapes[:, 0] * shapes[:, 1] <= small_cells)
+        
+        parts = []  # (problem, satır, sütun) parçaları
+        for k in np.flatnonzero(has_edges & ~small).tolist():
+            mask = problem == k
+            problem_rows, problem_cols = self.solve(rows[mask], cols[mask], benefits[mask], tuple(shapes[k]))
+            parts.append((np.full(len(problem_rows), k), problem_rows, problem_cols))
+        
+        small_index = np.flatnonzero(small)
+        if len(small_index):
+            position = np.full(len(shapes), -1)
+            position[small_index] = np.arange(len(small_index))
+            mask = small[problem]
+            n_rows, n_cols = shapes[small_index].max(axis=0)
+            cost = np.zeros((len(small_index), n_rows, n_cols))
+            cost[position[problem[mask]], rows[mask], cols[mask]] = -benefits[mask]
+            
+            # solve'daki küçültülmüş matris: adayı olan satır/sütunlar artan sırada başa alınır
+            negative = cost < 0
+            row_order = np.argsort(~negative.any(axis=2), axis=1, kind='stable')
+            col_order = np.argsort(~negative.any(axis=1), axis=1, kind='stable')
+            used_rows = negative.any(axis=2).sum(axis=1).tolist()
+            used_cols = negative.any(axis=1).sum(axis=1).tolist()
+            cost = np.take_along_axis(cost, row_order[:, :, None], axis=1)
+            cost = np.take_along_axis(cost, col_order[:, None, :], axis=2)
+            
+            row_parts, col_parts, lengths = [], [], []
+            for b in range(len(small_index)):
+                row_indices, col_indices = linear_sum_assignment(cost[b, :used_rows[b], :used_cols[b]])
+                row_parts.append(row_indices)
+                col_parts.append(col_indices)
+                lengths.append(len(row_indices))
+            block = np.repeat(np.arange(len(small_index)), lengths)
+            row_indices, col_indices = np.concatenate(row_parts), np.concatenate(col_parts)
+            valid = cost[block, row_indices, col_indices] < 0
+            block, row_indices, col_indices = block[valid], row_indices[valid], col_indices[valid]
+            parts.append((small_index[block], row_order[block, row_indices], col_order[block, col_indices]))
+        
+        if not parts:
+            return np.array([], dtype=int), np.array([], dtype=int), np.zeros(len(shapes) + 1, dtype=int)
+        out_problem = np.concatenate([part[0] for part in parts])
+        order = np.argsort(out_problem, kind='stable')  # Problem içinde satır sırası korunur
+        out_rows = np.concatenate([part[1] for part in parts]).astype(int)[order]
+        out_cols = np.concatenate([part[2] for part in parts]).astype(int)[order]
+        out_ptr = np.concatenate(([0], np.cumsum(np.bincount(out_problem, minlength=len(shapes)))))
+        return out_rows, out_cols, out_ptr
+
+class GreedySolver(AssignmentSolver):
+    """En yüksek faydalı çiftten başlayan açgözlü eşleştirme"""
+    
+    name = 'greedy'
+    sparse = True
+    
+    def solve(self, rows, cols, benefits, shape):
+        rows, cols, benefits = _prepare_edges(rows, cols, benefits)
+        if len(benefits) == 0:
+            return _empty_assignment()
+        
+        used_rows = np.zeros(shape[0], dtype=bool)
+        used_cols = np.zeros(shape[1], dtype=bool)
+        out_rows, out_cols = [], []
+        
+        for k in np.argsort(-benefits, kind='stable'):
+            i, j = rows[k], cols[k]
+            if used_rows[i] or used_cols[j]:
+                continue
+            used_rows[i] = used_cols[j] = True
+            out_rows.append(i)
+            out_cols.append(j)
+        
+        order = np.argsort(out_rows)
+        return np.array(out_rows, dtype=int)[order], np.array(out_cols, dtype=int)[order]
+    
+    def solve_batch(self, edge_ptr, rows, cols, benefits, shapes):
+        """Tüm problemler tek açgözlü geçişte: satır/sütunlar problem başına kaydırıldığı için problemler
+        birbirini etkilemez; kararlı sıralama her problemde solve ile aynı sırayı verir"""
+        shapes = np.asarray(shapes, dtype=int).reshape(-1, 2)
+        problem = np.repeat(np.arange(len(shapes)), np.diff(edge_ptr))
+        keep = np.asarray(benefits) > 0
+        problem, rows, cols, benefits = problem[keep], np.asarray(rows)[keep], np.asarray(cols)[keep], np.asarray(benefits, dtype=float)[keep]
+        
+        row_offset = np.cumsum(shapes[:, 0]) - shapes[:, 0]
+        col_offset = np.cumsum(shapes[:, 1]) - shapes[:, 1]
+        used_rows = bytearray(int(shapes[:, 0].sum()))
+        used_cols = bytearray(int(shapes[:, 1].sum()))
+        order = np.argsort(-benefits, kind='stable')
+        global_rows = (rows + row_offset[problem])[order].tolist()
+        global_cols = (cols + col_offset[problem])[order].tolist()
+        
+        chosen = []
+        for k, (i, j) in enumerate(zip(global_rows, global_cols)):
+            if used_rows[i] or used_cols[j]:
+                continue
+            used_rows[i] = used_cols[j] = 1
+            chosen.append(k)
+        
+        chosen = order[np.array(chosen, dtype=int)]
+        out_problem, out_rows, out_cols = problem[chosen], rows[chosen].astype(int), cols[chosen].astype(int)
+        order = np.lexsort((out_rows, out_problem))
+        out_ptr = np.concatenate(([0], np.cumsum(np.bincount(out_problem, minlength=len(shapes)))))
+        return out_rows[order], out_cols[order], out_ptr
+
+class NearestSolver(AssignmentSolver):
+    """Satır sırasıyla, her satıra en yüksek faydalı boş sütun (en yakın komşu; optimal değil)
+    
+    Eşit faydalarda küçük sütun indeksi seçilir.
+    """
+    
+    name = 'nearest'
+    sparse = True
+    
+    def solve(self, rows, cols, benefits, shape):
+        rows, cols, benefits = _prepare_edges(rows, cols, benefits)
+        if len(benefits) == 0:
+            return _empty_assignment()
+        
+        used_rows = np.zeros(shape[0], dtype=bool)
+        used_cols = np.zeros(shape[1], dtype=bool)
+        out_rows, out_cols = [], []
+        
+        # Satır içinde azalan fayda, eşitlikte artan sütun sırası
+        order = np.lexsort((cols, -benefits, rows))
+        for i, j in zip(rows[order].tolist(), cols[order].tolist()):
+            if used_rows[i] or used_cols[j]:
+                continue
+            used_rows[i] = used_cols[j] = True
+            out_rows.append(i)
+            out_cols.append(j)
+        
+        return np.array(out_rows, dtype=int), np.array(out_cols, dtype=int)
+
+def _top_k_per_group(groups, benefits, k):
+    """Her grupta en yüksek faydalı k adayın maskesi"""
+    order = np.lexsort((-benefits, groups))
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.concatenate(([True], sorted_groups[1:] != sorted_groups[:-1])))
+    rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.concatenate((starts, [len(order)]))))
+    keep = np.zeros(len(order), dtype=bool)
+    keep[order[rank < k]] = True
+    return keep
+
+def _prune_candidates(rows, cols, benefits):
+    """Optimumu değiştirmeden aday listesini küçültür
+    
+    En fazla k = min(satır, sütun) çift eşleşebildiği için her sütunun (ve
+    satırın) en iyi k adayı dışındaki çiftler hiçbir optimal çözümde gerekmez.
+    """
+    k = min(len(np.unique(rows)), len(np.unique(cols)))
+    keep = _top_k_per_group(cols, benefits, k)
+    rows, cols, benefits = rows[keep], cols[keep], benefits[keep]
+    keep = _top_k_per_group(rows, benefits, k)
+    return rows[keep], cols[keep], benefits[keep]
+
+def _segment_edges(indptr, persons):
+    """Verilen kişilerin CSR kenar indekslerini ve segment başlangıçlarını döndürür"""
+    starts = indptr[persons]
+    lengths = indptr[persons + 1] - starts
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    edge_ids = np.arange(lengths.sum()) - np.repeat(offsets - starts, lengths)
+    return edge_ids, offsets, lengths
+
+class AuctionSolver(AssignmentSolver):
+    """Epsilon ölçeklemeli, NumPy ile vektörize (Jacobi) auction algoritması
+    
+    Seyrek aday listesi doğrudan kullanılır. Küçük taraf (çoğunlukla tespitler)
+    teklif verir, büyük taraf (AIS satırları) nesnedir; her teklifçinin
+    eşleşmeme seçeneği için kendine ait sıfır faydalı yapay nesnesi vardır.
+    Binlerce satır / az sütunlu problemlerde satırlar teklif vermez, sadece
+    fiyatlanır. Her faz önceki fazın atamasıyla başlar ve dualite farkı
+    toleransa indiğinde ölçekleme durur. Sonuç toplam faydası optimumdan en
+    fazla epsilon * max(fayda) kadar uzaktır.
+    """
+    
+    name = 'auction'
+    sparse = True
+    
+    def __init__(self, epsilon: float = 1e-6, scaling: float = 5.0, max_rounds: int = 1000000):
+        self.epsilon = epsilon  # Göreli hata payı (en büyük faydaya göre)
+        self.scaling = scaling  # Her fazda epsilon'un bölündüğü katsayı
+        self.max_rounds = max_rounds
+        self.last_rounds = 0  # Son çözümdeki toplam teklif turu (ileri + geri)
+    
+    def _build_graph(self, person_pos, object_pos, benefits, n_persons, n_objects):
+        """Teklifçi kenarları (CSR): gerçek adaylar + her teklifçinin kendi yapay nesnesi [n_objects, ...)"""
+        real_persons = np.arange(n_persons)
+        persons = np.concatenate((person_pos, real_persons))
+        objects = np.concatenate((object_pos, n_objects + real_persons))
+        values = np.concatenate((benefits, np.zeros(n_persons)))
+        
+        order = np.argsort(persons, kind='stable')
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(persons, minlength=n_persons))))
+        return indptr, objects[order], values[order]
+    
+    def _run_phase(self, person_edge, obj_owner, edge_obj, edge_val, indptr, prices, eps):
+        """Tek epsilon fazı: tüm teklifçiler atanana kadar ileri teklif turları (yerinde güncellenir)"""
+        person_obj = np.where(person_edge >= 0, edge_obj[np.maximum(person_edge, 0)], -1)
+        
+        while True:
+            free = np.flatnonzero(person_obj < 0)
+            if len(free) == 0:
+                return
+            
+            self.last_rounds += 1
+            if self.last_rounds > self.max_rounds:
+                raise RuntimeError("Auction algoritması tur sınırını aştı")
+            
+            # Atanmamış kişilerin kenarları üzerinde en iyi ve ikinci en iyi değer
+            edge_ids, offsets, lengths = _segment_edges(indptr, free)
+            values = edge_val[edge_ids] - prices[edge_obj[edge_ids]]
+            
+            best = np.maximum.reduceat(values, offsets)
+            owner_seg = np.repeat(np.arange(len(free)), lengths)
+            is_best = values == best[owner_seg]
+            
+            positions = np.arange(len(values))
+            best_pos = np.minimum.reduceat(np.where(is_best, positions, len(values)), offsets)
+            
+            values[best_pos] = -np.inf
+            second = np.maximum.reduceat(values, offsets)
+            
+            best_edge = edge_ids[best_pos]
+            best_obj = edge_obj[best_edge]
+            bids = prices[best_obj] + (best - second) + eps
+            
+            # Her nesne için en yüksek teklifi veren kazanır
+            order = np.lexsort((-bids, best_obj))
+            winner_objs, first = np.unique(best_obj[order], return_index=True)
+            winners = free[order[first]]
+            
+            previous = obj_owner[winner_objs]
+            person_obj[previous[previous >= 0]] = -1
+            person_edge[previous[previous >= 0]] = -1
+            
+            obj_owner[winner_objs] = winners
+            person_obj[winners] = winner_objs
+            person_edge[winners] = best_edge[order[first]]
+            prices[winner_objs] = bids[order[first]]
+    
+    def _release_prices(self, person_edge, obj_owner, edge_obj, edge_val, edge_person, obj_indptr, obj_edges,
+                        prices, eps):
+        """Geri auction: önceki fazlardan fiyatı kalmış boş nesneler ya bir teklifçiyi kendine çeker
+        ya da fiyatı en düşük fiyata iner (eşleşmemiş nesnenin fiyatlı kalması optimumu bozar)"""
+        floor = prices.min()
+        stack = np.flatnonzero((obj_owner < 0) & (prices > floor)).tolist()
+        while stack:
+            obj = stack.pop()
+            self.last_rounds += 1
+            if self.last_rounds > self.max_rounds:
+                raise RuntimeError("Auction algoritması tur sınırını aştı")
+            
+            edges = obj_edges[obj_indptr[obj]:obj_indptr[obj + 1]]
+            persons = edge_person[edges]
+            assigned = person_edge[persons]
+            gains = edge_val[edges] - (edge_val[assigned] - prices[edge_obj[assigned]])
+            best = int(np.argmax(gains))
+            best_gain = gains[best]
+            gains[best] = -np.inf
+            second = gains.max() if len(gains) > 1 else -np.inf
+            if best_gain - eps <= floor:
+                prices[obj] = floor
+                continue
+            
+            # Nesne fiyatını düşürüp en çok kazanan teklifçiyi alır; onun eski nesnesi boşalır
+            prices[obj] = max(floor, second - eps)
+            person = persons[best]
+            old = edge_obj[person_edge[person]]
+            obj_owner[old] = -1
+            obj_owner[obj] = person
+            person_edge[person] = edges[best]
+            if prices[old] > floor:
+                stack.append(old)
+    
+    def solve(self, rows, cols, benefits, shape):
+        rows, cols, benefits = _prepare_edges(rows, cols, benefits)
+        if len(benefits) == 0:
+            return _empty_assignment()
+        rows, cols, benefits = _prune_candidates(rows, cols, benefits)
+        
+        # Aday listesinde geçmeyen satır/sütunlar problemden çıkarılır
+        unique_rows, row_pos = np.unique(rows, return_inverse=True)
+        unique_cols, col_pos = np.unique(cols, return_inverse=True)
+        n_rows, n_cols = len(unique_rows), len(unique_cols)
+        
+        # Küçük taraf teklif verir
+        transposed = n_rows < n_cols
+        person_pos, object_pos = (row_pos, col_pos) if transposed else (col_pos, row_pos)
+        n_persons, n_objects = (n_rows, n_cols) if transposed else (n_cols, n_rows)
+        indptr, edge_obj, edge_val = self._build_graph(person_pos, object_pos, benefits, n_persons, n_objects)
+        edge_person = np.repeat(np.arange(n_persons), np.diff(indptr))
+        obj_edges = np.argsort(edge_obj, kind='stable')
+        obj_indptr = np.concatenate(([0], np.cumsum(np.bincount(edge_obj, minlength=n_objects + n_persons))))
+        
+        max_benefit = benefits.max()
+        tolerance = self.epsilon * max_benefit  # Toplam faydada izin verilen en büyük kayıp
+        final_eps = tolerance / n_persons  # Teklifçi başına eps: toplam hata <= epsilon * max
+        eps = max(max_benefit / 2.0, final_eps)
+        
+        prices = np.zeros(n_objects + n_persons)
+        person_edge = np.full(n_persons, -1)  # Teklifçinin atandığı kenar
+        obj_owner = np.full(n_objects + n_persons, -1)
+        self.last_rounds = 0
+        
+        while True:
+            self._run_phase(person_edge, obj_owner, edge_obj, edge_val, indptr, prices, eps)
+            self._release_prices(person_edge, obj_owner, edge_obj, edge_val, edge_person, obj_indptr, obj_edges,
+                                 prices, eps)
+            
+            # Dualite farkı: teklifçilerin kâr kaybı toplamı optimumdan uzaklığın üst sınırıdır
+            # (en fazla teklifçi sayısı * eps, çoğu zaman çok daha küçük); tolerans içindeyse dur
+            values = edge_val - prices[edge_obj]
+            slack = np.maximum.reduceat(values, indptr[:-1]) - values[person_edge]
+            if eps <= final_eps or slack.sum() <= tolerance:
+                break
+            eps = max(eps / self.scaling, final_eps)
+            
+            # Sonraki faz önceki atamayla başlar; sadece yeni eps ile eps-tamamlayıcı gevşeklik
+            # koşulunu bozan teklifçiler serbest kalır
+            released = np.flatnonzero(slack > eps)
+            obj_owner[edge_obj[person_edge[released]]] = -1
+            person_edge[released] = -1
+        
+        # Gerçek eşleşmeleri (yapay nesne dışındakiler) satır/sütun indeksine çevir
+        assigned = edge_obj[person_edge]
+        real = assigned < n_objects
+        persons, objects = np.flatnonzero(real), assigned[real]
+        if transposed:
+            return unique_rows[persons], unique_cols[objects]
+        return unique_rows[objects], unique_cols[persons]
+
+SOLVERS = {
+    'hungarian': HungarianSolver,
+    'auction': AuctionSolver,
+    'greedy': GreedySolver,
+    'nearest': NearestSolver,
+}
+
+def get_solver(solver=None) -> AssignmentSolver:
+    """İsim veya nesneden çözücü örneği döndürür (varsayılan: hungarian)"""
+    if solver is None:
+        return HungarianSolver()
+    if isinstance(solver, AssignmentSolver):
+        return solver
+    if solver not in SOLVERS:
+        raise ValueError(f"Bilinmeyen çözücü: {solver} (seçenekler: {', '.join(SOLVERS)})")
+    return SOLVERS[solver]()
+
+def _random_sparse_problem(rng, n_rows, n_cols, candidates_per_col):
+    """Her sütun için rastgele aday satırlar içeren seyrek problem"""
+    k = min(candidates_per_col, n_rows)
+    rows = np.concatenate([rng.choice(n_rows, k, replace=False) for _ in range(n_cols)])
+    cols = np.repeat(np.arange(n_cols), k)
+    benefits = rng.uniform(0.01, 1.0, len(rows))
+    return rows, cols, benefits
+
+def _total_benefit(rows, cols, benefits, out_rows, out_cols, shape):
+    """Verilen eşleştirmenin toplam faydası"""
+    lookup = np.zeros(shape)
+    lookup[rows, cols] = benefits
+    return lookup[out_rows, out_cols].sum()
+
+def test_solver_parity(num_problems: int = 100, seed: int = 0):
+    """Auction ve greedy çözücülerini scipy Hungarian ile karşılaştırır"""
+    rng = np.random.default_rng(seed)
+    hungarian = HungarianSolver()
+    auction = AuctionSolver()
+    greedy = GreedySolver()
+    
+    failures = 0
+    for _ in range(num_problems):
+        n_rows, n_cols = rng.integers(1, 60, 2)
+        rows, cols, benefits = _random_sparse_problem(rng, n_rows, n_cols, int(rng.integers(1, 8)))
+        # Bazı problemlerde eşit faydalar (bağlar) olsun
+        if rng.random() < 0.3:
+            benefits = np.round(benefits, 1) + 0.1
+        shape = (n_rows, n_cols)
+        
+        optimum = _total_benefit(rows, cols, benefits, *hungarian.solve(rows, cols, benefits, shape), shape)
+        auction_rows, auction_cols = auction.solve(rows, cols, benefits, shape)
+        auction_total = _total_benefit(rows, cols, benefits, auction_rows, auction_cols, shape)
+        greedy_total = _total_benefit(rows, cols, benefits, *greedy.solve(rows, cols, benefits, shape), shape)
+        
+        tolerance = auction.epsilon * benefits.max() + 1e-9
+        valid = len(set(auction_rows)) == len(auction_rows) and len(set(auction_cols)) == len(auction_cols)
+        if not valid or abs(auction_total - optimum) > tolerance or greedy_total > optimum + 1e-9:
+            failures += 1
+    
+    print(f"Çözücü paritesi: {num_problems} problem, {failures} hata")
+    return failures == 0
+
+def benchmark_solvers(ais_counts=(1000, 5000, 10000), detection_counts=(5, 20), candidates_per_detection: int = 30, seed: int = 0):
+    """Çok satırlı / az sütunlu dikdörtgen problemlerde çözücü süreleri"""
+    from scipy.optimize import linear_sum_assignment
+    
+    rng = np.random.default_rng(seed)
+    auction = AuctionSolver()
+    
+    print(f"{'AIS':>7} {'Tespit':>7} {'Yoğun LSA (ms)':>15} {'Auction (ms)':>13} {'Tur':>6} {'Fark':>10}")
+    for n_ais in ais_counts:
+        for n_det in detection_counts:
+            rows, cols, benefits = _random_sparse_problem(rng, n_ais, n_det, candidates_per_detection)
+            
+            # Mevcut yoğun yol: tam maliyet matrisi + linear_sum_assignment
+            start = time.perf_counter()
+            cost_matrix = np.ones((n_ais, n_det))
+            cost_matrix[rows, cols] = 1 - benefits
+            dense_rows, dense_cols = linear_sum_assignment(cost_matrix)
+            dense_time = (time.perf_counter() - start) * 1000
+            dense_total = (1 - cost_matrix[dense_rows, dense_cols]).sum()
+            
+            start = time.perf_counter()
+            auction_rows, auction_cols = auction.solve(rows, cols, benefits, (n_ais, n_det))
+            auction_time = (time.perf_counter() - start) * 1000
+            auction_total = _total_benefit(rows, cols, benefits, auction_rows, auction_cols, (n_ais, n_det))
+            
+            print(f"{n_ais:>7} {n_det:>7} {dense_time:>15.2f} {auction_time:>13.2f} {auction.last_rounds:>6} {dense_total - auction_total:>10.2e}")
+
+def benchmark_matcher(ais_counts=(2000, 10000, 50000), num_detections: int = 8, max_distance: float = 40.0, seed: int = 0):
+    """AISMatcher.match_targets uçtan uca: yoğun Hungarian ve seyrek auction yolu"""
+    from ais_matcher import AISMatcher, AISTarget, DetectedShip
+    
+    rng = np.random.default_rng(seed)
+    own_position = (40.0, 32.0)
+    
+    print(f"{'AIS':>7} {'Tespit':>7} {'Hungarian (ms)':>15} {'Auction (ms)':>13} {'Eşleşme':>8}")
+    for n_ais in ais_counts:
+        # Kameranın önündeki (kuzey) yarım düzlemde rastgele hedefler
+        ais_targets = [AISTarget(100000 + i, 40.0 + rng.uniform(0.005, 0.05), 32.0 + rng.uniform(-0.03, 0.03), 100.0, 20.0)
+                       for i in range(n_ais)]
+        detections = [DetectedShip((int(rng.integers(0, 1900)), int(rng.integers(500, 560)), 40, 20), 0.9)
+                      for _ in range(num_detections)]
+        
+        timings = []
+        for solver in ('hungarian', 'auction'):
+            matcher = AISMatcher(solver=solver)
+            matcher.max_distance = max_distance
+            matcher.match_targets(ais_targets[:10], detections, own_position)  # Isınma (lazy import)
+            start = time.perf_counter()
+            matches = matcher.match_targets(ais_targets, detections, own_position)
+            timings.append((time.perf_counter() - start) * 1000)
+        
+        print(f"{n_ais:>7} {num_detections:>7} {timings[0]:>15.2f} {timings[1]:>13.2f} {len(matches):>8}")
+
+def _random_frames(rng, num_frames, ais_per_frame, detections_per_frame):
+    """Küçük karelerden oluşan rastgele çok kareli veri: (kare başına AIS, tespitler, konumlar)"""
+    from ais_matcher import AISTarget, DetectedShip
+    
+    ais = [[AISTarget(200000000 + i, 40.0 + rng.uniform(0.002, 0.03), 32.0 + rng.uniform(-0.02, 0.02), 100.0, 20.0)
+            for i in range(ais_per_frame)] for _ in range(num_frames)]
+    detections = [[DetectedShip((int(rng.integers(0, 1800)), int(rng.integers(400, 650)), 60, 30), float(rng.uniform(0.3, 1.0)))
+                   for _ in range(detections_per_frame)] for _ in range(num_frames)]
+    own_positions = np.column_stack((40.0 + rng.uniform(-0.002, 0.002, num_frames), np.full(num_frames, 32.0)))
+    return ais, detections, own_positions
+
+def test_batch_parity(num_frames: int = 500, seed: int = 0) -> bool:
+    """match_targets_batch her karede match_targets ile birebir aynı kayıtları verir"""
+    from ais_matcher import AISMatcher
+    
+    rng = np.random.default_rng(seed)
+    ais, detections, own_positions = _random_frames(rng, num_frames, 8, 6)
+    failures = 0
+    for solver in SOLVERS:
+        matcher = AISMatcher(solver=solver)
+        batch = matcher.match_targets_batch(detections, ais, own_positions)
+        for f in range(num_frames):
+            single = matcher.match_targets(ais[f], detections[f], tuple(own_positions[f]))
+            failures += not np.array_equal(single.records, batch[f].records)
+    ok = failures == 0
+    print(f"{'✅' if ok else '❌'} Toplu/tek kare eşleştirme uyumu: {len(SOLVERS) * num_frames - failures}/{len(SOLVERS) * num_frames}")
+    return ok
+
+def benchmark_batch(num_frames: int = 10000, ais_per_frame: int = 5, detections_per_frame: int = 5, seed: int = 0,
+                    solvers=('hungarian', 'greedy')):
+    """Çok sayıda küçük karede kare kare match_targets ile match_targets_batch
+    (auction küçük problemlerde çözücü süresine takılır, varsayılan listede yok)"""
+    from ais_matcher import AISMatcher
+    
+    rng = np.random.default_rng(seed)
+    ais, detections, own_positions = _random_frames(rng, num_frames, ais_per_frame, detections_per_frame)
+    own_list = [tuple(position) for position in own_positions.tolist()]
+    
+    print(f"📦 {num_frames} kare ({ais_per_frame} AIS x {detections_per_frame} tespit)")
+    for solver in solvers:
+        matcher = AISMatcher(solver=solver)
+        matcher.match_targets_batch(detections[:10], ais[:10], own_positions[:10])  # Isınma (SciPy yüklemesi)
+        start = time.perf_counter()
+        for f in range(num_frames):
+            matcher.match_targets(ais[f], detections[f], own_list[f])
+        single = time.perf_counter() - start
+        start = time.perf_counter()
+        matcher.match_targets_batch(detections, ais, own_positions)
+        batch = time.perf_counter() - start
+        print(f"  {solver:<10} kare kare {single / num_frames * 1e6:7.1f} µs/kare, toplu {batch / num_frames * 1e6:7.1f} µs/kare "
+              f"(x{single / batch:.1f})")
+
+if __name__ == "__main__":
+    print("🧮 Atama Çözücüleri")
+    print("=" * 40)
+    test_solver_parity()
+    print()
+    benchmark_solvers()
+    print()
+    benchmark_matcher()
+    print()
+    test_batch_parity()
+    benchmark_batch()
@@ -0,0 +1,182 @@
+"""
+Artımlı Veri Seti İşleme
+========================
+process_test_data her çalışmada tüm etiketli görüntüleri yeniden işler. Bu
+manifest her (etiket, görüntü) çifti için dosya boyutu, mtime, içerik özeti
+(BLAKE2b) ve görüntünün sonucunu (gemi sayısı, eşleştirmeler) tutar:
+
+- boyut ve mtime değişmemişse dosya okunmaz, önbellekteki sonuç kullanılır
+- mtime değişip içerik aynıysa (touch, git checkout) özet tutar, yine önbellek
+- yeni veya içeriği değişen dosyalar işlenir, silinenler manifestten çıkar
+- eşleştirici ayarları (kamera, max_distance, min_score, çözücü, kapılar) veya
+  sample_ais.json değişirse tüm önbellek geçersiz olur
+
+watch_dataset klasörü belirli aralıklarla yoklar ve yeni gelen dosyaları
+geldikçe işler; yoklama sadece os.stat ile yapılır.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+MANIFEST_VERSION = 1
+DEFAULT_MANIFEST = ".analyze_manifest.json"
+
+def file_digest(path, chunk_size: int = 1 << 20) -> str:
+    """Dosya içeriğinin BLAKE2b özeti"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def matcher_signature(matcher, data_format: str, ais_path="data/sample_ais.json") -> dict:
+    """Sonuçları etkileyen ayarlar; değişirse önbellek geçersiz olur"""
+    gates = [] if matcher.gating is None else [[type(gate).__name__, vars(gate)] for gate in matcher.gating.gates]
+    return {
+        'format': data_format,
+        'camera': [matcher.fx, matcher.fy, matcher.cx, matcher.cy],
+        'max_distance': matcher.max_distance,
+        'min_score': matcher.min_score,
+        'solver': type(matcher.solver).__name__,
+        'gating': json.loads(json.dumps(gates, default=float)),
+        'ais': file_digest(ais_path) if Path(ais_path).exists() else None,
+    }
+
+class DatasetManifest:
+    """Dosya parmak izleri ve görüntü başına önbelleklenmiş sonuçlar (JSON dosyası)"""
+    
+    def __init__(self, path, root="data"):
+        self.path = Path(path)
+        self.root = Path(root)
+        self.config = None
+        self.entries = {}  # etiket yolu -> {'label', 'image': parmak izi, 'result': sonuç}
+        self._pending = {}  # lookup'ta hesaplanan parmak izleri (update tekrar okumasın)
+        self.hashed = 0  # Bu çalışmada içeriği okunan dosya
+        self.reused = 0
+        self.processed = 0
+        self.removed = 0
+        
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Manifest okunamadı, baştan oluşturulacak ({e})")
+                data = {}
+            if data.get('version') == MANIFEST_VERSION:
+                self.config = data.get('config')
+                self.entries = data.get('entries', {})
+    
+    def _key(self, path) -> str:
+        path = Path(path)
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return path.as_posix()
+    
+    def begin(self, matcher, data_format: str):
+        """Ayarlar öncekinden farklıysa tüm önbelleği temizler"""
+        config = matcher_signature(matcher, data_format)
+        if self.config is not None and config != self.config and self.entries:
+            print(f"♻️ Eşleştirici ayarları veya AIS verisi değişti, {len(self.entries)} önbellek kaydı geçersiz")
+            self.entries = {}
+        self.config = config
+    
+    def _fingerprint(self, path, cached: Optional[dict]) -> dict:
+        stat = os.stat(path)
+        if cached is not None and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            return cached
+        self.hashed += 1
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': file_digest(path)}
+    
+    def lookup(self, label_path, image_path) -> Optional[dict]:
+        """Dosyalar değişmediyse önbellekteki sonuç, yoksa None"""
+        key = self._key(label_path)
+        entry = self.entries.get(key)
+        label = self._fingerprint(label_path, entry and entry['label'])
+        image = self._fingerprint(image_path, entry and entry['image'])
+        if entry is not None and entry['label']['hash'] == label['hash'] and entry['image']['hash'] == image['hash']:
+            entry['label'], entry['image'] = label, image  # mtime güncellenir, sonraki çalışmada okunmaz
+            self.reused += 1
+            return entry['result']
+        self._pending[key] = (label, image)
+        return None
+    
+    def update(self, label_path, image_path, result: dict):
+        key = self._key(label_path)
+        label, image = self._pending.pop(key, None) or (self._fingerprint(label_path, None),
+                                                        self._fingerprint(image_path, None))
+        self.entries[key] = {'label': label, 'image': image, 'result': result}
+        self.processed += 1
+    
+    def prune(self, label_paths):
+        """Listede olmayan (silinmiş) dosyaların kayıtlarını çıkarır"""
+        keep = {self._key(path) for path in label_paths}
+        for key in [key for key in self.entries if key not in keep]:
+            del self.entries[key]
+            self.removed += 1
+    
+    def save(self):
+        """Geçici dosyaya yazıp yerine taşır (yarım yazılmış manifest kalmaz)"""
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'config': self.config, 'entries': self.entries}, f,
+                      separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+    
+    def report(self) -> str:
+        return (f"{self.reused} önbellekten, {self.processed} yeniden işlendi, {self.removed} silindi "
+                f"({self.hashed} dosya okundu)")
+
+def watch_dataset(data_dir="data", manifest_path=None, interval: float = 2.0, settle: float = 1.0, gating=None,
+                  match_store=None, max_polls: Optional[int] = None):
+    """Klasörü yoklar, yeni veya değişen görüntüleri geldikçe işler (Ctrl+C ile durur);
+    settle: son değişikliğinden bu kadar saniye geçmemiş dosya henüz yazılıyor sayılır"""
+    from ais_matcher import AISMatcher, find_labelled_images, match_labelled_image, summarize_matches
+    
+    manifest = DatasetManifest(manifest_path or Path(data_dir) / DEFAULT_MANIFEST, data_dir)
+    matcher = AISMatcher(gating=gating)
+    own_position = (40.0, 32.0)
+    print(f"👀 {data_dir} izleniyor ({interval:g} s aralıkla, Ctrl+C ile çıkış)...")
+    
+    polls = 0
+    try:
+        while max_polls is None or polls < max_polls:
+            data_format, items = find_labelled_images(data_dir)
+            if data_format is not None:
+                manifest.begin(matcher, data_format)
+            now = time.time()
+            changed = False
+            for label_path, image_path in items:
+                if now - max(os.path.getmtime(label_path), os.path.getmtime(image_path)) < settle:
+                    continue
+                if manifest.lookup(label_path, image_path) is not None:
+                    continue
+                detections, matches = match_labelled_image(data_format, label_path, image_path, matcher, own_position)
+                result = summarize_matches(detections, matches)
+                manifest.update(label_path, image_path, result)
+                if match_store is not None:
+                    match_store.add_matches(matches, camera=image_path.stem)
+                print(f"🆕 {image_path.name}: {result['ships']} gemi, {len(result['matches'])} eşleştirme")
+                changed = True
+            
+            removed = manifest.removed
+            manifest.prune([label_path for label_path, _ in items])
+            if changed or manifest.removed != removed:
+                manifest.save()
+            polls += 1
+            if max_polls is None or polls < max_polls:
+                time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    
+    manifest.save()
+    ships = sum(entry['result']['ships'] for entry in manifest.entries.values())
+    matched = sum(len(entry['result']['matches']) for entry in manifest.entries.values())
+    print(f"\nİzleme bitti: {manifest.report()}")
+    print(f"Toplam: {ships} gemi, {matched} eşleştirme ({len(manifest.entries)} görüntü)")
+    return manifest
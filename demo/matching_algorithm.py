@@ -3,16 +3,34 @@ AIS-Kamera Eşleştirme Algoritması
 ================================
 """
 
+import importlib.util
 import math
+import sys
+from pathlib import Path
 from typing import List, Tuple
 
-# Hungarian algoritması için
+# Vektörel hesaplamalar için
 try:
     import numpy as np
-    from scipy.optimize import linear_sum_assignment
-    HUNGARIAN_AVAILABLE = True
+    NUMPY_AVAILABLE = True
 except ImportError:
-    HUNGARIAN_AVAILABLE = False
+    NUMPY_AVAILABLE = False
+
+# Hungarian algoritması için (scipy ilk kullanımda yüklenir; KD-tree aramasını motor seçer)
+HUNGARIAN_AVAILABLE = NUMPY_AVAILABLE and importlib.util.find_spec('scipy') is not None
+
+# Ortak eşleştirme motoru ve atama çözücüleri (ana dizindeki matching_engine.py ve
+# assignment_solvers.py, sadece NumPy gerektirir; ana dizin içe aktarandan gelir).
+# Ana dizin yoksa demo kendi başına çalışır: yerel en yakın komşu ve scipy Hungarian
+if __name__ == "__main__":
+    # Doğrudan çalıştırmada ana dizin yola eklenir
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+try:
+    from assignment_solvers import HungarianSolver, NearestSolver, get_solver
+    from matching_engine import DistanceCost, MatchingEngine, PlanarSpace, distance_matrix
+    SOLVERS_AVAILABLE = True
+except ImportError:
+    SOLVERS_AVAILABLE = False
 
 class AISPoint:
     """AIS nokta verisi"""
@@ -42,8 +60,12 @@ class Match:
 class MatchingAlgorithm:
     """Core eslestirme algoritması"""
     
-    def __init__(self, max_distance: float = 5.0):
+    def __init__(self, max_distance: float = 5.0, solver=None):
         self.max_distance = max_distance
+        # Atama çözücüsü: None ise method parametresi belirler ('auction', 'greedy', ...)
+        if solver is not None and not SOLVERS_AVAILABLE:
+            raise ImportError("Takılabilir çözücüler için ana dizindeki assignment_solvers.py gerekli")
+        self.solver = get_solver(solver) if solver is not None else None
     
     def calculate_distance(self, p1: Tuple[float, float], p2: Tuple[float, float]) -> float:
         """Oklid mesafesi"""
@@ -90,51 +112,138 @@ class MatchingAlgorithm:
         
         return matches
     
+    def engine(self, solver) -> "MatchingEngine":
+        """Harita düzleminde, menzil içi toplam mesafeyi en aza indiren ortak motor"""
+        return MatchingEngine(PlanarSpace(), DistanceCost(self.max_distance), solver)
+    
+    def distance_matrix(self, ais_xy, det_xy):
+        """Tüm AIS-tespit çiftleri için mesafe matrisi (N x M)"""
+        if SOLVERS_AVAILABLE:
+            return distance_matrix(ais_xy, det_xy)
+        ais_xy = np.asarray(ais_xy, dtype=float).reshape(-1, 2)
+        det_xy = np.asarray(det_xy, dtype=float).reshape(-1, 2)
+        return np.sqrt((det_xy[None, :, 0] - ais_xy[:, None, 0])**2 + (det_xy[None, :, 1] - ais_xy[:, None, 1])**2)
+    
+    def confidences(self, distances) -> "np.ndarray":
+        """calculate_confidence'ın dizi sürümü"""
+        distances = np.asarray(distances, dtype=float)
+        return np.where(distances >= self.max_distance, 0.0, np.clip(1.0 - distances / self.max_distance, 0.0, 1.0))
+    
+    def nearest_assignment(self, ais_xy, det_xy):
+        """Açgözlü en yakın komşu ataması (satır, sütun, mesafe dizileri)"""
+        if SOLVERS_AVAILABLE:
+            rows, cols, distances, _ = self.engine(NearestSolver()).match(ais_xy, det_xy)
+            return rows, cols, distances
+        
+        # Yerel sürüm: simple_nearest_matching gibi satır sırasıyla en yakın boş tespit
+        distances = self.distance_matrix(ais_xy, det_xy)
+        cost = np.where(distances > self.max_distance, np.inf, distances)
+        rows, cols = [], []
+        for i, row in enumerate(cost):
+            if not len(row):
+                break
+            j = int(np.argmin(row))
+            if np.isfinite(row[j]):
+                rows.append(i)
+                cols.append(j)
+                cost[:, j] = np.inf  # Tespit kullanıldı
+        rows, cols = np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)
+        return rows, cols, distances[rows, cols]
+    
+    def hungarian_assignment(self, ais_xy, det_xy):
+        """Menzil dışı çiftleri sonsuz maliyetli tam matris ile Hungarian ataması (satır, sütun, mesafe dizileri)
+        
+        Menzil içinde tam atama yoksa scipy ValueError verir.
+        """
+        if SOLVERS_AVAILABLE:
+            rows, cols, distances, _ = self.engine(HungarianSolver()).match(ais_xy, det_xy)
+            return rows, cols, distances
+        
+        from scipy.optimize import linear_sum_assignment
+        cost = self.distance_matrix(ais_xy, det_xy)
+        cost[cost > self.max_distance] = np.inf
+        rows, cols = linear_sum_assignment(cost)
+        valid = np.isfinite(cost[rows, cols])
+        return rows[valid], cols[valid], cost[rows[valid], cols[valid]]
+    
+    def solver_assignment(self, ais_xy, det_xy, solver=None):
+        """Takılabilir çözücü ile atama (satır, sütun, mesafe dizileri)"""
+        if not SOLVERS_AVAILABLE:
+            raise ImportError("Takılabilir çözücüler için ana dizindeki assignment_solvers.py gerekli")
+        rows, cols, distances, _ = self.engine(solver or self.solver or NearestSolver()).match(ais_xy, det_xy)
+        return rows, cols, distances
+    
+    def match_arrays(self, ais_xy, det_xy, method: str = 'hungarian'):
+        """Nokta dizileri üzerinde eşleştirme (satır, sütun, mesafe, güven dizileri)"""
+        ais_xy = np.asarray(ais_xy, dtype=float).reshape(-1, 2)
+        det_xy = np.asarray(det_xy, dtype=float).reshape(-1, 2)
+        
+        if not len(ais_xy) or not len(det_xy):
+            rows, cols, distances = self.nearest_assignment(ais_xy, det_xy)
+        elif SOLVERS_AVAILABLE and (self.solver is not None or method in ('auction', 'greedy')):
+            rows, cols, distances = self.solver_assignment(ais_xy, det_xy, None if self.solver else get_solver(method))
+        elif method == 'hungarian' and HUNGARIAN_AVAILABLE:
+            try:
+                rows, cols, distances = self.hungarian_assignment(ais_xy, det_xy)
+            except ValueError:
+                # Tam atama mümkün değilse en yakın komşuya dön
+                rows, cols, distances = self.nearest_assignment(ais_xy, det_xy)
+        else:
+            rows, cols, distances = self.nearest_assignment(ais_xy, det_xy)
+        
+        return rows, cols, distances, self.confidences(distances)
+    
+    def _build_matches(self, ais_points, detection_points, rows, cols, distances) -> List[Match]:
+        """İndeks dizilerinden Match listesi oluştur"""
+        matches = []
+        for i, j, distance in zip(rows, cols, distances):
+            distance = float(distance)
+            confidence = self.calculate_confidence(distance)
+            matches.append(Match(ais_points[i], detection_points[j], distance, confidence))
+        return matches
+    
+    def kdtree_nearest_matching(self, ais_points: List[AISPoint], detection_points: List[DetectionPoint]) -> List[Match]:
+        """KD-tree destekli en yakın komşu eşleştirmesi (simple_nearest_matching ile aynı sonuç)"""
+        if not SOLVERS_AVAILABLE or not ais_points or not detection_points:
+            return self.simple_nearest_matching(ais_points, detection_points)
+        
+        rows, cols, distances = self.nearest_assignment(points_to_array(ais_points), points_to_array(detection_points))
+        return self._build_matches(ais_points, detection_points, rows, cols, distances)
+    
     def hungarian_matching(self, ais_points: List[AISPoint], detection_points: List[DetectionPoint]) -> List[Match]:
         """Hungarian algoritması ile optimal eşleştirme"""
         if not HUNGARIAN_AVAILABLE or not ais_points or not detection_points:
             return self.simple_nearest_matching(ais_points, detection_points)
         
-        # Maliyet matrisi oluştur
-        n_ais = len(ais_points)
-        n_det = len(detection_points)
-        
-        cost_matrix = np.full((n_ais, n_det), np.inf)
-        
-        for i, ais_point in enumerate(ais_points):
-            for j, det_point in enumerate(detection_points):
-                distance = self.calculate_distance(
-                    (ais_point.x, ais_point.y),
-                    (det_point.x, det_point.y)
-                )
-                
-                if distance <= self.max_distance:
-                    cost_matrix[i, j] = distance
-        
-        # Hungarian algoritması
+        # Maliyet matrisi vektörel olarak oluşturulur
         try:
-            row_indices, col_indices = linear_sum_assignment(cost_matrix)
-            
-            matches = []
-            for i, j in zip(row_indices, col_indices):
-                if cost_matrix[i, j] < np.inf:
-                    distance = cost_matrix[i, j]
-                    confidence = self.calculate_confidence(distance)
-                    
-                    match = Match(ais_points[i], detection_points[j], distance, confidence)
-                    matches.append(match)
-            
-            return matches
+            rows, cols, distances = self.hungarian_assignment(points_to_array(ais_points), points_to_array(detection_points))
+            return self._build_matches(ais_points, detection_points, rows, cols, distances)
             
-        except Exception:
-            return self.simple_nearest_matching(ais_points, detection_points)
-
+        except ValueError:
+            # Tam atama mümkün değilse en yakın komşuya dön
+            return self.kdtree_nearest_matching(ais_points, detection_points)
+    
+    def solver_matching(self, ais_points: List[AISPoint], detection_points: List[DetectionPoint], solver=None) -> List[Match]:
+        """Takılabilir çözücü (varsayılan: en yakın komşu) ile eşleştirme"""
+        if not ais_points or not detection_points:
+            return []
+        
+        rows, cols, distances = self.solver_assignment(points_to_array(ais_points), points_to_array(detection_points), solver)
+        return self._build_matches(ais_points, detection_points, rows, cols, distances)
+    
     def match(self, ais_points: List[AISPoint], detection_points: List[DetectionPoint], method: str = 'hungarian') -> List[Match]:
         """Ana eşleştirme fonksiyonu"""
-        if method == 'hungarian' and HUNGARIAN_AVAILABLE:
+        if SOLVERS_AVAILABLE and (self.solver is not None or method in ('auction', 'greedy')):
+            return self.solver_matching(ais_points, detection_points, None if self.solver else get_solver(method))
+        elif method == 'hungarian' and HUNGARIAN_AVAILABLE:
             return self.hungarian_matching(ais_points, detection_points)
         else:
-            return self.simple_nearest_matching(ais_points, detection_points)
+            return self.kdtree_nearest_matching(ais_points, detection_points)
+
+def points_to_array(points) -> "np.ndarray":
+    """AISPoint/DetectionPoint listesini (N, 2) diziye çevir"""
+    return np.array([(p.x, p.y) for p in points], dtype=float).reshape(-1, 2)
 
 def test_matching():
     """Test fonksiyonu - visual_map_demo ile aynı veriyi kullan"""
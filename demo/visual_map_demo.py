@@ -4,51 +4,50 @@ Görsel Harita Demo
 Matplotlib ile gerçek harita görselleştirme
 """
 
-import json
 import math
+import sys
+import time
 from pathlib import Path
 import os
 
-# Matplotlib backend'ini ayarla
-import matplotlib
-matplotlib.use('TkAgg')  # Veya 'Qt5Agg' dene
-import matplotlib.pyplot as plt
 import numpy as np
 
+if __name__ == "__main__":
+    # Doğrudan çalıştırmada ana dizindeki modüller (ortak motor, ais_ingest) için
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
 # Matching algorithm'ı import et
-from matching_algorithm import MatchingAlgorithm, AISPoint, DetectionPoint
+from matching_algorithm import MatchingAlgorithm
 
-# Türkçe font desteği için
-plt.rcParams['font.size'] = 10
-plt.rcParams['axes.unicode_minus'] = False
+def get_pyplot(backend='TkAgg'):
+    """Matplotlib'i ilk çizimde yükle (backend: 'TkAgg', 'Qt5Agg' veya penceresiz 'Agg')"""
+    import matplotlib
+    if backend and 'matplotlib.pyplot' not in sys.modules:
+        matplotlib.use(backend)
+    import matplotlib.pyplot as plt
+    
+    # Türkçe font desteği için
+    plt.rcParams['font.size'] = 10
+    plt.rcParams['axes.unicode_minus'] = False
+    return plt
 
 def load_ais_data(json_path):
-    """AIS verilerini yükle"""
-    points = []
+    """AIS verilerini yükle (akışlı sütun okuma, koordinat dönüşümü tüm gemilere tek seferde)"""
+    from ais_ingest import load_ais_columns
     
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # Eksik alanlar demonun eski varsayılanlarıyla doldurulur (ais_ingest.DEFAULTS değil)
+        columns = load_ais_columns(json_path, names=True, defaults={'mmsi': 0, 'lat': 0.0, 'lon': 0.0})
         
         reference_lat, reference_lon = 40.0, 32.0
         
-        for vessel in data.get('sample_vessels', []):
-            lat = vessel.get('lat', 0.0)
-            lon = vessel.get('lon', 0.0)
-            
-            # Koordinat dönüşümü
-            x = (lon - reference_lon) * 111000 * math.cos(math.radians(reference_lat)) / 1000
-            y = (lat - reference_lat) * 111000 / 1000
-            
-            point = {
-                'x': x, 'y': y,
-                'mmsi': vessel.get('mmsi', 0),
-                'name': vessel.get('ship_name', ''),
-                'lat': lat, 'lon': lon
-            }
-            points.append(point)
+        # Koordinat dönüşümü
+        xs = (columns.lon - reference_lon) * 111000 * math.cos(math.radians(reference_lat)) / 1000
+        ys = (columns.lat - reference_lat) * 111000 / 1000
         
-        return points
+        return [{'x': x, 'y': y, 'mmsi': mmsi, 'name': name, 'lat': lat, 'lon': lon}
+                for x, y, mmsi, name, lat, lon in zip(xs.tolist(), ys.tolist(), columns.mmsi.tolist(), columns.names,
+                                                      columns.lat.tolist(), columns.lon.tolist())]
         
     except Exception as e:
         print(f"❌ AIS verisi yüklenirken hata: {e}")
@@ -201,57 +200,50 @@ def calculate_matching(ais_points, detection_points, max_distance=8.0):
     if not ais_points or not detection_points:
         return []
     
-    # AIS verilerini MatchingAlgorithm formatına çevir
-    ais_algorithm_points = []
-    for ais in ais_points:
-        ais_point = AISPoint(
-            name=ais['name'],
-            mmsi=str(ais['mmsi']),
-            lat=ais['lat'],
-            lon=ais['lon'],
-            x=ais['x'],
-            y=ais['y']
-        )
-        ais_algorithm_points.append(ais_point)
-    
-    # Detection verilerini MatchingAlgorithm formatına çevir  
-    det_algorithm_points = []
-    for i, det in enumerate(detection_points):
-        det_point = DetectionPoint(
-            id=f"Detection_{i}",
-            x=det['x'],
-            y=det['y']
-        )
-        det_algorithm_points.append(det_point)
+    # Noktaları doğrudan (N, 2) dizilere çevir, ara nesne oluşturma
+    ais_xy = np.array([(ais['x'], ais['y']) for ais in ais_points], dtype=float)
+    det_xy = np.array([(det['x'], det['y']) for det in detection_points], dtype=float)
     
     # MatchingAlgorithm kullanarak eşleştir
     matcher = MatchingAlgorithm(max_distance=max_distance)
-    matches_algorithm = matcher.match(ais_algorithm_points, det_algorithm_points, method='hungarian')
+    rows, cols, distances, confidences = matcher.match_arrays(ais_xy, det_xy, method='hungarian')
     
     # Sonuçları visual_map formatına çevir
     matches = []
-    for match in matches_algorithm:
+    for i, j, distance, confidence in zip(rows, cols, distances, confidences):
+        ais = ais_points[i]
+        det = detection_points[j]
         match_dict = {
             'ais': {
-                'name': match.ais_point.name,
-                'mmsi': match.ais_point.mmsi,
-                'x': match.ais_point.x,
-                'y': match.ais_point.y
+                'name': ais['name'],
+                'mmsi': str(ais['mmsi']),
+                'x': ais['x'],
+                'y': ais['y']
             },
             'detection': {
-                'id': match.detection_point.id,
-                'x': match.detection_point.x,
-                'y': match.detection_point.y
+                'id': f"Detection_{j}",
+                'x': det['x'],
+                'y': det['y']
             },
-            'distance': match.distance,
-            'confidence': match.confidence
+            'distance': float(distance),
+            'confidence': float(confidence)
         }
         matches.append(match_dict)
     
     return matches
 
-def create_visual_map(ais_points, detection_points, matches, image_name="default"):
+def match_line_style(confidence):
+    """Eşleştirme çizgisinin rengi, kalınlığı ve saydamlığı (güvene göre)"""
+    if confidence > 0.8:
+        return 'green', 3, 0.9
+    elif confidence > 0.6:
+        return 'orange', 2, 0.8
+    else:
+        return 'red', 1, 0.7
+
+def create_visual_map(ais_points, detection_points, matches, image_name="default", show=True, output_dir="."):
     """Görsel harita oluştur"""
+    plt = get_pyplot('TkAgg' if show else 'Agg')
     
     # Figure boyutunu ayarla
     plt.figure(figsize=(16, 12))
@@ -314,18 +306,7 @@ def create_visual_map(ais_points, detection_points, matches, image_name="default
     if matches:
         for i, match in enumerate(matches):
             # Çizgi rengi güvene göre
-            if match['confidence'] > 0.8:
-                line_color = 'green'
-                line_width = 3
-                alpha = 0.9
-            elif match['confidence'] > 0.6:
-                line_color = 'orange'
-                line_width = 2
-                alpha = 0.8
-            else:
-                line_color = 'red'
-                line_width = 1
-                alpha = 0.7
+            line_color, line_width, alpha = match_line_style(match['confidence'])
             
             ax_main.plot([match['ais']['x'], match['detection']['x']], 
                         [match['ais']['y'], match['detection']['y']], 
@@ -368,9 +349,197 @@ def create_visual_map(ais_points, detection_points, matches, image_name="default
     plt.tight_layout()
     
     # Kaydet - görüntü adını dosya adına ekle
-    output_file = f"visual_map_{image_name}.png"
+    output_file = Path(output_dir) / f"visual_map_{image_name}.png"
     plt.savefig(output_file, dpi=300, bbox_inches='tight', facecolor='white')
-    plt.show()
+    if show:
+        plt.show()
+    else:
+        plt.close()
+
+class MapRenderer:
+    """Tek figürü ve sanatçılarını (artist) yeniden kullanan penceresiz harita çizici
+    
+    create_visual_map ile aynı düzeni bir kez kurar; her görüntüde sadece
+    scatter konumları, çizgi verileri ve etiket metinleri güncellenir.
+    """
+    
+    def __init__(self, dpi=150, fmt='png', output_dir="."):
+        self.plt = get_pyplot('Agg')
+        self.dpi = dpi
+        self.fmt = fmt
+        self.output_dir = Path(output_dir)
+        
+        self.fig = self.plt.figure(figsize=(16, 12))
+        self.ax_main = self.plt.subplot2grid((2, 2), (0, 0), colspan=2, fig=self.fig)
+        self.ax_ais = self.plt.subplot2grid((2, 2), (1, 0), fig=self.fig)
+        self.ax_det = self.plt.subplot2grid((2, 2), (1, 1), fig=self.fig)
+        
+        self.ax_main.set_title('🗺️ AIS-Kamera Eşleştirme Haritası', fontsize=16, fontweight='bold', pad=20)
+        self.ax_main.grid(True, alpha=0.3, linestyle='--')
+        self.ax_main.set_xlabel('X Koordinatı (km)', fontsize=12)
+        self.ax_main.set_ylabel('Y Koordinatı (km)', fontsize=12)
+        self.ax_ais.set_title('🔴 AIS Haritası', fontsize=12, fontweight='bold')
+        self.ax_ais.grid(True, alpha=0.3)
+        self.ax_det.set_title('🔵 Tespit Haritası', fontsize=12, fontweight='bold')
+        self.ax_det.grid(True, alpha=0.3)
+        
+        empty = np.empty((0, 2))
+        self.scatter_ais = self.ax_main.scatter(empty[:, 0], empty[:, 1], c='red', s=200, alpha=0.8,
+                                                marker='o', edgecolors='darkred', linewidth=2, label='AIS Noktaları')
+        self.scatter_det = self.ax_main.scatter(empty[:, 0], empty[:, 1], c='blue', s=150, alpha=0.7,
+                                                marker='^', edgecolors='darkblue', linewidth=2, label='Tespit Noktaları')
+        self.small_ais = self.ax_ais.scatter(empty[:, 0], empty[:, 1], c='red', s=100, alpha=0.8, marker='o')
+        self.small_det = self.ax_det.scatter(empty[:, 0], empty[:, 1], c='blue', s=80, alpha=0.7, marker='^')
+        self.legend = self.ax_main.legend(loc='upper right', fontsize=12)
+        
+        for ax in (self.ax_main, self.ax_ais, self.ax_det):
+            ax.set_aspect('equal', adjustable='box')
+        
+        # Görüntüler arasında büyüyen, kullanılmayanları gizlenen artist havuzları
+        self.pools = {}
+        self.fig.tight_layout()
+    
+    def _pool(self, name, count, factory):
+        """İstenen sayıda artist döndürür, fazlalarını gizler"""
+        pool = self.pools.setdefault(name, [])
+        while len(pool) < count:
+            pool.append(factory())
+        for artist in pool[count:]:
+            artist.set_visible(False)
+        for artist in pool[:count]:
+            artist.set_visible(True)
+        return pool[:count]
+    
+    def _annotation(self, ax, **kwargs):
+        return lambda: ax.annotate('', (0, 0), **kwargs)
+    
+    def _set_limits(self, ax, xy):
+        """Collection'lar relim'e dahil olmadığı için sınırlar elle ayarlanır"""
+        if len(xy) == 0:
+            return
+        x_min, y_min = xy.min(axis=0)
+        x_max, y_max = xy.max(axis=0)
+        margin_x = max((x_max - x_min) * 0.1, 0.5)
+        margin_y = max((y_max - y_min) * 0.1, 0.5)
+        ax.set_xlim(x_min - margin_x, x_max + margin_x)
+        ax.set_ylim(y_min - margin_y, y_max + margin_y)
+    
+    def render(self, ais_points, detection_points, matches, image_name="default"):
+        """Artist'leri güncelleyip haritayı dosyaya yazar, dosya yolunu döndürür"""
+        ais_xy = np.array([(p['x'], p['y']) for p in ais_points], dtype=float).reshape(-1, 2)
+        det_xy = np.array([(p['x'], p['y']) for p in detection_points], dtype=float).reshape(-1, 2)
+        
+        self.scatter_ais.set_offsets(ais_xy)
+        self.scatter_det.set_offsets(det_xy)
+        self.small_ais.set_offsets(ais_xy)
+        self.small_det.set_offsets(det_xy)
+        
+        legend_texts = self.legend.get_texts()
+        legend_texts[0].set_text(f'AIS Noktaları ({len(ais_points)})')
+        legend_texts[1].set_text(f'Tespit Noktaları ({len(detection_points)})')
+        
+        # AIS etiketleri
+        labels = self._pool('ais_labels', len(ais_points), self._annotation(
+            self.ax_main, xytext=(10, 10), textcoords='offset points', fontsize=9, fontweight='bold',
+            bbox=dict(boxstyle="round,pad=0.3", facecolor="red", alpha=0.7, edgecolor='darkred')))
+        for label, point in zip(labels, ais_points):
+            label.xy = (point['x'], point['y'])
+            label.set_text(f"{point['name'][:12]}\nMMSI:{point['mmsi']}")
+        
+        # Tespit etiketleri (sadece ilk 10 tanesi)
+        labels = self._pool('det_labels', min(len(detection_points), 10), self._annotation(
+            self.ax_main, xytext=(5, -15), textcoords='offset points', fontsize=8,
+            bbox=dict(boxstyle="round,pad=0.2", facecolor="blue", alpha=0.6)))
+        for i, (label, point) in enumerate(zip(labels, detection_points)):
+            label.xy = (point['x'], point['y'])
+            label.set_text(f"T{i+1}")
+        
+        # Eşleştirme çizgileri ve mesafe etiketleri
+        lines = self._pool('match_lines', len(matches), lambda: self.ax_main.plot([], [])[0])
+        labels = self._pool('match_labels', len(matches), self._annotation(
+            self.ax_main, fontsize=8, ha='center', bbox=dict(boxstyle="round,pad=0.2", alpha=0.8)))
+        for line, label, match in zip(lines, labels, matches):
+            line_color, line_width, alpha = match_line_style(match['confidence'])
+            xs = [match['ais']['x'], match['detection']['x']]
+            ys = [match['ais']['y'], match['detection']['y']]
+            line.set_data(xs, ys)
+            line.set_color(line_color)
+            line.set_linewidth(line_width)
+            line.set_alpha(alpha)
+            label.xy = label.xyann = (sum(xs) / 2, sum(ys) / 2)  # Ofsetsiz etiket: metin de aynı noktada
+            label.set_text(f"D:{match['distance']:.1f}\nG:{match['confidence']:.2f}")
+            label.get_bbox_patch().set_facecolor(line_color)
+        
+        # Alt paneller: numaralar
+        labels = self._pool('ais_numbers', len(ais_points), self._annotation(
+            self.ax_ais, xytext=(3, 3), textcoords='offset points', fontsize=8))
+        for i, (label, point) in enumerate(zip(labels, ais_points)):
+            label.xy = (point['x'], point['y'])
+            label.set_text(f"{i+1}")
+        
+        labels = self._pool('det_numbers', min(len(detection_points), 20), self._annotation(
+            self.ax_det, xytext=(3, 3), textcoords='offset points', fontsize=7))
+        for i, (label, point) in enumerate(zip(labels, detection_points)):
+            label.xy = (point['x'], point['y'])
+            label.set_text(f"{i+1}")
+        
+        self._set_limits(self.ax_main, np.vstack((ais_xy, det_xy)))
+        self._set_limits(self.ax_ais, ais_xy)
+        self._set_limits(self.ax_det, det_xy)
+        
+        output_file = self.output_dir / f"visual_map_{image_name}.{self.fmt}"
+        self.fig.savefig(output_file, dpi=self.dpi, format=self.fmt, facecolor='white')
+        return output_file
+
+# Her işçi süreçte bir kez kurulan çizici ve AIS verisi
+_worker_renderer = None
+_worker_ais_points = None
+
+def _init_render_worker(ais_points, dpi, fmt, output_dir):
+    global _worker_renderer, _worker_ais_points
+    import warnings
+    warnings.filterwarnings('ignore', message='Glyph')  # Emoji başlıklar için font uyarıları
+    _worker_renderer = MapRenderer(dpi, fmt, output_dir)
+    _worker_ais_points = ais_points
+
+def _render_image(image_name, data_dir, max_distance):
+    """İşçi süreçte tek görüntü: tespit yükle, eşleştir, çiz (ad, dosya, süre)"""
+    start = time.perf_counter()
+    
+    detection_points = load_detection_data_per_image(data_dir, image_name)
+    apply_coordinate_transformation(detection_points)
+    matches = calculate_matching(_worker_ais_points, detection_points, max_distance)
+    output_file = _worker_renderer.render(_worker_ais_points, detection_points, matches, image_name)
+    
+    return image_name, str(output_file), len(matches), time.perf_counter() - start
+
+def render_all_maps(data_dir, output_dir=".", dpi=150, fmt='png', workers=None, max_distance=10.0, images=None):
+    """Tüm görüntülerin haritalarını süreç havuzunda penceresiz (Agg) çizer"""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    
+    ais_points = load_ais_data(Path(data_dir) / "sample_ais.json")
+    images = images or get_available_images(data_dir)
+    if not ais_points or not images:
+        print("Çizilecek veri bulunamadı!")
+        return []
+    
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    workers = workers or min(len(images), os.cpu_count() or 1)
+    print(f"🖼️ {len(images)} harita çiziliyor ({workers} süreç, dpi={dpi}, format={fmt})")
+    
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                             initargs=(ais_points, dpi, fmt, str(output_dir))) as pool:
+        futures = [pool.submit(_render_image, image_name, str(data_dir), max_distance) for image_name in images]
+        for future in as_completed(futures):
+            image_name, output_file, match_count, seconds = future.result()
+            print(f"  {image_name}: {seconds * 1000:.0f} ms, {match_count} eşleştirme -> {output_file}")
+            results.append((image_name, output_file, seconds))
+    
+    total = time.perf_counter() - start
+    print(f"Toplam: {len(results)} harita, {total:.2f} s ({len(results) / total:.1f} harita/s)")
+    return results
 
 def print_results_summary(matches):
     """Özet sonuçları yazdır"""
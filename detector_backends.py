@@ -0,0 +1,215 @@
+"""
+Tespit Arka Uçları
+==================
+SimpleDetector'a takılabilen tespit arka uçları. Varsayılan (backend=None)
+Canny/kontur yöntemidir; OnnxYoloBackend yerel bir YOLO ONNX modelini
+ONNX Runtime (CPU) ile toplu çalıştırır. data/txt etiketleri zaten YOLO
+biçiminde olduğundan eğitilen model doğrudan kullanılabilir.
+
+Toplu çalışma:
+- Ön işleme: letterbox (oran korunarak küçültme + 114 gri dolgu) ve 0-1
+  normalizasyon önceden ayrılmış tensörlere yazılır; kare başına dizi ayrılmaz.
+- Çıkarım: kareler max_batch büyüklüğünde gruplar halinde tek session.run ile.
+- Çözme: tüm gruptaki kutular tek seferde eşiklenir, orijinal koordinatlara
+  döndürülür; NMS kare başına tek çağrıdır (sınıflar kaydırılmış kutularla ayrılır).
+
+onnxruntime sadece bu arka uç oluşturulurken yüklenir (pip install onnxruntime).
+"""
+
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from ais_matcher import DetectedShip
+
+LETTERBOX_FILL = 114
+
+class DetectorBackend:
+    """Arka uç arayüzü: kare listesi alır, kare başına DetectedShip listesi döndürür"""
+    
+    name = "temel"
+    
+    def detect_batch(self, frames: Sequence[np.ndarray]) -> List[List[DetectedShip]]:
+        raise NotImplementedError
+    
+    def detect(self, frame: np.ndarray) -> List[DetectedShip]:
+        return self.detect_batch([frame])[0]
+
+class OnnxYoloBackend(DetectorBackend):
+    """ONNX Runtime (CPU) ile YOLOv5/YOLOv8 biçimli model; toplu ön işleme, çıkarım, çözme ve NMS"""
+    
+    name = "onnx-yolo"
+    
+    def __init__(self, model_path: str, input_size: Optional[int] = None, conf_threshold: float = 0.25,
+                 iou_threshold: float = 0.45, class_ids: Optional[Sequence[int]] = None, max_batch: int = 8,
+                 intra_op_threads: Optional[int] = None, inter_op_threads: Optional[int] = None):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("ONNX arka ucu için onnxruntime gerekli: pip install onnxruntime") from e
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads  # Tek operatör içi paralellik
+        if inter_op_threads:
+            options.inter_op_num_threads = inter_op_threads  # Bağımsız operatörler arası paralellik
+            options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+        self.session = ort.InferenceSession(str(model_path), options, providers=['CPUExecutionProvider'])
+        
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch_dim, _, height_dim, _ = model_input.shape
+        # Sabit toplu boyutlu modelde gruplar bu boyuta dolgu ile tamamlanır
+        self.fixed_batch = batch_dim if isinstance(batch_dim, int) else None
+        self.input_size = input_size or (height_dim if isinstance(height_dim, int) else 640)
+        self.max_batch = self.fixed_batch or max_batch
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+        self.class_ids = None if class_ids is None else np.asarray(class_ids)
+        
+        size = self.input_size
+        self._canvas = np.full((self.max_batch, size, size, 3), LETTERBOX_FILL, dtype=np.uint8)
+        self._tensor = np.zeros((self.max_batch, 3, size, size), dtype=np.float32)
+        self._canvas_geometry = [None] * self.max_batch  # Yuvadaki dolgu düzeni değişmedikçe yeniden doldurulmaz
+        self.timings = {'ön işleme': 0.0, 'çıkarım': 0.0, 'çözme': 0.0}
+    
+    # --- Ön işleme ---
+    
+    def _letterbox_geometry(self, shape) -> Tuple[float, int, int, int, int]:
+        """(ölçek, yeni genişlik, yeni yükseklik, sol dolgu, üst dolgu)"""
+        height, width = shape[:2]
+        scale = min(self.input_size / height, self.input_size / width)
+        new_width, new_height = int(round(width * scale)), int(round(height * scale))
+        return scale, new_width, new_height, (self.input_size - new_width) // 2, (self.input_size - new_height) // 2
+    
+    def preprocess(self, frames: Sequence[np.ndarray]) -> np.ndarray:
+        """Kareleri önceden ayrılmış tensöre letterbox + BGR->RGB + 0-1 olarak yazar; (ölçek, sol, üst) dizisi döndürür"""
+        geometry = np.empty((len(frames), 3))
+        for slot, frame in enumerate(frames):
+            scale, new_width, new_height, left, top = layout = self._letterbox_geometry(frame.shape)
+            canvas = self._canvas[slot]
+            if self._canvas_geometry[slot] != layout:
+                canvas.fill(LETTERBOX_FILL)
+                self._canvas_geometry[slot] = layout
+            canvas[top:top + new_height, left:left + new_width] = cv2.resize(
+                frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+            # HWC BGR -> CHW RGB ve 1/255 tek adımda, hedef tensöre
+            np.multiply(canvas.transpose(2, 0, 1)[::-1], np.float32(1 / 255), out=self._tensor[slot])
+            geometry[slot] = (scale, left, top)
+        return geometry
+    
+    # --- Çözme ---
+    
+    def decode(self, output: np.ndarray, geometry: np.ndarray, frame_shapes) -> List[List[DetectedShip]]:
+        """Model çıktısı (YOLOv8: (B, 4+nc, N), YOLOv5: (B, N, 5+nc)) -> kare başına tespitler"""
+        count = len(frame_shapes)
+        output = output[:count]
+        if output.shape[1] < output.shape[2]:
+            predictions = output.transpose(0, 2, 1)  # YOLOv8: nesnellik yok
+            class_scores = predictions[..., 4:]
+        else:
+            predictions = output  # YOLOv5: sınıf skoru x nesnellik
+            class_scores = predictions[..., 5:] * predictions[..., 4:5]
+        
+        if self.class_ids is not None:
+            class_scores = class_scores[..., self.class_ids]
+        class_index = class_scores.argmax(axis=-1)
+        scores = np.take_along_axis(class_scores, class_index[..., None], axis=-1)[..., 0]
+        frame_index, anchor = np.nonzero(scores > self.conf_threshold)
+        results = [[] for _ in range(count)]
+        if not len(frame_index):
+            return results
+        
+        boxes = predictions[frame_index, anchor, :4].astype(np.float64)  # cx, cy, w, h (letterbox pikseli)
+        scores = scores[frame_index, anchor].astype(np.float64)
+        classes = class_index[frame_index, anchor]
+        xywh = np.column_stack([boxes[:, 0] - boxes[:, 2] / 2, boxes[:, 1] - boxes[:, 3] / 2, boxes[:, 2], boxes[:, 3]])
+        
+        # Kare başına tek NMS çağrısı; sınıflar x ekseninde ayrı bölgelere kaydırılarak birbirini bastırmaz
+        # (nonzero çıktısı kare sırasında olduğundan kareler ardışık dilimlerdir)
+        shifted = xywh.copy()
+        shifted[:, 0] += classes * (4 * self.input_size)
+        bounds = np.searchsorted(frame_index, np.arange(count + 1))
+        keep = np.concatenate([start + np.asarray(cv2.dnn.NMSBoxes(shifted[start:stop].tolist(), scores[start:stop].tolist(),
+                                                                    self.conf_threshold, self.iou_threshold), dtype=int).reshape(-1)
+                               for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start])
+        
+        # Letterbox -> orijinal kare koordinatları, kareye kırpılmış
+        frame_index, xywh, scores = frame_index[keep], xywh[keep], scores[keep]
+        scale, left, top = geometry[frame_index, 0], geometry[frame_index, 1], geometry[frame_index, 2]
+        shapes = np.array([shape[:2] for shape in frame_shapes], dtype=np.float64)[frame_index]
+        x1 = np.clip((xywh[:, 0] - left) / scale, 0, shapes[:, 1])
+        y1 = np.clip((xywh[:, 1] - top) / scale, 0, shapes[:, 0])
+        x2 = np.clip((xywh[:, 0] + xywh[:, 2] - left) / scale, 0, shapes[:, 1])
+        y2 = np.clip((xywh[:, 1] + xywh[:, 3] - top) / scale, 0, shapes[:, 0])
+        boxes = np.column_stack([x1, y1, x2 - x1, y2 - y1]).round().astype(int)
+        
+        # Skora göre sıralı (NMSBoxes çıktısı zaten azalan skor sırasında)
+        for index, box, score in zip(frame_index.tolist(), boxes.tolist(), scores.tolist()):
+            if box[2] > 0 and box[3] > 0:
+                results[index].append(DetectedShip(tuple(box), confidence=score))
+        return results
+    
+    # --- Toplu tespit ---
+    
+    def detect_batch(self, frames: Sequence[np.ndarray]) -> List[List[DetectedShip]]:
+        results = []
+        for start in range(0, len(frames), self.max_batch):
+            group = frames[start:start + self.max_batch]
+            began = time.perf_counter()
+            geometry = self.preprocess(group)
+            batch = self.fixed_batch or len(group)  # Sabit boyutlu modelde kalan yuvalar eski içerikle gider, çıktıları atılır
+            prepared = time.perf_counter()
+            output = self.session.run(None, {self.input_name: self._tensor[:batch]})[0]
+            inferred = time.perf_counter()
+            results.extend(self.decode(output, geometry, [frame.shape for frame in group]))
+            self.timings['ön işleme'] += prepared - began
+            self.timings['çıkarım'] += inferred - prepared
+            self.timings['çözme'] += time.perf_counter() - inferred
+        return results
+
+def benchmark_backend(model_path="models/ship_yolo.onnx", video_path="data/videos/4.mp4", batch_sizes=(1, 2, 4, 8),
+                      frames: int = 64, intra_op_threads: Optional[int] = None, inter_op_threads: Optional[int] = None):
+    """Toplu boyut başına kare/s ve aşama süreleri (ön işleme, çıkarım, çözme)"""
+    from pathlib import Path
+    from memory_profile import _first_frames
+    
+    if not Path(model_path).exists():
+        print(f"⚠️ Model bulunamadı, ONNX ölçümü atlandı: {model_path}")
+        return None
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError:
+        print("⚠️ onnxruntime kurulu değil, ONNX ölçümü atlandı (pip install onnxruntime)")
+        return None
+    
+    video_frames = _first_frames(video_path, frames)
+    if not video_frames:
+        print(f"⚠️ Video açılamadı: {video_path}")
+        return None
+    
+    threads = f"intra {intra_op_threads or 'oto'}, inter {inter_op_threads or 'oto'}"
+    print(f"🧠 ONNX YOLO arka ucu: {model_path}, {len(video_frames)} kare, {threads}")
+    results = {}
+    for batch_size in batch_sizes:
+        backend = OnnxYoloBackend(model_path, max_batch=batch_size, intra_op_threads=intra_op_threads,
+                                  inter_op_threads=inter_op_threads)
+        backend.detect_batch(video_frames[:backend.max_batch])  # Isınma
+        backend.timings = dict.fromkeys(backend.timings, 0.0)
+        start = time.perf_counter()
+        detections = backend.detect_batch(video_frames)
+        elapsed = time.perf_counter() - start
+        results[batch_size] = len(video_frames) / elapsed
+        stages = ', '.join(f"{name} {total / len(video_frames) * 1000:.1f}" for name, total in backend.timings.items())
+        print(f"  toplu {backend.max_batch:>2}  {results[batch_size]:7.1f} kare/s  (ms/kare: {stages}; "
+              f"ort. {np.mean([len(d) for d in detections]):.1f} tespit)")
+    return results
+
+if __name__ == "__main__":
+    import sys
+    print("🚢 Tespit Arka Uçları")
+    print("=" * 40)
+    benchmark_backend(*sys.argv[1:2])
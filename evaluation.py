@@ -0,0 +1,212 @@
+"""
+Parametre Taraması
+==================
+AISMatcher parametrelerini (fx/fy/cx, max_distance, min_score) örnek veri
+üzerinde toplu değerlendirir.
+
+Veri seti bir kez yüklenir. Her kamera ayarı için AIS projeksiyonları ve
+projeksiyon-tespit mesafe matrisleri bir kez hesaplanır; max_distance ve
+min_score ızgarası bu matrisler üzerinde yayınlama (broadcast) ile tek
+seferde skorlanır. Her yapılandırma için eşleşme oranı, ortalama piksel
+hatası ve işlem hızı raporlanır.
+"""
+
+import csv
+import itertools
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from ais_matcher import AISMatcher, create_sample_ais_data, load_labelme_directory, load_yolo_annotations
+from assignment_solvers import get_solver
+
+DEFAULT_CAMERA = {'fx': 1600, 'fy': 1600, 'cx': 960, 'cy': 540}
+
+class EvalFrame:
+    """Bir görüntünün önceden yüklenmiş tespit ve AIS dizileri"""
+    
+    def __init__(self, name: str, centers: np.ndarray, confidences: np.ndarray, lats: np.ndarray, lons: np.ndarray):
+        self.name = name
+        self.centers = centers
+        self.confidences = confidences
+        self.lats = lats
+        self.lons = lons
+
+def load_dataset(data_dir="data") -> List[EvalFrame]:
+    """process_test_data ile aynı görüntü, tespit ve AIS verisini bir kez yükler"""
+    data_path = Path(data_dir)
+    txt_path = data_path / "txt"
+    json_path = data_path / "json"
+    
+    annotations = []
+    if txt_path.exists() and len(list(txt_path.glob("*.txt"))) > 0:
+        for image_path in txt_path.glob("*.jpg"):
+            txt_file = image_path.with_suffix('.txt')
+            if txt_file.exists():
+                annotations.append((image_path.name, load_yolo_annotations(txt_file, image_path)))
+    elif json_path.exists():
+        annotations = [(f"{stem}.jpg", detections) for stem, detections in load_labelme_directory(json_path).items()]
+    
+    if not annotations:
+        return []
+    
+    # create_sample_ais_data(n) JSON'daki ilk n gemiyi verir; bir kez okuyup dilimlenir
+    ais_targets = create_sample_ais_data(max(len(detections) for _, detections in annotations))
+    
+    frames = []
+    for name, detections in annotations:
+        targets = ais_targets[:len(detections)]
+        frames.append(EvalFrame(
+            name,
+            np.array([detection.center for detection in detections], dtype=float).reshape(-1, 2),
+            np.array([detection.confidence for detection in detections], dtype=float),
+            np.array([target.lat for target in targets], dtype=float),
+            np.array([target.lon for target in targets], dtype=float)))
+    return frames
+
+def precompute_distances(frames: List[EvalFrame], camera_params: dict, own_position=(40.0, 32.0)) -> List[np.ndarray]:
+    """Kamera ayarı için her görüntünün (geçerli AIS x tespit) piksel mesafe matrisi"""
+    matcher = AISMatcher(camera_params)
+    distances = []
+    for frame in frames:
+        pixel_x, valid = matcher.project_ais_arrays(frame.lats, frame.lons, own_position)
+        pixel_x = pixel_x[valid]
+        distances.append(np.sqrt((pixel_x[:, None] - frame.centers[None, :, 0])**2 +
+                                 (matcher.cy - frame.centers[None, :, 1])**2))
+    return distances
+
+def sweep(frames: List[EvalFrame], fx_values=(1600,), max_distances=(2000,), min_scores=(0.0,),
+          cx_values=(960,), fy=1600, cy=540, solver=None) -> List[dict]:
+    """Parametre ızgarasını değerlendirir; her yapılandırma için bir sonuç sözlüğü döndürür"""
+    solver = get_solver(solver)
+    max_distances = np.asarray(max_distances, dtype=float)
+    min_scores = np.asarray(min_scores, dtype=float)
+    total_detections = sum(len(frame.centers) for frame in frames)
+    solver.solve_dense(np.ones((1, 1)))  # Tembel yüklenen SciPy ilk yapılandırmanın süresine girmesin
+    
+    results = []
+    for fx, cx in itertools.product(fx_values, cx_values):
+        camera = {'fx': fx, 'fy': fy, 'cx': cx, 'cy': cy}
+        distances = precompute_distances(frames, camera)
+        
+        # Kare başına (max_distance, min_score, AIS, tespit) skor tensörü tek seferde
+        scores = []
+        for frame, distance in zip(frames, distances):
+            score = np.maximum(0, 1 - distance[None] / max_distances[:, None, None])
+            score[distance[None] > max_distances[:, None, None]] = 0.0
+            score = (score * frame.confidences[None, None, :])[:, None]
+            scores.append(np.where(score < min_scores[None, :, None, None], 0.0, score))
+        
+        for a, b in itertools.product(range(len(max_distances)), range(len(min_scores))):
+            start = time.perf_counter()
+            matched, errors, confidences = 0, [], []
+            for score, distance in zip(scores, distances):
+                if score.size == 0:
+                    continue
+                rows, cols = solver.solve_dense(score[a, b])
+                matched += len(rows)
+                errors.extend(distance[rows, cols].tolist())
+                confidences.extend(score[a, b][rows, cols].tolist())
+            elapsed = time.perf_counter() - start
+            
+            results.append({
+                'fx': fx, 'fy': fy, 'cx': cx, 'cy': cy,
+                'max_distance': float(max_distances[a]), 'min_score': float(min_scores[b]),
+                'matches': matched, 'detections': total_detections,
+                'match_rate': matched / total_detections if total_detections else 0.0,
+                'mean_error': float(np.mean(errors)) if errors else float('nan'),
+                'mean_confidence': float(np.mean(confidences)) if confidences else 0.0,
+                'frames_per_s': len(frames) / elapsed if elapsed > 0 else float('inf'),
+            })
+    return results
+
+def best_configs(results: List[dict], top: int = 10) -> List[dict]:
+    """Eşleşme oranı yüksek, hatası düşük yapılandırmalar"""
+    return sorted(results, key=lambda r: (-r['match_rate'], r['mean_error'] if r['matches'] else float('inf')))[:top]
+
+def save_results_csv(results: List[dict], csv_path):
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+        writer.writeheader()
+        writer.writerows(results)
+
+def print_results(results: List[dict], top: int = 10):
+    print(f"{'fx':>7} {'cx':>6} {'max_dist':>9} {'min_skor':>8} {'oran':>6} {'hata(px)':>9} {'güven':>6} {'kare/s':>9}")
+    for r in best_configs(results, top):
+        print(f"{r['fx']:>7.0f} {r['cx']:>6.0f} {r['max_distance']:>9.0f} {r['min_score']:>8.2f} "
+              f"{r['match_rate']:>6.1%} {r['mean_error']:>9.1f} {r['mean_confidence']:>6.3f} {r['frames_per_s']:>9.0f}")
+
+def run_sweep(data_dir="data", fx_values=None, max_distances=None, min_scores=None, cx_values=(960,),
+              top: int = 10, csv_path: Optional[str] = None, solver=None) -> List[dict]:
+    """Varsayılan olarak 10 x 10 x 10 = 1000 yapılandırmalık tarama"""
+    fx_values = np.linspace(800, 2400, 10) if fx_values is None else fx_values
+    max_distances = np.linspace(200, 2000, 10) if max_distances is None else max_distances
+    min_scores = np.linspace(0.0, 0.45, 10) if min_scores is None else min_scores
+    
+    start = time.perf_counter()
+    frames = load_dataset(data_dir)
+    solver = get_solver(solver)
+    solver.solve_dense(np.ones((1, 1)))
+    load_time = time.perf_counter() - start
+    if not frames:
+        print("❌ Veri bulunamadı! data/txt/ veya data/json/ klasörlerini kontrol edin.")
+        return []
+    
+    start = time.perf_counter()
+    results = sweep(frames, fx_values, max_distances, min_scores, cx_values, solver=solver)
+    elapsed = time.perf_counter() - start
+    
+    print(f"🔎 {len(results)} yapılandırma, {len(frames)} görüntü: yükleme {load_time:.2f} s, "
+          f"tarama {elapsed:.2f} s ({len(results) / elapsed:,.0f} yapılandırma/s)")
+    print_results(results, top)
+    if csv_path:
+        save_results_csv(results, csv_path)
+        print(f"  Sonuçlar: {csv_path}")
+    return results
+
+def test_sweep_parity(data_dir="data", num_configs: int = 25, seed: int = 0):
+    """Tarama sonuçlarını aynı ayarlarla çalışan AISMatcher.match_targets ile karşılaştırır"""
+    from ais_matcher import DetectedShip
+    
+    frames = load_dataset(data_dir)
+    rng = np.random.default_rng(seed)
+    vessels = create_sample_ais_data(max(len(frame.centers) for frame in frames))
+    failures = 0
+    
+    for _ in range(num_configs):
+        fx = float(rng.uniform(800, 2400))
+        max_distance = float(rng.uniform(200, 2000))
+        min_score = float(rng.uniform(0.0, 0.5))
+        result = sweep(frames, (fx,), (max_distance,), (min_score,))[0]
+        
+        matcher = AISMatcher(dict(DEFAULT_CAMERA, fx=fx))
+        matcher.max_distance = max_distance
+        matcher.min_score = min_score
+        matched, confidences = 0, []
+        for frame in frames:
+            # Merkezden bbox geri kurulur (tamsayı bbox'ların merkezi .5 katları, kayıpsız)
+            detections = []
+            for (center_x, center_y), confidence in zip(frame.centers, frame.confidences):
+                detection = DetectedShip((0, 0, 0, 0), confidence)
+                detection.center = (center_x, center_y)
+                detections.append(detection)
+            matches = matcher.match_targets(vessels[:len(detections)], detections, (40.0, 32.0))
+            matched += len(matches)
+            confidences.extend(confidence for _, _, confidence in matches)
+        
+        mean_confidence = float(np.mean(confidences)) if confidences else 0.0
+        if matched != result['matches'] or not np.isclose(mean_confidence, result['mean_confidence']):
+            failures += 1
+            print(f"  ❌ fx={fx:.0f} max_distance={max_distance:.0f} min_score={min_score:.2f}: "
+                  f"tarama {result['matches']}, match_targets {matched}")
+    
+    print(f"✅ Tarama/match_targets uyumu: {num_configs - failures}/{num_configs}")
+    return failures == 0
+
+if __name__ == "__main__":
+    print("🚢 AIS-Kamera Eşleştirme - Parametre Taraması")
+    print("=" * 40)
+    test_sweep_parity()
+    run_sweep()
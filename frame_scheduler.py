@@ -0,0 +1,117 @@
+"""
+Gecikme Bütçeli Kare Zamanlayıcı
+================================
+Gerçek zamanlı video işlemede çıktının kameranın gerisinde kalmasını önler.
+
+- Her karenin kamera zamanı (ilk kare + indeks / fps) tutulur; işleme sırası
+  gelen kare gecikme bütçesini aşmışsa çözülmeden (grab) atlanır.
+- Tam tespit her k karede bir yapılır, aradaki karelerde takipçi tahmini
+  kullanılır. Tespit süresi kare aralığını aşarsa k otomatik büyütülür.
+- Atlanan kare ve uçtan uca gecikme (kamera zamanı -> çıktı) istatistikleri
+  tutulur.
+"""
+
+import math
+import time
+
+import numpy as np
+
+class FrameScheduler:
+    """run_video için gecikme bütçeli zamanlayıcı"""
+    
+    def __init__(self, latency_budget_ms: float = 100.0, detect_every: int = 3, max_detect_every: int = 15,
+                 pace: bool = True, adaptive: bool = True):
+        self.latency_budget = latency_budget_ms / 1000.0
+        self.detect_every = detect_every  # En sık tam tespit aralığı (kare)
+        self.max_detect_every = max_detect_every
+        self.pace = pace  # Dosyadan okurken kameradan hızlı gitme (gerçek zamanı taklit et)
+        self.adaptive = adaptive
+        self.reset()
+    
+    def reset(self, fps: float = 25.0):
+        self.frame_interval = 1.0 / fps
+        self._start = None
+        self._last_detect = None
+        self._detect_cost = None  # Tespit süresinin üstel ortalaması (s)
+        self.current_k = self.detect_every
+        
+        self.dropped = 0
+        self.detected = 0
+        self.tracked = 0
+        self.latencies = []
+        self.detect_times = []
+    
+    def start(self, fps: float):
+        """Video başlarken çağrılır; ilk karenin kamera zamanı şimdi kabul edilir"""
+        self.reset(fps if fps and fps > 0 else 25.0)
+        self._start = time.perf_counter()
+    
+    def capture_time(self, frame_index: int) -> float:
+        return self._start + frame_index * self.frame_interval
+    
+    def wait_for(self, frame_index: int):
+        """Kare kameradan henüz 'gelmediyse' bekler (dosya kaynağı için)"""
+        if self.pace:
+            delay = self.capture_time(frame_index) - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    
+    def should_skip(self, frame_index: int) -> bool:
+        """Kare bütçeyi aşacak kadar eskiyse atlanır (sonraki kare daha taze)"""
+        return time.perf_counter() - self.capture_time(frame_index) > self.latency_budget
+    
+    def record_drop(self):
+        self.dropped += 1
+    
+    def should_detect(self, frame_index: int) -> bool:
+        """Son tam tespitten bu yana k kare geçtiyse tam tespit yapılır"""
+        return self._last_detect is None or frame_index - self._last_detect >= self.current_k
+    
+    def record_processing(self, frame_index: int, detected: bool, cost: float):
+        if not detected:
+            self.tracked += 1
+            return
+        
+        self.detected += 1
+        self._last_detect = frame_index
+        self.detect_times.append(cost)
+        self._detect_cost = cost if self._detect_cost is None else 0.8 * self._detect_cost + 0.2 * cost
+        
+        # Tespit kare aralığından uzun sürüyorsa aradaki takip kareleri bunu karşılamalı
+        if self.adaptive:
+            needed = math.ceil(self._detect_cost / self.frame_interval) if self._detect_cost > 0 else 1
+            self.current_k = int(min(max(self.detect_every, needed), self.max_detect_every))
+    
+    def record_output(self, frame_index: int) -> float:
+        """Kare çıktısı hazır olduğunda uçtan uca gecikmeyi kaydeder"""
+        latency = time.perf_counter() - self.capture_time(frame_index)
+        self.latencies.append(latency)
+        return latency
+    
+    def summary(self) -> dict:
+        latencies = np.array(self.latencies) * 1000
+        processed = len(latencies)
+        total = processed + self.dropped
+        return {
+            'frames': total,
+            'processed': processed,
+            'dropped': self.dropped,
+            'drop_rate': self.dropped / total if total else 0.0,
+            'detected': self.detected,
+            'tracked': self.tracked,
+            'detect_every': self.current_k,
+            'latency_mean_ms': float(latencies.mean()) if processed else 0.0,
+            'latency_p50_ms': float(np.percentile(latencies, 50)) if processed else 0.0,
+            'latency_p95_ms': float(np.percentile(latencies, 95)) if processed else 0.0,
+            'latency_max_ms': float(latencies.max()) if processed else 0.0,
+            'over_budget': int((latencies > self.latency_budget * 1000).sum()),
+            'detect_ms': float(np.mean(self.detect_times) * 1000) if self.detect_times else 0.0,
+        }
+    
+    def print_summary(self):
+        s = self.summary()
+        print(f"⏱️ Gerçek zamanlı: {s['processed']}/{s['frames']} kare işlendi, {s['dropped']} atlandı "
+              f"({s['drop_rate']:.1%}), {s['detected']} tespit + {s['tracked']} takip karesi (k={s['detect_every']})")
+        print(f"  Uçtan uca gecikme: ort. {s['latency_mean_ms']:.1f} ms, p50 {s['latency_p50_ms']:.1f}, "
+              f"p95 {s['latency_p95_ms']:.1f}, en fazla {s['latency_max_ms']:.1f} ms; "
+              f"bütçe ({self.latency_budget * 1000:.0f} ms) aşımı: {s['over_budget']}, ort. tespit {s['detect_ms']:.1f} ms")
@@ -0,0 +1,173 @@
+"""
+Kademeli Eleme (Gating)
+=======================
+Skor matrisi kurulmadan önce AIS-tespit çiftlerini ucuz, vektörel kapılarla
+eler. Kapılar sırayla çalışır ve her biri sadece önceki kapılardan geçen
+çiftlere bakar:
+
+1. Kerteriz penceresi: AIS kerterizi ile tespitin pikselden kerterizi
+2. Görünür boyut: menzil ve gemi boyu/genişliğinden beklenen piksel genişliği
+3. En-boy oranı: bbox en/boy oranının gemi boyutlarına göre makul olması
+
+Her kapı kaç çifti elediğini kaydeder.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+class GateContext:
+    """Kapıların kullandığı AIS ve tespit dizileri (satır: AIS, sütun: tespit)"""
+    
+    def __init__(self, fx: float, cx: float, ais_bearing, ais_range, ais_length, ais_width, det_boxes):
+        det_boxes = np.asarray(det_boxes, dtype=float).reshape(-1, 4)
+        self.fx = fx
+        self.ais_bearing = np.asarray(ais_bearing, dtype=float)  # Kamera eksenine göre (radyan)
+        self.ais_range = np.asarray(ais_range, dtype=float)  # Metre
+        self.ais_length = np.asarray(ais_length, dtype=float)
+        self.ais_width = np.asarray(ais_width, dtype=float)
+        self.det_bearing = np.arctan((det_boxes[:, 0] + det_boxes[:, 2] / 2 - cx) / fx)
+        self.det_width = det_boxes[:, 2]
+        self.det_aspect = np.where(det_boxes[:, 3] > 0, det_boxes[:, 2] / np.maximum(det_boxes[:, 3], 1e-9), 1.0)
+
+class BearingGate:
+    """AIS ve tespit kerterizleri arasındaki fark pencere içinde olmalı"""
+    
+    name = 'kerteriz'
+    
+    def __init__(self, window_deg: float = 15.0):
+        self.window = np.radians(window_deg)
+    
+    def apply(self, context: GateContext, rows, cols):
+        return np.abs(context.ais_bearing[rows] - context.det_bearing[cols]) <= self.window
+    
+    def candidates(self, context: GateContext) -> Tuple[np.ndarray, np.ndarray]:
+        """İlk kapı olarak: tüm çiftleri kurmadan sıralı kerterizlerde aralık araması"""
+        order = np.argsort(context.ais_bearing, kind='stable')
+        sorted_bearing = context.ais_bearing[order]
+        lo = np.searchsorted(sorted_bearing, context.det_bearing - self.window, side='left')
+        hi = np.searchsorted(sorted_bearing, context.det_bearing + self.window, side='right')
+        counts = hi - lo
+        
+        cols = np.repeat(np.arange(len(context.det_bearing)), counts)
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        rows = order[np.arange(counts.sum()) - np.repeat(offsets - lo, counts)]
+        
+        # Sınırdaki kayan nokta farkları için apply ile aynı koşul
+        keep = self.apply(context, rows, cols)
+        return rows[keep], cols[keep]
+
+class ApparentSizeGate:
+    """Bbox genişliği, gemi baştan (genişlik) ve yandan (boy) görünürkenki piksel genişlikleri arasında olmalı"""
+    
+    name = 'boyut'
+    
+    def __init__(self, tolerance: float = 3.0):
+        self.tolerance = tolerance  # Kutu ve boyut hatası için çarpan payı
+    
+    def apply(self, context: GateContext, rows, cols):
+        ranges = np.maximum(context.ais_range[rows], 1.0)
+        smallest = context.fx * context.ais_width[rows] / ranges / self.tolerance
+        largest = context.fx * context.ais_length[rows] / ranges * self.tolerance
+        width = context.det_width[cols]
+        return (width >= smallest) & (width <= largest)
+
+class AspectRatioGate:
+    """Bbox en/boy oranı, gemi boy/genişlik oranına göre makul olmalı"""
+    
+    name = 'en-boy'
+    
+    def __init__(self, min_aspect: float = 0.3, tolerance: float = 2.0):
+        self.min_aspect = min_aspect  # Baştan görünen gemi için alt sınır
+        self.tolerance = tolerance
+    
+    def apply(self, context: GateContext, rows, cols):
+        widths = np.maximum(context.ais_width[rows], 1.0)
+        largest = self.tolerance * np.maximum(context.ais_length[rows] / widths, 1.0)
+        aspect = context.det_aspect[cols]
+        return (aspect >= self.min_aspect) & (aspect <= largest)
+
+def default_gates():
+    return [BearingGate(), ApparentSizeGate(), AspectRatioGate()]
+
+class GatingCascade:
+    """Kapıları sırayla uygulayan ve elenen çift sayılarını tutan kaskad"""
+    
+    def __init__(self, gates=None):
+        self.gates = list(gates) if gates is not None else default_gates()
+        self.reset_stats()
+    
+    def reset_stats(self):
+        self.pairs_in = 0
+        self.pairs_out = 0
+        self.pruned = {gate.name: 0 for gate in self.gates}
+        self.last_pruned = {gate.name: 0 for gate in self.gates}
+    
+    def filter(self, context: GateContext, shape: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Tüm kapılardan geçen (satır, sütun) çiftleri"""
+        total = shape[0] * shape[1]
+        self.pairs_in += total
+        gates = self.gates
+        
+        # İlk kapı aday üretebiliyorsa tüm çiftler hiç kurulmaz
+        if gates and hasattr(gates[0], 'candidates'):
+            rows, cols = gates[0].candidates(context)
+            self.last_pruned[gates[0].name] = total - len(rows)
+            self.pruned[gates[0].name] += total - len(rows)
+            gates = gates[1:]
+        else:
+            rows, cols = np.divmod(np.arange(total), shape[1])
+        
+        for gate in gates:
+            if len(rows) == 0:
+                self.last_pruned[gate.name] = 0
+                continue
+            keep = gate.apply(context, rows, cols)
+            pruned = len(rows) - int(np.count_nonzero(keep))
+            self.last_pruned[gate.name] = pruned
+            self.pruned[gate.name] += pruned
+            rows, cols = rows[keep], cols[keep]
+        
+        self.pairs_out += len(rows)
+        return rows, cols
+    
+    def report(self) -> str:
+        parts = [f"{name}: -{count}" for name, count in self.pruned.items()]
+        return f"{self.pairs_in} çift -> {self.pairs_out} aday ({', '.join(parts)})"
+
+def make_cascade(gating) -> Optional[GatingCascade]:
+    """AISMatcher gating parametresi: None/False kapalı, True varsayılan kaskad, liste veya GatingCascade"""
+    if gating is None or gating is False:
+        return None
+    if gating is True:
+        return GatingCascade()
+    if isinstance(gating, GatingCascade):
+        return gating
+    if isinstance(gating, (list, tuple)):
+        return GatingCascade(gating)
+    raise ValueError(f"Geçersiz gating: {gating!r}")
+
+def benchmark_gating(num_ais: int = 5000, num_detections: int = 50, repeats: int = 5, seed: int = 0):
+    """Kapalı/açık kaskad ile match_targets süresi ve skorlanan çift sayısı"""
+    import time
+    from ais_matcher import AISMatcher, AISTarget, DetectedShip
+    
+    rng = np.random.default_rng(seed)
+    ais_targets = [AISTarget(200000000 + i, 40.0 + rng.uniform(0.005, 0.1), 32.0 + rng.uniform(-0.08, 0.08),
+                             rng.uniform(30, 300), rng.uniform(8, 45)) for i in range(num_ais)]
+    detections = [DetectedShip((int(rng.integers(0, 1800)), int(rng.integers(400, 650)), int(rng.integers(20, 300)),
+                                int(rng.integers(10, 120))), float(rng.uniform(0.3, 1.0))) for _ in range(num_detections)]
+    
+    print(f"🚧 Kademeli eleme: {num_ais} AIS x {num_detections} tespit")
+    for name, gating in (("kapılar kapalı", None), ("kapılar açık", True)):
+        matcher = AISMatcher(gating=gating)
+        matcher.match_targets(ais_targets, detections, (40.0, 32.0))  # Isınma (SciPy yüklemesi)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            matches = matcher.match_targets(ais_targets, detections, (40.0, 32.0))
+        elapsed = (time.perf_counter() - start) / repeats * 1000
+        detail = f", {matcher.gating.report()}" if matcher.gating is not None else ""
+        print(f"  {name:<15} {elapsed:8.1f} ms, {len(matches)} eşleştirme{detail}")
+
+if __name__ == "__main__":
+    benchmark_gating()
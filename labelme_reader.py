@@ -0,0 +1,181 @@
+"""
+Akışlı LabelMe Okuyucu
+======================
+data/json altındaki LabelMe dosyalarının neredeyse tamamı base64 imageData
+alanıdır. Bu okuyucu dosyayı mmap ile açar, üst seviye anahtarları tek tek
+gezer ve sadece istenen alanları (shapes, imageWidth, imageHeight) çözer.
+imageData gibi diğer değerlerin sadece sonu aranır; Python nesnesi oluşturulmaz.
+"""
+
+import json
+import mmap
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+LABELME_KEYS = ('shapes', 'imageWidth', 'imageHeight')
+
+_WHITESPACE = b' \t\r\n'
+_STRUCTURE = re.compile(rb'["\[\]{}]')  # Değer atlanırken bakılması gereken karakterler
+_SCALAR_END = re.compile(rb'[,}\s]')
+
+def _skip_whitespace(buf, pos: int) -> int:
+    while buf[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+def _string_end(buf, pos: int) -> int:
+    """pos'taki tırnakla başlayan dizginin bittiği konum (kapanış tırnağından sonrası)"""
+    end = pos + 1
+    while True:
+        end = buf.find(b'"', end)
+        if end < 0:
+            raise ValueError("Kapanmamış dizgi")
+        backslashes = 0
+        while buf[end - 1 - backslashes] == 0x5C:  # '\'
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return end + 1
+        end += 1
+
+def _value_end(buf, pos: int) -> int:
+    """pos'ta başlayan JSON değerinin bittiği konum (değeri çözmeden)"""
+    first = buf[pos]
+    if first == 0x22:  # '"'
+        return _string_end(buf, pos)
+    if first not in b'[{':
+        match = _SCALAR_END.search(buf, pos)
+        return match.start() if match else len(buf)
+    
+    depth = 0
+    while True:
+        match = _STRUCTURE.search(buf, pos)
+        if match is None:
+            raise ValueError("Kapanmamış dizi/nesne")
+        pos = match.start()
+        char = buf[pos]
+        if char == 0x22:
+            pos = _string_end(buf, pos)
+            continue
+        depth += 1 if char in b'[{' else -1
+        pos += 1
+        if depth == 0:
+            return pos
+
+def read_labelme_fields(json_path, keys: Tuple[str, ...] = LABELME_KEYS) -> dict:
+    """Üst seviye nesneden sadece keys alanlarını çözer; istenen alanlar bulununca okuma biter"""
+    wanted = set(keys)
+    fields = {}
+    with open(json_path, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            raise ValueError(f"Boş dosya: {json_path}")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            pos = _skip_whitespace(buf, 0)
+            if buf[pos] != 0x7B:  # '{'
+                raise ValueError(f"JSON nesnesi değil: {json_path}")
+            pos = _skip_whitespace(buf, pos + 1)
+            
+            while buf[pos] != 0x7D and wanted - fields.keys():  # '}'
+                key_end = _string_end(buf, pos)
+                key = json.loads(buf[pos:key_end])
+                pos = _skip_whitespace(buf, key_end)
+                if buf[pos] != 0x3A:  # ':'
+                    raise ValueError(f"Beklenmeyen karakter ({pos}): {json_path}")
+                pos = _skip_whitespace(buf, pos + 1)
+                
+                end = _value_end(buf, pos)
+                if key in wanted:
+                    fields[key] = json.loads(buf[pos:end])
+                pos = _skip_whitespace(buf, end)
+                if buf[pos] == 0x2C:  # ','
+                    pos = _skip_whitespace(buf, pos + 1)
+    return fields
+
+def shape_boxes(shapes: List[dict], label: Optional[str] = 'ship') -> List[Tuple[int, int, int, int]]:
+    """LabelMe şekillerinden (x, y, w, h) kutuları; label None ise tüm etiketler"""
+    boxes = []
+    for shape in shapes:
+        if label is not None and shape.get('label') != label:
+            continue
+        points = shape['points']
+        x_coords = [p[0] for p in points]
+        y_coords = [p[1] for p in points]
+        x_min, x_max = min(x_coords), max(x_coords)
+        y_min, y_max = min(y_coords), max(y_coords)
+        boxes.append((int(x_min), int(y_min), int(x_max - x_min), int(y_max - y_min)))
+    return boxes
+
+def read_labelme_boxes(json_path, label: Optional[str] = 'ship') -> Tuple[List[Tuple[int, int, int, int]], Optional[Tuple[int, int]]]:
+    """Kutular ve (genişlik, yükseklik); akışlı okuma başarısız olursa tam json.load"""
+    try:
+        fields = read_labelme_fields(json_path)
+    except (ValueError, IndexError):
+        with open(json_path, 'r') as f:
+            fields = json.load(f)
+    
+    size = None
+    if fields.get('imageWidth') and fields.get('imageHeight'):
+        size = (int(fields['imageWidth']), int(fields['imageHeight']))
+    return shape_boxes(fields.get('shapes', []), label), size
+
+def read_labelme_directory(json_dir, label: Optional[str] = 'ship', require_image: bool = False) -> Dict[str, tuple]:
+    """Klasördeki tüm LabelMe dosyaları: {dosya kökü: (kutular, (genişlik, yükseklik))}, ada göre sıralı"""
+    results = {}
+    for json_file in sorted(Path(json_dir).glob("*.json")):
+        if require_image and not json_file.with_suffix('.jpg').exists():
+            continue
+        results[json_file.stem] = read_labelme_boxes(json_file, label)
+    return results
+
+def benchmark_labelme(json_dir="data/json", txt_dir="data/txt", repeats: int = 3):
+    """Tam json.load, akışlı okuyucu ve YOLO yolu: klasör başına süre ve tepe bellek"""
+    import time
+    import tracemalloc
+    from ais_matcher import load_yolo_annotations
+    
+    json_files = sorted(Path(json_dir).glob("*.json"))
+    txt_files = sorted(Path(txt_dir).glob("*.txt"))
+    
+    def full_json():
+        for path in json_files:
+            with open(path, 'r') as f:
+                shape_boxes(json.load(f).get('shapes', []))
+    
+    def yolo():
+        for path in txt_files:
+            load_yolo_annotations(path, path.with_suffix('.jpg'))
+    
+    print(f"📑 LabelMe okuma ({len(json_files)} dosya, {sum(p.stat().st_size for p in json_files) / 1e6:.1f} MB)")
+    for name, run in (("tam json.load", full_json), ("akışlı", lambda: read_labelme_directory(json_dir)),
+                      (f"YOLO ({len(txt_files)} dosya)", yolo)):
+        run()  # Isınma (dosya önbelleği, OpenCV yüklemesi)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            run()
+        elapsed = (time.perf_counter() - start) / repeats * 1000
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  {name:<20} {elapsed:8.2f} ms, tepe bellek {peak / 1024:8.1f} KB")
+
+def test_labelme_parity(json_dir="data/json") -> bool:
+    """Akışlı okuyucu tam json.load ile aynı alanları verir"""
+    failures = 0
+    json_files = sorted(Path(json_dir).glob("*.json"))
+    for path in json_files:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        expected = {key: data[key] for key in LABELME_KEYS if key in data}
+        if read_labelme_fields(path) != expected:
+            failures += 1
+            print(f"  ❌ {path.name}")
+    ok = failures == 0
+    print(f"{'✅' if ok else '❌'} Akışlı/tam LabelMe uyumu: {len(json_files) - failures}/{len(json_files)}")
+    return ok
+
+if __name__ == "__main__":
+    print("🚢 Akışlı LabelMe Okuyucu")
+    print("=" * 40)
+    test_labelme_parity()
+    benchmark_labelme()
@@ -0,0 +1,236 @@
+"""
+Canlı Harita Görünümü
+=====================
+Video işlenirken AIS konumlarını, tespitlerin haritadaki izdüşümünü ve
+eşleştirme çizgilerini (create_visual_map'teki gibi) ayrı bir süreçte
+canlı gösterir.
+
+Video döngüsü sadece en güncel durumu kuyruğa bırakır; harita süreci
+yetişemezse eski güncellemeler atılır, kuyrukta birikme olmaz. Çizim
+mevcut Matplotlib artist'leri güncellenerek ve blitting ile yapılır.
+"""
+
+import math
+import multiprocessing as mp
+import queue
+import time
+from typing import Tuple
+
+import numpy as np
+
+class LiveMapView:
+    """run_video ile birlikte çalışan, bloklamayan canlı harita"""
+    
+    def __init__(self, matcher, refresh_hz: float = 10.0, extent_km: float = 6.0,
+                 default_range_km: float = 3.0, backend: str = 'TkAgg', snapshot_path: str = None):
+        self.fx = matcher.fx
+        self.cx = matcher.cx
+        self.refresh_hz = refresh_hz
+        self.extent_km = extent_km  # Başlangıç harita yarıçapı (km)
+        self.default_range_km = default_range_km  # Eşleşmeyen tespitler için varsayılan menzil
+        self.backend = backend
+        self.snapshot_path = snapshot_path  # Kapanışta son görüntünün kaydedileceği dosya
+        
+        self._context = mp.get_context('spawn')
+        self._queue = None
+        self._process = None
+        self._stats = None
+        self._last_sent = 0.0
+        
+        self.sent = 0  # Harita sürecine bırakılan güncelleme
+        self.skipped = 0  # Hız sınırı nedeniyle hiç gönderilmeyen güncelleme
+        self.dropped = 0  # Çizilmeden yerine yenisi konan eski güncelleme
+    
+    def start(self):
+        """Harita sürecini başlatır"""
+        self._queue = self._context.Queue(maxsize=1)
+        self._stats = self._context.Array('d', 2)  # [çizilen kare, toplam çizim süresi]
+        self._process = self._context.Process(
+            target=_live_map_loop,
+            args=(self._queue, self._stats, self.refresh_hz, self.extent_km, self.backend, self.snapshot_path),
+            daemon=True)
+        self._process.start()
+        return self
+    
+    def to_map_coordinates(self, ais_targets, detections, matches, own_position: Tuple[float, float]):
+        """AIS ve tespitleri kendi gemimize göre km koordinatlarına çevirir"""
+        own_lat, own_lon = own_position
+        lon_scale = 111.0 * math.cos(math.radians(own_lat))
+        
+        ais_xy = np.array([((t.lon - own_lon) * lon_scale, (t.lat - own_lat) * 111.0) for t in ais_targets],
+                          dtype=float).reshape(-1, 2)
+        
+        # Tespitin pikseli kameraya göre kerterizi verir; menzil eşleşen AIS'ten alınır
+        ranges = {id(detection): None for detection in detections}
+        for ais_target, detection, _ in matches:
+            ranges[id(detection)] = math.hypot((ais_target.lon - own_lon) * lon_scale, (ais_target.lat - own_lat) * 111.0)
+        
+        centers = np.array([detection.center[0] for detection in detections], dtype=float)
+        bearings = np.arctan((centers - self.cx) / self.fx)
+        det_range = np.array([self.default_range_km if ranges[id(d)] is None else ranges[id(d)] for d in detections],
+                             dtype=float)
+        det_xy = np.column_stack((det_range * np.sin(bearings), det_range * np.cos(bearings)))
+        
+        index = {id(detection): i for i, detection in enumerate(detections)}
+        ais_index = {id(target): i for i, target in enumerate(ais_targets)}
+        segments = np.array([(ais_xy[ais_index[id(a)]], det_xy[index[id(d)]]) for a, d, _ in matches
+                             if id(a) in ais_index and id(d) in index], dtype=float).reshape(-1, 2, 2)
+        confidences = np.array([c for a, d, c in matches if id(a) in ais_index and id(d) in index], dtype=float)
+        
+        return ais_xy, det_xy, segments, confidences
+    
+    def update(self, ais_targets, detections, matches, own_position: Tuple[float, float]):
+        """Yeni durumu haritaya bırakır; hiçbir zaman beklemez"""
+        if self._process is None or not self._process.is_alive():
+            return
+        
+        # Yenileme hızından sık gelen durumlar dönüştürülmeden atlanır
+        now = time.perf_counter()
+        if now - self._last_sent < 1.0 / self.refresh_hz:
+            self.skipped += 1
+            return
+        self._last_sent = now
+        
+        state = self.to_map_coordinates(ais_targets, detections, matches, own_position)
+        try:
+            self._queue.put_nowait(state)
+        except queue.Full:
+            # Çizilmemiş eski durumu at, yerine en yenisini koy
+            try:
+                self._queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(state)
+            except queue.Full:
+                self.dropped += 1
+                return
+        self.sent += 1
+    
+    def stop(self):
+        """Harita sürecini kapatır ve istatistikleri yazdırır"""
+        if self._process is None:
+            return
+        try:
+            self._queue.put(None, timeout=1.0)
+        except queue.Full:
+            pass
+        self._process.join(timeout=5.0)
+        if self._process.is_alive():
+            self._process.terminate()
+        
+        drawn, draw_time = self._stats[0], self._stats[1]
+        avg_ms = draw_time / drawn * 1000 if drawn else 0.0
+        print(f"🗺️ Canlı harita: {self.sent} gönderildi, {int(drawn)} çizildi, "
+              f"{self.dropped} eski güncelleme atıldı, {self.skipped} hız sınırıyla atlandı, ort. çizim {avg_ms:.1f} ms")
+        self._process = None
+
+def _confidence_colors(confidences):
+    """match_line_style ile aynı renk eşikleri"""
+    colors = np.empty((len(confidences), 4))
+    colors[:] = (1.0, 0.0, 0.0, 0.7)  # Kırmızı
+    colors[confidences > 0.6] = (1.0, 0.65, 0.0, 0.8)  # Turuncu
+    colors[confidences > 0.8] = (0.0, 0.5, 0.0, 0.9)  # Yeşil
+    return colors
+
+def _live_map_loop(state_queue, stats, refresh_hz, extent_km, backend, snapshot_path):
+    """Harita süreci: en güncel durumu alır, artist'leri günceller ve blitting ile çizer"""
+    import matplotlib
+    matplotlib.use(backend)
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+    
+    plt.ion()
+    fig, ax = plt.subplots(figsize=(9, 7))
+    ax.set_title('Canlı AIS-Kamera Haritası', fontsize=14, fontweight='bold')
+    ax.set_xlabel('X Koordinatı (km)')
+    ax.set_ylabel('Y Koordinatı (km)')
+    ax.grid(True, alpha=0.3, linestyle='--')
+    ax.set_aspect('equal', adjustable='box')
+    ax.scatter([0], [0], c='black', marker='*', s=200, label='Kamera')
+    
+    empty = np.empty((0, 2))
+    ais_scatter = ax.scatter(empty[:, 0], empty[:, 1], c='red', s=120, alpha=0.8, marker='o',
+                             edgecolors='darkred', label='AIS', animated=True)
+    det_scatter = ax.scatter(empty[:, 0], empty[:, 1], c='blue', s=90, alpha=0.7, marker='^',
+                             edgecolors='darkblue', label='Tespit', animated=True)
+    match_lines = LineCollection([], linewidths=2, animated=True)
+    ax.add_collection(match_lines)
+    info = ax.text(0.02, 0.98, '', transform=ax.transAxes, va='top', fontsize=9, animated=True)
+    ax.legend(loc='upper right')
+    animated = (match_lines, ais_scatter, det_scatter, info)
+    
+    extent = extent_km
+    background = None
+    
+    def capture_background(event=None):
+        """Her tam çizimde (ilk çizim, eksen sınırı değişimi, pencere boyutu) statik arka plan yeniden yakalanır"""
+        nonlocal background
+        background = fig.canvas.copy_from_bbox(fig.bbox)
+        for artist in animated:
+            ax.draw_artist(artist)
+    
+    def redraw_background():
+        """Eksen sınırlarını uygular ve tam çizim yapar (draw_event arka planı yakalar)"""
+        ax.set_xlim(-extent, extent)
+        ax.set_ylim(-extent * 0.25, extent * 1.5)
+        fig.canvas.draw()
+    
+    # Pencere boyutu değişince backend tam çizim yapar; eski arka plan bırakılırsa kalıntı kalır
+    fig.canvas.mpl_connect('draw_event', capture_background)
+    redraw_background()
+    plt.show(block=False)
+    min_interval = 1.0 / refresh_hz
+    last_draw = 0.0
+    
+    while True:
+        try:
+            state = state_queue.get(timeout=0.1)
+        except queue.Empty:
+            fig.canvas.flush_events()
+            continue
+        if state is None:
+            break
+        
+        # Çizim hızı sınırı: beklerken gelen daha yeni durum eskisinin yerine geçer
+        wait = min_interval - (time.perf_counter() - last_draw)
+        if wait > 0:
+            time.sleep(wait)
+            try:
+                newer = state_queue.get_nowait()
+                if newer is None:
+                    break
+                state = newer
+            except queue.Empty:
+                pass
+        
+        start = time.perf_counter()
+        ais_xy, det_xy, segments, confidences = state
+        
+        points = np.vstack((ais_xy, det_xy))
+        if len(points) and np.abs(points).max() > extent:
+            extent = float(np.abs(points).max()) * 1.2
+            redraw_background()
+        
+        ais_scatter.set_offsets(ais_xy)
+        det_scatter.set_offsets(det_xy)
+        match_lines.set_segments(segments)
+        match_lines.set_color(_confidence_colors(confidences))
+        info.set_text(f"AIS: {len(ais_xy)}  Tespit: {len(det_xy)}  Eşleşme: {len(segments)}")
+        
+        fig.canvas.restore_region(background)
+        for artist in animated:
+            ax.draw_artist(artist)
+        fig.canvas.blit(fig.bbox)
+        fig.canvas.flush_events()
+        
+        last_draw = time.perf_counter()
+        stats[0] += 1
+        stats[1] += last_draw - start
+    
+    if snapshot_path:
+        for artist in animated:
+            artist.set_animated(False)
+        fig.savefig(snapshot_path, dpi=100)
+    plt.close(fig)
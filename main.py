@@ -1,11 +1,40 @@
 #!/usr/bin/env python3
 """
 AIS-Kamera Eşleştirme Sistemi - Ana Script
+
+Argümansız çalıştırılırsa menü açılır. Alt komutlarla etkileşimsiz çalışır:
+    python main.py analyze [--data-dir data] [--store matches.db] [--gating] [--incremental | --watch [--interval S]]
+    python main.py video [VIDEO ...] [--no-display] [--max-frames N] [--live-map] [--store matches.db]
+                         [--realtime [--latency-budget MS] [--detect-every K]] [--roi [--full-scan-every N]]
+                         [--record out.mp4 [--record-codec mp4v] [--record-size WxH] [--record-policy drop|block]]
+                         [--onnx-model model.onnx [--intra-threads N] [--inter-threads N]]
+                         [--tiled [--tile-workers N] [--tile-overlap PX] [--tile-band 0.3:0.7]]
+    python main.py sweep [--fx 800:2400:10] [--max-distance 200:2000:10] [--min-score 0:0.45:10] [--csv out.csv]
+    python main.py simulate [--vessels 2000] [--detections 60] [--rate 10] [--duration 60] [--fast] [--gating]
+    python main.py profile [--frames 30] [--top 5] [--check]
+    python main.py history [--mmsi N] [--camera AD] [--since TS] [--until TS] [--db matches.db]
+    python main.py offline [VIDEO ...] [--workers N] [--segments N] [--output timeline.jsonl]
+    python main.py map [--image AD | --all] [--show] [--output-dir DIZIN] [--dpi N] [--format png]
+    python main.py bench [startup|solvers|store|detector|gating|transport|recorder|backend|ingest|tiles|video] [--model model.onnx]
+    python main.py bench video [--videos VIDEO ...] [--frames 300] [--warmup 30] [--no-render] [--repeats 3] [--report RAPOR.json]
+                               [--baseline taban.json [--save-baseline] [--tolerance 0.15]]
+
+OpenCV, SciPy ve Matplotlib sadece onlara ihtiyaç duyan komutta yüklenir.
 """
 
+import time
+_START = time.perf_counter()
+
+import argparse
+import subprocess
 import sys
 from pathlib import Path
 
+ROOT_DIR = Path(__file__).resolve().parent
+DEMO_DIR = ROOT_DIR / "demo"
+HEAVY_MODULES = ('cv2', 'scipy', 'matplotlib')
+COMMANDS = ('analyze', 'video', 'offline', 'map', 'sweep', 'simulate', 'profile', 'history', 'bench')
+
 def show_menu():
     print("🚢 AIS-Kamera Eşleştirme Sistemi")
     print("=" * 40)
@@ -22,6 +51,15 @@ def run_analysis():
     except Exception as e:
         print(f"Hata: {e}")
 
+def find_videos(data_dir="data"):
+    """Mevcut video dosyalarını bul"""
+    video_files = []
+    for i in range(1, 5):  # 1.mp4, 2.mp4, 3.mp4, 4.mp4
+        video_path = f"{data_dir}/videos/{i}.mp4"
+        if Path(video_path).exists():
+            video_files.append(video_path)
+    return video_files
+
 def run_video_test():
     print("Video testi başlatılıyor...")
     try:
@@ -29,11 +67,7 @@ def run_video_test():
         detector = SimpleDetector()
         
         # Mevcut video dosyalarını bul
-        video_files = []
-        for i in range(1, 5):  # 1.mp4, 2.mp4, 3.mp4, 4.mp4
-            video_path = f"data/videos/{i}.mp4"
-            if Path(video_path).exists():
-                video_files.append(video_path)
+        video_files = find_videos()
         
         if not video_files:
             print("❌ Video dosyası bulunamadı!")
@@ -91,5 +125,488 @@ def main():
             
         input("\nDevam etmek için Enter'a basın...")
 
+# --- Etkileşimsiz komut satırı arayüzü ---
+
+def prepare_command(command):
+    """Komutun ihtiyaç duyduğu modülleri yükler ve çalıştırıcı fonksiyonu döndürür"""
+    if command == 'analyze':
+        import ais_matcher  # noqa: F401 (numpy; OpenCV ilk görüntü okunurken)
+        return cmd_analyze
+    if command == 'video':
+        import simple_detector  # noqa: F401 (OpenCV)
+        return cmd_video
+    if command == 'offline':
+        import offline_video  # noqa: F401 (OpenCV sadece süreçlerde)
+        return cmd_offline
+    if command == 'map':
+        sys.path.insert(0, str(DEMO_DIR))
+        import visual_map_demo  # noqa: F401 (Matplotlib sadece çizimde)
+        return cmd_map
+    if command == 'sweep':
+        import evaluation  # noqa: F401 (numpy; OpenCV ve SciPy veri yüklenirken)
+        return cmd_sweep
+    if command == 'simulate':
+        import simulator  # noqa: F401 (numpy; SciPy ilk eşleştirmede)
+        return cmd_simulate
+    if command == 'profile':
+        import memory_profile  # noqa: F401 (OpenCV ve SciPy profil başlarken)
+        return cmd_profile
+    if command == 'history':
+        import match_store  # noqa: F401 (sadece sqlite3)
+        return cmd_history
+    return cmd_bench
+
+def open_store(db_path):
+    """--store verilmişse eşleştirme geçmişi deposunu açar"""
+    if not db_path:
+        return None
+    from match_store import MatchStore
+    return MatchStore(db_path)
+
+def cmd_analyze(args):
+    from ais_matcher import process_test_data
+    store = open_store(args.store)
+    manifest_path = args.manifest or str(Path(args.data_dir) / ".analyze_manifest.json")
+    try:
+        if args.watch:
+            from dataset_manifest import watch_dataset
+            watch_dataset(args.data_dir, manifest_path, interval=args.interval, gating=args.gating or None,
+                          match_store=store)
+        else:
+            manifest = None
+            if args.incremental:
+                from dataset_manifest import DatasetManifest
+                manifest = DatasetManifest(manifest_path, args.data_dir)
+            process_test_data(args.data_dir, match_store=store, gating=args.gating or None, manifest=manifest)
+    finally:
+        if store is not None:
+            store.close()
+            print(f"💾 {store.written} eşleştirme kaydedildi: {args.store}")
+
+def open_recorder(args, video, video_count):
+    """--record verildiyse VideoRecorder; birden çok videoda dosya adına video adı eklenir"""
+    if not args.record:
+        return None
+    from video_recorder import VideoRecorder
+    
+    path = Path(args.record)
+    if video_count > 1:
+        path = path.with_name(f"{path.stem}_{Path(video).stem}{path.suffix}")
+    size = tuple(int(v) for v in args.record_size.lower().split('x')) if args.record_size else None
+    return VideoRecorder(str(path), codec=args.record_codec, size=size, max_pending=args.record_queue,
+                         policy=args.record_policy)
+
+def cmd_video(args):
+    from simple_detector import SimpleDetector
+    
+    video_files = args.videos or find_videos(args.data_dir)
+    if not video_files:
+        print("❌ Video dosyası bulunamadı!")
+        return 1
+    
+    backend = None
+    if args.onnx_model:
+        from detector_backends import OnnxYoloBackend
+        backend = OnnxYoloBackend(args.onnx_model, max_batch=1, intra_op_threads=args.intra_threads,
+                                  inter_op_threads=args.inter_threads)
+    tiling = None
+    if args.tiled:
+        from tiled_detection import TiledDetection
+        band = tuple(float(v) for v in args.tile_band.split(':'))
+        tiling = TiledDetection(overlap=args.tile_overlap, band=None if band == (0.0, 1.0) else band,
+                                workers=args.tile_workers)
+    detector = SimpleDetector(gating=args.gating or None, backend=backend, tiling=tiling)
+    store = open_store(args.store)
+    scheduler = None
+    if args.realtime:
+        from frame_scheduler import FrameScheduler
+        scheduler = FrameScheduler(args.latency_budget, args.detect_every)
+    roi = None
+    if args.roi:
+        from roi_detection import AISGuidedROI
+        roi = AISGuidedROI(detector.matcher, full_scan_every=args.full_scan_every)
+    live_map = None
+    if args.live_map:
+        from live_map import LiveMapView
+        live_map = LiveMapView(detector.matcher, refresh_hz=args.live_map_hz).start()
+    
+    try:
+        for video in video_files:
+            print(f"\n🎥 Video çalıştırılıyor: {video}")
+            recorder = open_recorder(args, video, len(video_files))
+            try:
+                detector.run_video(video, display=not args.no_display, max_frames=args.max_frames,
+                                   live_map=live_map, match_store=store, scheduler=scheduler, roi=roi,
+                                   recorder=recorder)
+            finally:
+                if recorder is not None:
+                    recorder.close()
+                    print(f"🎬 {recorder.path}: {recorder.report()}")
+    finally:
+        if tiling is not None:
+            tiling.close()
+        if live_map is not None:
+            live_map.stop()
+        if store is not None:
+            store.close()
+            print(f"💾 {store.written} eşleştirme kaydedildi, {store.dropped} atıldı: {args.store}")
+
+def cmd_offline(args):
+    import offline_video
+    
+    video_files = args.videos or find_videos(args.data_dir)
+    if not video_files:
+        print("❌ Video dosyası bulunamadı!")
+        return 1
+    
+    for video in video_files:
+        result = offline_video.process_video_offline(video, workers=args.workers, num_segments=args.segments,
+                                                     overlap=args.overlap, max_frames=args.max_frames)
+        if not result['frames']:
+            print(f"❌ Video okunamadı: {video}")
+            continue
+        matched = sum(len(record['matches']) for record in result['frames'])
+        print(f"🎬 {video}: {len(result['frames'])} kare, {result['tracks']} takip, {matched} eşleştirme; "
+              f"{result['segments']} parça / {result['workers']} süreç, {result['elapsed']:.2f} s "
+              f"({len(result['frames']) / result['elapsed']:.1f} kare/s)")
+        if args.output:
+            output = Path(args.output)
+            if len(video_files) > 1:
+                output = output.with_name(f"{output.stem}_{Path(video).stem}{output.suffix}")
+            offline_video.save_timeline(result, output)
+            print(f"  Zaman çizelgesi: {output}")
+
+def cmd_map(args):
+    import visual_map_demo as vmd
+    
+    data_dir = Path(args.data_dir)
+    ais_points = vmd.load_ais_data(data_dir / "sample_ais.json")
+    if not ais_points:
+        print("AIS verisi bulunamadı!")
+        return 1
+    
+    available_images = vmd.get_available_images(data_dir)
+    if args.image:
+        if args.image not in available_images:
+            print(f"❌ Görüntü bulunamadı: {args.image}")
+            return 1
+        available_images = [args.image]
+    
+    if args.all and not args.show:
+        # Penceresiz toplu çizim: süreç havuzu, figür yeniden kullanımı
+        vmd.render_all_maps(data_dir, args.output_dir, dpi=args.dpi, fmt=args.format,
+                            workers=args.workers, max_distance=args.max_distance)
+        return
+    
+    render = bool(args.image) or args.all
+    Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+    
+    for image_name in available_images:
+        result = vmd.process_single_image(ais_points, image_name, data_dir, args.max_distance)
+        if result and render:
+            vmd.create_visual_map(result['ais_points'], result['detection_points'], result['matches'],
+                                  image_name, show=args.show, output_dir=args.output_dir)
+            print(f"  Görsel harita: {Path(args.output_dir) / f'visual_map_{image_name}.png'}")
+
+def parse_grid(text):
+    """'başlangıç:bitiş:adet' veya virgüllü değer listesini diziye çevirir"""
+    if text is None:
+        return None
+    if ':' in text:
+        start, stop, num = text.split(':')
+        import numpy as np
+        return np.linspace(float(start), float(stop), int(num))
+    return [float(value) for value in text.split(',')]
+
+def cmd_sweep(args):
+    from evaluation import run_sweep
+    results = run_sweep(args.data_dir, parse_grid(args.fx), parse_grid(args.max_distance), parse_grid(args.min_score),
+                        cx_values=parse_grid(args.cx) or (960,), top=args.top, csv_path=args.csv, solver=args.solver)
+    return 0 if results else 1
+
+def cmd_simulate(args):
+    from ais_matcher import AISMatcher
+    from simulator import VesselScenario, print_report, run_simulation
+    
+    scenario = VesselScenario(num_vessels=args.vessels, max_detections=args.detections, seed=args.seed,
+                              dropout=args.dropout, position_noise_m=args.position_noise)
+    matcher = AISMatcher(solver=args.solver, gating=args.gating or None)
+    store = open_store(args.store)
+    mode = "olabildiğince hızlı" if args.fast else "gerçek zamanlı"
+    print(f"🧪 Simülasyon: {args.vessels} gemi, kare başına en fazla {args.detections} tespit, "
+          f"{args.rate:g} Hz, {args.duration:g} s ({mode})")
+    try:
+        result = run_simulation(scenario, matcher, rate_hz=args.rate, duration_s=args.duration,
+                                realtime=not args.fast, match_store=store)
+    finally:
+        if store is not None:
+            store.close()
+    print_report(result, args.rate)
+    if matcher.gating is not None:
+        print(f"  Kademeli eleme: {matcher.gating.report()}")
+
+def cmd_profile(args):
+    import memory_profile
+    
+    print(f"🧠 Bellek profili (tracemalloc, {args.frames} kare, {args.vessels} gemilik sahne)")
+    profiler = memory_profile.profile_pipeline(args.data_dir, args.video, frames=args.frames,
+                                               num_vessels=args.vessels, top=args.top)
+    print(profiler.report())
+    if args.check:
+        print("\n📏 Bellek bütçesi testleri")
+        return 0 if memory_profile.run_budget_tests() else 1
+
+def cmd_history(args):
+    from match_store import MatchStore
+    
+    if not Path(args.db).exists():
+        print(f"❌ Veritabanı bulunamadı: {args.db}")
+        return 1
+    
+    with MatchStore(args.db) as store:
+        if args.mmsi is None:
+            # MMSI verilmezse aralıkta görülen gemilerin özeti
+            vessels = store.vessels_seen(args.since, args.until, camera=args.camera)
+            print(f"🚢 {len(vessels)} gemi görüldü")
+            for row in vessels[:args.limit]:
+                print(f"  MMSI={row['mmsi']}: {row['count']} eşleştirme, son görülme {time.ctime(row['last_seen'])}")
+            return
+        
+        last = store.last_seen(args.mmsi, camera=args.camera)
+        if last is None:
+            print(f"MMSI={args.mmsi} için kayıt yok")
+            return
+        print(f"🚢 MMSI={args.mmsi} son görülme: {time.ctime(last['ts'])} (kamera {last['camera']}, kare {last['frame']})")
+        for row in store.vessel_history(args.mmsi, args.since, args.until, camera=args.camera)[-args.limit:]:
+            print(f"  {time.ctime(row['ts'])}  kamera={row['camera']}  kare={row['frame']}  güven={row['confidence']:.3f}")
+
+def measure_startup(command, repeats=3):
+    """Komutun soğuk başlangıç süresini ayrı süreçlerde ölçer (ms, yüklenen ağır modüller)"""
+    timings = []
+    loaded = ''
+    for _ in range(repeats):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, str(ROOT_DIR / "main.py"), '--prepare-only', command],
+                                capture_output=True, text=True, cwd=ROOT_DIR).stdout
+        timings.append((time.perf_counter() - start) * 1000)
+        loaded = output.strip()
+    return sorted(timings)[len(timings) // 2], loaded
+
+def cmd_bench(args):
+    if args.target == 'solvers':
+        import assignment_solvers
+        assignment_solvers.test_solver_parity()
+        assignment_solvers.benchmark_solvers()
+        assignment_solvers.benchmark_matcher()
+        assignment_solvers.test_batch_parity()
+        assignment_solvers.benchmark_batch()
+        import matching_engine
+        matching_engine.test_adapter_parity()
+        return
+    if args.target == 'transport':
+        import shared_frames
+        shared_frames.benchmark_transport()
+        return
+    if args.target == 'gating':
+        import gating
+        gating.benchmark_gating()
+        return
+    if args.target == 'detector':
+        import simple_detector
+        simple_detector.benchmark_detection()
+        import roi_detection
+        roi_detection.benchmark_roi()
+        return
+    if args.target == 'backend':
+        import detector_backends
+        detector_backends.benchmark_backend(args.model, batch_sizes=[int(b) for b in args.batch_sizes.split(',')],
+                                            intra_op_threads=args.intra_threads, inter_op_threads=args.inter_threads)
+        return
+    if args.target == 'video':
+        import video_benchmark
+        ok = video_benchmark.benchmark_video(args.videos, args.frames, args.warmup, not args.no_render,
+                                             args.report or video_benchmark.DEFAULT_REPORT,
+                                             args.baseline, args.save_baseline, args.tolerance, args.repeats)
+        return 0 if ok else 1
+    if args.target == 'tiles':
+        import tiled_detection
+        tiled_detection.benchmark_tiling()
+        return
+    if args.target == 'ingest':
+        import ais_ingest
+        ais_ingest.benchmark_ingest(args.vessels, args.ais_file)
+        return
+    if args.target == 'recorder':
+        import video_recorder
+        video_recorder.benchmark_recorder()
+        return
+    if args.target == 'store':
+        import match_store
+        match_store.benchmark_ingest()
+        return
+    
+    # Referans: tüm ağır modülleri baştan yükleyen süreç
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'import numpy, cv2, scipy.optimize, matplotlib.pyplot'], capture_output=True)
+    eager_ms = (time.perf_counter() - start) * 1000
+    
+    print("⏱️ Soğuk başlangıç süreleri (medyan, ayrı süreç)")
+    print(f"  {'tüm ağır modüller':<18} {eager_ms:>8.1f} ms")
+    for command in COMMANDS:
+        startup_ms, loaded = measure_startup(command, args.repeats)
+        print(f"  {command:<18} {startup_ms:>8.1f} ms  ({loaded})")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="AIS-Kamera Eşleştirme Sistemi")
+    parser.add_argument('--timing', action='store_true', help="başlangıç ve toplam süreyi yazdır")
+    parser.add_argument('--prepare-only', action='store_true', help=argparse.SUPPRESS)
+    subparsers = parser.add_subparsers(dest='command')
+    
+    analyze = subparsers.add_parser('analyze', help="test verilerini analiz et")
+    analyze.add_argument('--data-dir', default='data')
+    analyze.add_argument('--store', help="eşleştirmeleri bu SQLite veritabanına kaydet")
+    analyze.add_argument('--gating', action='store_true', help="kerteriz/boyut/en-boy kapılarıyla çiftleri önceden ele")
+    analyze.add_argument('--incremental', action='store_true', help="sadece yeni/değişen görüntüleri işle (manifest önbelleği)")
+    analyze.add_argument('--watch', action='store_true', help="klasörü yokla, yeni gelen görüntüleri artımlı işle")
+    analyze.add_argument('--interval', type=float, default=2.0, help="izleme yoklama aralığı (s)")
+    analyze.add_argument('--manifest', help="manifest dosyası (varsayılan: DATA_DIR/.analyze_manifest.json)")
+    
+    video = subparsers.add_parser('video', help="video üzerinde tespit ve eşleştirme")
+    video.add_argument('videos', nargs='*', help="video dosyaları (varsayılan: data/videos/*.mp4)")
+    video.add_argument('--data-dir', default='data')
+    video.add_argument('--no-display', action='store_true', help="pencere açmadan çalış")
+    video.add_argument('--max-frames', type=int, default=None)
+    video.add_argument('--live-map', action='store_true', help="canlı haritayı ayrı süreçte göster")
+    video.add_argument('--live-map-hz', type=float, default=10.0, help="canlı harita yenileme sınırı")
+    video.add_argument('--store', help="eşleştirmeleri bu SQLite veritabanına kaydet")
+    video.add_argument('--gating', action='store_true', help="kerteriz/boyut/en-boy kapılarıyla çiftleri önceden ele")
+    video.add_argument('--realtime', action='store_true', help="gecikme bütçeli gerçek zamanlı mod (kare atlama, takip)")
+    video.add_argument('--latency-budget', type=float, default=100.0, help="uçtan uca gecikme bütçesi (ms)")
+    video.add_argument('--detect-every', type=int, default=3, help="tam tespit aralığı (kare), arası takip")
+    video.add_argument('--roi', action='store_true', help="tespiti sadece AIS projeksiyonu etrafındaki pencerelerde çalıştır")
+    video.add_argument('--full-scan-every', type=int, default=30, help="ROI modunda tüm kare tarama aralığı (kare)")
+    video.add_argument('--record', help="çizilmiş kareleri bu dosyaya kaydet (arka planda kodlanır)")
+    video.add_argument('--record-codec', default='mp4v', help="FourCC kodek (mp4v, XVID, MJPG)")
+    video.add_argument('--record-size', help="kayıt çözünürlüğü, ör. 1280x720 (varsayılan: kare boyutu)")
+    video.add_argument('--record-policy', choices=['drop', 'block'], default='drop',
+                       help="kodlayıcı geride kalınca: kare at (drop) veya döngüyü beklet (block)")
+    video.add_argument('--record-queue', type=int, default=32, help="kodlama kuyruğu uzunluğu (kare)")
+    video.add_argument('--onnx-model', help="Canny yerine bu YOLO ONNX modeliyle tespit (onnxruntime, CPU)")
+    video.add_argument('--intra-threads', type=int, default=None, help="ONNX Runtime operatör içi iş parçacığı")
+    video.add_argument('--inter-threads', type=int, default=None, help="ONNX Runtime operatörler arası iş parçacığı")
+    video.add_argument('--tiled', action='store_true', help="ufuk bandını örtüşen döşemelere bölüp paralel tespit et")
+    video.add_argument('--tile-workers', type=int, default=None, help="döşeme iş parçacığı (varsayılan: CPU sayısı)")
+    video.add_argument('--tile-overlap', type=int, default=256, help="döşeme örtüşmesi (piksel)")
+    video.add_argument('--tile-band', default='0.3:0.7', help="taranacak satırlar, yüksekliğin oranı (0:1 tüm kare)")
+    
+    offline = subparsers.add_parser('offline', help="kayıtlı videoyu parçalara bölüp paralel işle")
+    offline.add_argument('videos', nargs='*', help="video dosyaları (varsayılan: data/videos/*.mp4)")
+    offline.add_argument('--data-dir', default='data')
+    offline.add_argument('--workers', type=int, default=None, help="süreç sayısı (varsayılan: CPU sayısı)")
+    offline.add_argument('--segments', type=int, default=None, help="parça sayısı (varsayılan: süreç sayısı)")
+    offline.add_argument('--overlap', type=int, default=5, help="takip birleştirme için örtüşen kare sayısı")
+    offline.add_argument('--max-frames', type=int, default=None)
+    offline.add_argument('--output', help="kare başına JSON satırı (JSONL) zaman çizelgesi")
+    
+    map_parser = subparsers.add_parser('map', help="görsel harita demosu")
+    map_parser.add_argument('--data-dir', default='data')
+    map_parser.add_argument('--image', help="sadece bu görüntünün haritasını çiz")
+    map_parser.add_argument('--all', action='store_true', help="tüm görüntülerin haritalarını çiz")
+    map_parser.add_argument('--show', action='store_true', help="haritayı pencerede göster")
+    map_parser.add_argument('--output-dir', default='.')
+    map_parser.add_argument('--max-distance', type=float, default=10.0)
+    map_parser.add_argument('--dpi', type=int, default=150, help="toplu çizim çözünürlüğü (--all)")
+    map_parser.add_argument('--format', default='png', choices=['png', 'jpg', 'pdf', 'svg'])
+    map_parser.add_argument('--workers', type=int, default=None, help="süreç sayısı (varsayılan: CPU sayısı)")
+    
+    sweep = subparsers.add_parser('sweep', help="eşleştirme parametre taraması")
+    sweep.add_argument('--data-dir', default='data')
+    sweep.add_argument('--fx', help="odak uzaklığı ızgarası, örn. 800:2400:10 veya 1400,1600")
+    sweep.add_argument('--cx', help="optik merkez x ızgarası (varsayılan: 960)")
+    sweep.add_argument('--max-distance', help="maksimum mesafe ızgarası (piksel)")
+    sweep.add_argument('--min-score', help="minimum skor ızgarası")
+    sweep.add_argument('--solver', default=None, choices=['hungarian', 'auction', 'greedy'])
+    sweep.add_argument('--top', type=int, default=10)
+    sweep.add_argument('--csv', help="tüm sonuçları bu CSV dosyasına yaz")
+    
+    simulate = subparsers.add_parser('simulate', help="sentetik yük ve dayanıklılık testi")
+    simulate.add_argument('--vessels', type=int, default=2000)
+    simulate.add_argument('--detections', type=int, default=60, help="kare başına en fazla tespit")
+    simulate.add_argument('--rate', type=float, default=10.0, help="kare hızı (Hz)")
+    simulate.add_argument('--duration', type=float, default=60.0, help="simüle edilen süre (s); soak için örn. 3600")
+    simulate.add_argument('--fast', action='store_true', help="hız sınırı olmadan olabildiğince hızlı çalış")
+    simulate.add_argument('--dropout', type=float, default=0.1, help="AIS raporu kaybolma olasılığı")
+    simulate.add_argument('--position-noise', type=float, default=10.0, help="AIS konum gürültüsü (m)")
+    simulate.add_argument('--seed', type=int, default=0)
+    simulate.add_argument('--solver', default=None, choices=['hungarian', 'auction', 'greedy'])
+    simulate.add_argument('--gating', action='store_true')
+    simulate.add_argument('--store', help="eşleştirmeleri bu SQLite veritabanına da yaz")
+    
+    profile = subparsers.add_parser('profile', help="aşama başına bellek profili ve bütçe testleri")
+    profile.add_argument('--data-dir', default='data')
+    profile.add_argument('--video', default='data/videos/4.mp4')
+    profile.add_argument('--frames', type=int, default=30)
+    profile.add_argument('--vessels', type=int, default=2000, help="büyük sahne eşleştirme aşaması için gemi sayısı")
+    profile.add_argument('--top', type=int, default=5, help="aşama başına gösterilecek ayırma satırı")
+    profile.add_argument('--check', action='store_true', help="bellek bütçesi testlerini de çalıştır (başarısızsa çıkış kodu 1)")
+    
+    history = subparsers.add_parser('history', help="kaydedilmiş eşleştirme geçmişini sorgula")
+    history.add_argument('--db', default='matches.db')
+    history.add_argument('--mmsi', type=int, help="bu geminin son görülmesi ve geçmişi")
+    history.add_argument('--camera', help="sadece bu kamera (video/görüntü adı)")
+    history.add_argument('--since', type=float, help="başlangıç zamanı (Unix zamanı)")
+    history.add_argument('--until', type=float, help="bitiş zamanı (Unix zamanı)")
+    history.add_argument('--limit', type=int, default=20)
+    
+    bench = subparsers.add_parser('bench', help="performans ölçümleri")
+    bench.add_argument('target', nargs='?', default='startup',
+                       choices=['startup', 'solvers', 'store', 'detector', 'gating', 'transport', 'recorder', 'backend',
+                                'ingest', 'tiles', 'video'])
+    bench.add_argument('--repeats', type=int, default=3,
+                       help="tekrar sayısı (başlangıç ölçümü; bench video: video başına ölçüm, medyan)")
+    bench.add_argument('--model', default='models/ship_yolo.onnx', help="bench backend için YOLO ONNX modeli")
+    bench.add_argument('--batch-sizes', default='1,2,4,8', help="bench backend toplu boyutları")
+    bench.add_argument('--intra-threads', type=int, default=None)
+    bench.add_argument('--inter-threads', type=int, default=None)
+    bench.add_argument('--vessels', type=int, default=100000, help="bench ingest sentetik gemi sayısı")
+    bench.add_argument('--ais-file', help="bench ingest için sentetik yerine bu AIS JSON dosyası")
+    bench.add_argument('--videos', nargs='+', help="bench video klipleri (varsayılan: data/videos/1.mp4 ve 4.mp4)")
+    bench.add_argument('--frames', type=int, default=300, help="bench video ölçülen kare sayısı (ısınma hariç)")
+    bench.add_argument('--warmup', type=int, default=30, help="bench video ısınma karesi")
+    bench.add_argument('--no-render', action='store_true', help="bench video: sonuçları karelere çizme")
+    bench.add_argument('--report', default=None,
+                       help="bench video JSON raporu (varsayılan: geçici dizinde video_bench.json)")
+    bench.add_argument('--baseline', help="bench video taban raporu (yoksa bu çalışma taban olarak kaydedilir)")
+    bench.add_argument('--save-baseline', action='store_true', help="bench video: tabanı bu çalışmayla değiştir")
+    bench.add_argument('--tolerance', type=float, default=0.15, help="bench video gerileme toleransı (oran)")
+    
+    return parser
+
+def run_cli(argv):
+    args = build_parser().parse_args(argv)
+    
+    if args.prepare_only:
+        # bench startup için: sadece komutun modüllerini yükle ve çık
+        prepare_command(argv[-1])
+        print(' '.join(m for m in HEAVY_MODULES if m in sys.modules) or 'ağır modül yok')
+        return 0
+    
+    if args.command is None:
+        build_parser().print_help()
+        return 1
+    
+    runner = prepare_command(args.command)
+    ready = time.perf_counter()
+    
+    code = runner(args)
+    
+    if args.timing:
+        loaded = ', '.join(m for m in HEAVY_MODULES if m in sys.modules) or 'yok'
+        print(f"\n⏱️ Başlangıç: {(ready - _START) * 1000:.1f} ms, toplam: {(time.perf_counter() - _START) * 1000:.1f} ms (yüklenen: {loaded})")
+    return code or 0
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
     main()
+
@@ -0,0 +1,145 @@
+"""
+Yapılandırılmış Eşleştirme Sonuçları
+====================================
+AISMatcher.match_targets sonucu, atama çıktısından doğrudan doldurulan bir
+NumPy yapılandırılmış dizisidir (MATCH_DTYPE). Sütunlar toplu işlenebilir,
+dilimleme kopyasızdır ve .npy / CSV / JSONL olarak tek seferde yazılır.
+
+Eski (ais_target, detection, confidence) demet biçimi tembel bir görünüm
+olarak korunur: yineleme veya indeksleme ilk kez yapıldığında oluşturulur.
+"""
+
+import json
+from typing import List, Optional
+
+import numpy as np
+
+MATCH_DTYPE = np.dtype([
+    ('ais_index', np.int32),  # ais_targets listesindeki sıra
+    ('det_index', np.int32),  # detections listesindeki sıra
+    ('mmsi', np.int64),
+    ('pixel_error', np.float64),  # Projeksiyon ile tespit merkezi arası (piksel)
+    ('world_error', np.float64),  # AIS menzilinde yanal sapma (metre)
+    ('confidence', np.float64),
+])
+
+CSV_FORMATS = {'ais_index': '%d', 'det_index': '%d', 'mmsi': '%d', 'pixel_error': '%.3f', 'world_error': '%.3f',
+               'confidence': '%.6f'}
+
+class MatchResult:
+    """Eşleştirme sonuçları: records yapılandırılmış dizisi ve tembel demet görünümü"""
+    
+    def __init__(self, records: Optional[np.ndarray] = None, ais_targets: Optional[list] = None,
+                 detections: Optional[list] = None):
+        self.records = np.zeros(0, dtype=MATCH_DTYPE) if records is None else records
+        self.ais_targets = ais_targets  # Demet görünümü için kaynak nesneler (dosyadan yüklenince None)
+        self.detections = detections
+        self._tuples = None
+    
+    @classmethod
+    def from_arrays(cls, ais_index, det_index, mmsi, pixel_error, world_error, confidence,
+                    ais_targets: Optional[list] = None, detections: Optional[list] = None) -> "MatchResult":
+        records = np.empty(len(ais_index), dtype=MATCH_DTYPE)
+        records['ais_index'] = ais_index
+        records['det_index'] = det_index
+        records['mmsi'] = mmsi
+        records['pixel_error'] = pixel_error
+        records['world_error'] = world_error
+        records['confidence'] = confidence
+        return cls(records, ais_targets, detections)
+    
+    # --- Demet görünümü (geriye uyumluluk) ---
+    
+    def _require_objects(self):
+        if self.ais_targets is None or self.detections is None:
+            raise ValueError("Demet görünümü için ais_targets ve detections gerekli (sadece records yüklenmiş)")
+    
+    def _tuple(self, record) -> tuple:
+        self._require_objects()
+        return (self.ais_targets[record['ais_index']], self.detections[record['det_index']], float(record['confidence']))
+    
+    def tuples(self) -> List[tuple]:
+        """(ais_target, detection, confidence) listesi; ilk çağrıda oluşturulur"""
+        if self._tuples is None:
+            self._require_objects()
+            ais_targets, detections = self.ais_targets, self.detections
+            self._tuples = [(ais_targets[i], detections[j], c) for i, j, c in
+                            zip(self.records['ais_index'].tolist(), self.records['det_index'].tolist(),
+                                self.records['confidence'].tolist())]
+        return self._tuples
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def __iter__(self):
+        return iter(self.tuples())
+    
+    def __getitem__(self, key):
+        """int: demet, str: sütun (görünüm), dilim/maske: yeni MatchResult (dilimde kopyasız)"""
+        if isinstance(key, str):
+            return self.records[key]
+        if isinstance(key, (int, np.integer)):
+            return self.tuples()[key] if self._tuples is not None else self._tuple(self.records[key])
+        return MatchResult(self.records[key], self.ais_targets, self.detections)
+    
+    def __repr__(self):
+        return f"MatchResult({len(self)} eşleştirme)"
+    
+    # --- Toplu dışa aktarma ---
+    
+    def save_npy(self, path):
+        np.save(path, self.records)
+    
+    @classmethod
+    def load_npy(cls, path) -> "MatchResult":
+        """save_npy ile yazılmış sonuçlar (nesneler olmadan; demet görünümü kullanılamaz)"""
+        return cls(np.load(path))
+    
+    def save_csv(self, path):
+        names = self.records.dtype.names
+        np.savetxt(path, self.records, fmt=[CSV_FORMATS[name] for name in names], delimiter=',',
+                   header=','.join(names), comments='')
+    
+    def save_jsonl(self, path):
+        names = self.records.dtype.names
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(dict(zip(names, row))) + '\n' for row in self.records.tolist())
+
+def test_export_roundtrip(num_ais: int = 200, num_detections: int = 40, seed: int = 0) -> bool:
+    """Dışa aktarılan dosyalar aynı kayıtları verir, dilim kopyasızdır, demet görünümü eski biçimle aynıdır"""
+    import tempfile
+    from pathlib import Path
+    from ais_matcher import AISMatcher, AISTarget, DetectedShip
+    
+    rng = np.random.default_rng(seed)
+    ais_targets = [AISTarget(200000000 + i, 40.0 + rng.uniform(0.005, 0.05), 32.0 + rng.uniform(-0.04, 0.04),
+                             rng.uniform(30, 300), rng.uniform(8, 45)) for i in range(num_ais)]
+    detections = [DetectedShip((int(rng.integers(0, 1800)), int(rng.integers(400, 650)), int(rng.integers(20, 300)),
+                                int(rng.integers(10, 120))), float(rng.uniform(0.3, 1.0))) for _ in range(num_detections)]
+    result = AISMatcher().match_targets(ais_targets, detections, (40.0, 32.0))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        result.save_npy(tmp / "matches.npy")
+        result.save_csv(tmp / "matches.csv")
+        result.save_jsonl(tmp / "matches.jsonl")
+        loaded = MatchResult.load_npy(tmp / "matches.npy")
+        csv_rows = np.loadtxt(tmp / "matches.csv", delimiter=',', skiprows=1, ndmin=2)
+        with open(tmp / "matches.jsonl", encoding='utf-8') as f:
+            json_rows = [json.loads(line) for line in f]
+    
+    checks = {
+        'npy': np.array_equal(loaded.records, result.records),
+        'csv': len(csv_rows) == len(result) and np.array_equal(csv_rows[:, 2].astype(np.int64), result['mmsi']),
+        'jsonl': [row['mmsi'] for row in json_rows] == result['mmsi'].tolist(),
+        'dilim': np.shares_memory(result[1:].records, result.records),
+        'demet': all(ais.mmsi == mmsi and ais is ais_targets[i] and det is detections[j]
+                     for (ais, det, _), mmsi, i, j in zip(result, result['mmsi'], result['ais_index'], result['det_index'])),
+    }
+    ok = all(checks.values()) and len(result) > 0
+    print(f"{'✅' if ok else '❌'} MatchResult ({len(result)} eşleştirme): "
+          + ', '.join(f"{name} {'tamam' if passed else 'HATALI'}" for name, passed in checks.items()))
+    return ok
+
+if __name__ == "__main__":
+    test_export_roundtrip()
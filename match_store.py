@@ -0,0 +1,265 @@
+"""
+Eşleştirme Geçmişi Deposu
+=========================
+match_targets ve run_video eşleştirmelerini SQLite (WAL) veritabanına kaydeder.
+
+Kayıt arka plandaki yazıcı iş parçacığında toplu (executemany, tek transaction)
+yapılır; video döngüsü sadece kuyruğa bırakır ve beklemez. MMSI, zaman ve kamera
+üzerindeki indeksler sayesinde "MMSI X kamera 2'de en son ne zaman görüldü"
+gibi sorgular yeniden işleme yapmadan cevaplanır.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    camera TEXT NOT NULL,
+    frame INTEGER,
+    mmsi INTEGER NOT NULL,
+    confidence REAL NOT NULL,
+    x INTEGER, y INTEGER, w INTEGER, h INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_matches_mmsi_ts ON matches (mmsi, ts);
+CREATE INDEX IF NOT EXISTS idx_matches_camera_ts ON matches (camera, ts);
+CREATE INDEX IF NOT EXISTS idx_matches_ts ON matches (ts);
+"""
+
+COLUMNS = ('ts', 'camera', 'frame', 'mmsi', 'confidence', 'x', 'y', 'w', 'h')
+INSERT_SQL = f"INSERT INTO matches ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """WAL modunda bağlantı açar (okuyucular yazıcıyı bekletmez)"""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+class MatchStore:
+    """Toplu ve arka planda yazan eşleştirme geçmişi"""
+    
+    def __init__(self, db_path: str = "matches.db", batch_size: int = 5000, flush_interval: float = 0.5,
+                 max_pending: int = 10000):
+        self.db_path = db_path
+        self.batch_size = batch_size  # Bir transaction'daki en fazla satır
+        self.flush_interval = flush_interval  # Az veri gelirken en geç bu sürede yazılır (s)
+        
+        conn = _connect(db_path)
+        conn.executescript(SCHEMA)
+        conn.close()
+        
+        # Kuyruğa kare başına tek satır listesi girer; dolarsa kare atlanır, döngü beklemez
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._reader = None
+        self.written = 0  # Veritabanına yazılan satır
+        # Her sayacı tek iş parçacığı artırır (kilitsiz += yarışı olmasın); toplamı dropped verir
+        self.dropped_full = 0  # Kuyruk dolu olduğu için atılan satır (çağıran iş parçacığı)
+        self.dropped_error = 0  # Yazma hatası yüzünden atılan satır (yazıcı iş parçacığı)
+        self.transactions = 0
+        self.error = None  # Yazıcının son hatası (flush bildirir)
+        
+        self._writer = threading.Thread(target=self._write_loop, name="match-store-writer", daemon=True)
+        self._writer.start()
+    
+    @property
+    def dropped(self) -> int:
+        """Atılan toplam satır"""
+        return self.dropped_full + self.dropped_error
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    # --- Yazma ---
+    
+    def add_matches(self, matches: List[tuple], camera: str, ts: Optional[float] = None, frame: Optional[int] = None):
+        """(ais_target, detection, confidence) eşleştirmelerini kuyruğa bırakır"""
+        if not matches:
+            return
+        ts = time.time() if ts is None else ts
+        rows = [(ts, camera, frame, int(ais.mmsi), float(confidence), *map(int, detection.bbox))
+                for ais, detection, confidence in matches]
+        self.add_rows(rows)
+    
+    def add_rows(self, rows: List[tuple]):
+        """COLUMNS sırasındaki hazır satırları kuyruğa bırakır (yazıcı durmuşsa RuntimeError)"""
+        if not self._writer.is_alive():
+            raise RuntimeError(f"Eşleştirme deposu yazıcısı durmuş: {self.error or 'depo kapatılmış'}")
+        try:
+            self._queue.put_nowait(rows)
+        except queue.Full:
+            self.dropped_full += len(rows)
+    
+    def _write_loop(self):
+        """Yazıcı iş parçacığı: satırları biriktirip tek transaction'da yazar"""
+        try:
+            conn = _connect(self.db_path)
+        except sqlite3.Error as e:
+            self.error = e
+            return
+        pending = []
+        done = False
+        while not done:
+            deadline = time.perf_counter() + self.flush_interval
+            taken = 0
+            try:
+                while len(pending) < self.batch_size:
+                    try:
+                        rows = self._queue.get(timeout=max(0.0, deadline - time.perf_counter()))
+                    except queue.Empty:
+                        break
+                    taken += 1
+                    if rows is None:
+                        done = True
+                        break
+                    pending.extend(rows)
+                
+                if pending:
+                    with conn:
+                        conn.executemany(INSERT_SQL, pending)
+                    self.written += len(pending)
+                    self.transactions += 1
+            except Exception as e:
+                # Hatalı paket atılır, yazıcı çalışmaya devam eder; flush hatayı bildirir
+                self.error = e
+                self.dropped_error += len(pending)
+            finally:
+                pending = []
+                for _ in range(taken):
+                    self._queue.task_done()
+        conn.close()
+    
+    def flush(self):
+        """Kuyruktaki tüm satırlar yazılana kadar bekler; yazma hatası olduysa veya yazıcı durmuşsa RuntimeError"""
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks and self._writer.is_alive():
+                self._queue.all_tasks_done.wait(timeout=0.1)
+        self._check_error()
+    
+    def _check_error(self):
+        """Bekleyen yazıcı hatasını bir kez bildirir"""
+        if not self._writer.is_alive() and self._queue.unfinished_tasks:
+            raise RuntimeError(f"Eşleştirme deposu yazıcısı durmuş, {self._queue.unfinished_tasks} paket yazılamadı: "
+                               f"{self.error}")
+        error, self.error = self.error, None
+        if error is not None:
+            raise RuntimeError(f"Eşleştirme deposuna yazılamadı ({self.dropped} satır atıldı): {error}") from error
+    
+    def close(self):
+        """Kalan satırları yazar ve yazıcıyı durdurur"""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        if self.error is not None:
+            print(f"⚠️ Eşleştirme deposu yazma hatası ({self.dropped} satır atıldı): {self.error}")
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+    
+    # --- Sorgular ---
+    
+    def _query(self, sql: str, params: tuple = ()) -> List[dict]:
+        if self._reader is None:
+            self._reader = _connect(self.db_path)
+            self._reader.row_factory = sqlite3.Row
+        return [dict(row) for row in self._reader.execute(sql, params)]
+    
+    def last_seen(self, mmsi: int, camera: Optional[str] = None) -> Optional[dict]:
+        """MMSI'nin (isteğe bağlı olarak belirli kamerada) en son eşleştirmesi"""
+        sql = "SELECT * FROM matches WHERE mmsi = ?"
+        params = [mmsi]
+        if camera is not None:
+            sql += " AND camera = ?"
+            params.append(camera)
+        rows = self._query(sql + " ORDER BY ts DESC, id DESC LIMIT 1", tuple(params))
+        return rows[0] if rows else None
+    
+    def vessel_history(self, mmsi: int, start: Optional[float] = None, end: Optional[float] = None,
+                       camera: Optional[str] = None) -> List[dict]:
+        """MMSI'nin zaman aralığındaki tüm eşleştirmeleri (zamana göre sıralı)"""
+        return self.between(start, end, camera=camera, mmsi=mmsi)
+    
+    def between(self, start: Optional[float] = None, end: Optional[float] = None, camera: Optional[str] = None,
+                mmsi: Optional[int] = None, limit: Optional[int] = None) -> List[dict]:
+        """[start, end] zaman aralığındaki eşleştirmeler"""
+        conditions, params = [], []
+        for column, op, value in (('mmsi', '=', mmsi), ('camera', '=', camera), ('ts', '>=', start), ('ts', '<=', end)):
+            if value is not None:
+                conditions.append(f"{column} {op} ?")
+                params.append(value)
+        sql = "SELECT * FROM matches"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY ts, id"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self._query(sql, tuple(params))
+    
+    def vessels_seen(self, start: Optional[float] = None, end: Optional[float] = None,
+                     camera: Optional[str] = None) -> List[dict]:
+        """Aralıkta görülen MMSI'ler: eşleştirme sayısı, ilk/son görülme"""
+        conditions, params = [], []
+        for column, op, value in (('camera', '=', camera), ('ts', '>=', start), ('ts', '<=', end)):
+            if value is not None:
+                conditions.append(f"{column} {op} ?")
+                params.append(value)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        return self._query("SELECT mmsi, COUNT(*) AS count, MIN(ts) AS first_seen, MAX(ts) AS last_seen "
+                           f"FROM matches{where} GROUP BY mmsi ORDER BY last_seen DESC", tuple(params))
+    
+    def count(self) -> int:
+        return self._query("SELECT COUNT(*) AS n FROM matches")[0]['n']
+
+def benchmark_ingest(num_frames: int = 20000, matches_per_frame: int = 5, db_path: str = None):
+    """Kare başına add_rows çağrısı ile yazma hızı ve çağıran tarafın bekleme süresi"""
+    import os
+    import tempfile
+    
+    if db_path is None:
+        handle, db_path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+    
+    total = num_frames * matches_per_frame
+    frames = [[(1000.0 + f * 0.04, f"cam{f % 4}", f, 200000000 + (f + i) % 500, 0.9, 10 * i, 20, 80, 30)
+               for i in range(matches_per_frame)] for f in range(num_frames)]
+    
+    store = MatchStore(db_path, max_pending=num_frames)
+    start = time.perf_counter()
+    worst_call = 0.0
+    for rows in frames:
+        call_start = time.perf_counter()
+        store.add_rows(rows)
+        worst_call = max(worst_call, time.perf_counter() - call_start)
+    enqueue_time = time.perf_counter() - start
+    store.flush()
+    elapsed = time.perf_counter() - start
+    
+    query_start = time.perf_counter()
+    last = store.last_seen(200000123, camera="cam3")
+    history = store.vessel_history(200000123, start=1000.0, end=1400.0)
+    query_ms = (time.perf_counter() - query_start) * 1000
+    
+    print(f"💾 {total} eşleştirme ({num_frames} kare): {total / elapsed:,.0f} satır/s, "
+          f"{store.transactions} transaction, atılan: {store.dropped}")
+    print(f"  Kuyruğa bırakma: toplam {enqueue_time * 1000:.1f} ms, en uzun çağrı {worst_call * 1000:.2f} ms")
+    print(f"  Sorgu (last_seen + vessel_history): {query_ms:.2f} ms, son görülme ts={last['ts'] if last else None}, "
+          f"{len(history)} kayıt")
+    
+    assert store.count() == total, "Yazılan satır sayısı eksik"
+    store.close()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    return total / elapsed
+
+if __name__ == "__main__":
+    print("🚢 Eşleştirme Geçmişi Deposu - Performans Testi")
+    print("=" * 40)
+    benchmark_ingest()
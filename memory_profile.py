@@ -0,0 +1,272 @@
+"""
+Bellek Profili ve Bütçe Testleri
+================================
+tracemalloc anlık görüntüleriyle hattın her aşaması (etiket yükleme, kare
+okuma, tespit, eşleştirme) için bellek kullanımını ölçer:
+
+- tepe: aşama sırasında başlangıca göre en yüksek ek bellek
+- kalıcı: aşama bittiğinde geride kalan bellek (çağrı başına ortalama; çıktı dahil)
+- en çok ayıran satırlar: aşamanın ilk ölçümlü çağrısında anlık görüntü farkı
+
+Bütçe testleri, verilen sahne büyüklüğünde kararlı durum belleğinin eşiğin
+altında kaldığını ve uzun çalışmada büyümediğini kontrol eder.
+"""
+
+import contextlib
+import os
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+# İzleme altyapısının kendi ayırmaları raporlara karışmasın
+_TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+class MemoryProfiler:
+    """Aşama başına tepe ve kalıcı bellek, en çok ayıran satırlar"""
+    
+    def __init__(self, top: int = 5, traceback_frames: int = 1):
+        self.top = top  # 0 ise anlık görüntü alınmaz (sadece sayaçlar)
+        self.traceback_frames = traceback_frames
+        self.stages = {}
+        self._started = False
+    
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.traceback_frames)
+            self._started = True
+        return self
+    
+    def stop(self):
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """with profiler.stage('tespit'): ... bloğunun belleğini ölçer"""
+        stats = self.stages.setdefault(name, {'calls': 0, 'peak': 0, 'retained': 0, 'sites': []})
+        snapshot = tracemalloc.take_snapshot() if self.top and stats['calls'] == 0 else None
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        try:
+            yield stats
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            stats['calls'] += 1
+            stats['peak'] = max(stats['peak'], peak - before)
+            stats['retained'] += current - before
+            if snapshot is not None:
+                diff = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS).compare_to(
+                    snapshot.filter_traces(_TRACE_FILTERS), 'lineno')
+                stats['sites'] = [(str(stat.traceback[0]), stat.size_diff, stat.count_diff)
+                                  for stat in diff if stat.size_diff > 0][:self.top]
+    
+    def report(self) -> str:
+        lines = [f"  {'aşama':<18} {'çağrı':>6} {'tepe':>10} {'kalıcı/çağrı':>13}"]
+        for name, stats in self.stages.items():
+            lines.append(f"  {name:<18} {stats['calls']:>6} {format_bytes(stats['peak']):>10} "
+                         f"{format_bytes(stats['retained'] / max(stats['calls'], 1)):>13}")
+        for name, stats in self.stages.items():
+            if stats['sites']:
+                lines.append(f"  {name} - en çok ayıran satırlar (ilk çağrı):")
+                for site, size, count in stats['sites']:
+                    lines.append(f"    {format_bytes(size):>10} {count:>6} blok  {_short_path(site)}")
+        return '\n'.join(lines)
+
+def format_bytes(size: float) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if abs(size) < 1024 or unit == 'MB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+def _short_path(site: str) -> str:
+    """Site yolunu proje veya site-packages köküne göre kısaltır"""
+    root = str(Path(__file__).resolve().parent) + os.sep
+    if site.startswith(root):
+        return site[len(root):]
+    marker = 'site-packages' + os.sep
+    return site.split(marker, 1)[1] if marker in site else site
+
+def _first_frames(video_path, count: int):
+    """Videonun ilk kareleri (okunamazsa boş liste)"""
+    import cv2
+    
+    cap = cv2.VideoCapture(str(video_path))
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+def profile_pipeline(data_dir="data", video_path="data/videos/4.mp4", frames: int = 30, num_vessels: int = 2000,
+                     max_detections: int = 60, top: int = 5) -> MemoryProfiler:
+    """Etiket yükleme, video döngüsü ve büyük sahnede eşleştirme aşamalarının bellek profili"""
+    import cv2
+    from ais_matcher import AISMatcher, load_labelme_annotations, load_yolo_annotations
+    from simple_detector import SimpleDetector
+    from simulator import VesselScenario
+    
+    data_path = Path(data_dir)
+    label_pairs = [(path, path.with_suffix('.jpg')) for path in sorted((data_path / "txt").glob("*.txt"))]
+    json_files = sorted((data_path / "json").glob("*.json"))
+    detector = SimpleDetector()
+    scenario = VesselScenario(num_vessels=num_vessels, max_detections=max_detections)
+    matcher = AISMatcher()
+    quiet = open(os.devnull, 'w')  # match_detections her karede AIS yükleme mesajı yazar
+    
+    # Isınma: modül içi önbellekler ve SciPy yüklemesi profile karışmasın
+    warm_frames = _first_frames(video_path, 1)
+    with contextlib.redirect_stdout(quiet):
+        if warm_frames:
+            detector.process_image(warm_frames[0])
+        scenario.step(0.1)
+        matcher.match_targets(scenario.ais_targets(), scenario.detections(), (scenario.own_lat, scenario.own_lon))
+    
+    profiler = MemoryProfiler(top=top).start()
+    try:
+        with profiler.stage('yolo_yükleme'):
+            yolo = [load_yolo_annotations(txt, image) for txt, image in label_pairs]
+        with profiler.stage('labelme_yükleme'):
+            labelme = [load_labelme_annotations(path) for path in json_files]
+        del yolo, labelme
+        
+        cap = cv2.VideoCapture(str(video_path))
+        for _ in range(frames):
+            with profiler.stage('kare_okuma'):
+                ret, frame = cap.read()
+            if not ret:
+                break
+            with profiler.stage('tespit'):
+                detections = detector.detect_ships_manual(frame)
+            with profiler.stage('eşleştirme'), contextlib.redirect_stdout(quiet):
+                detector.match_detections(detections)
+            del frame
+        cap.release()
+        
+        for _ in range(frames):
+            scenario.step(0.1)
+            with profiler.stage('ais_nesneleri'):
+                ais_targets = scenario.ais_targets()
+                detections = scenario.detections()
+            with profiler.stage('büyük_eşleştirme'):
+                matcher.match_targets(ais_targets, detections, (scenario.own_lat, scenario.own_lon))
+    finally:
+        profiler.stop()
+        quiet.close()
+    return profiler
+
+def measure_steady_state(step, frames: int, warmup: int = 10) -> dict:
+    """step() her çağrıldığında bir kare işler; ısınmadan sonra kare başı tepe ve kalıcı bellek eğilimi"""
+    for _ in range(warmup):
+        step()
+    
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        peaks = np.empty(frames)
+        retained = np.empty(frames)
+        for frame in range(frames):
+            tracemalloc.reset_peak()
+            step()
+            current, peak = tracemalloc.get_traced_memory()
+            peaks[frame] = peak - base
+            retained[frame] = current - base
+    finally:
+        tracemalloc.stop()
+    
+    # Büyüme: kalıcı belleğin kareye göre doğru eğimi, çalışma uzunluğuyla çarpılmış
+    slope = float(np.polyfit(np.arange(frames), retained, 1)[0]) if frames >= 2 else 0.0
+    return {
+        'frames': frames,
+        'peak_bytes': float(peaks.max()),
+        'retained_bytes': float(retained[-1]),
+        'growth_per_frame': slope,
+        'growth_bytes': slope * frames,
+    }
+
+def _check_budget(name: str, result: dict, peak_budget_mb: float, growth_budget_kb: float) -> bool:
+    peak_mb = result['peak_bytes'] / 1024 ** 2
+    growth_kb = result['growth_bytes'] / 1024
+    ok = peak_mb <= peak_budget_mb and growth_kb <= growth_budget_kb
+    print(f"{'✅' if ok else '❌'} {name}: kare başı tepe {peak_mb:.2f} MB (bütçe {peak_budget_mb:g}), "
+          f"{result['frames']} karede büyüme {growth_kb:+.1f} KB (bütçe {growth_budget_kb:g}), "
+          f"kalıcı {format_bytes(result['retained_bytes'])}")
+    return ok
+
+def test_matching_memory_budget(num_vessels: int = 2000, max_detections: int = 60, frames: int = 600,
+                                peak_budget_mb: float = 8.0, growth_budget_kb: float = 64.0, gating=None) -> bool:
+    """Büyük sahnede eşleştirme: kare başı tepe bellek bütçede ve uzun çalışmada büyüme yok"""
+    from ais_matcher import AISMatcher
+    from simulator import VesselScenario
+    
+    scenario = VesselScenario(num_vessels=num_vessels, max_detections=max_detections)
+    matcher = AISMatcher(gating=gating)
+    
+    def step():
+        scenario.step(0.1)
+        matcher.match_targets(scenario.ais_targets(), scenario.detections(), (scenario.own_lat, scenario.own_lon))
+    
+    result = measure_steady_state(step, frames)
+    return _check_budget(f"Eşleştirme ({num_vessels} gemi x {max_detections} tespit)", result,
+                         peak_budget_mb, growth_budget_kb)
+
+def test_video_memory_budget(video_path="data/videos/4.mp4", frames: int = 300, peak_budget_mb: float = 12.0,
+                             growth_budget_kb: float = 64.0) -> Optional[bool]:
+    """Video döngüsü (okuma, tespit, eşleştirme): kare başı tepe bütçede ve büyüme yok"""
+    import cv2
+    from simple_detector import SimpleDetector
+    
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        print(f"⚠️ Video açılamadı, test atlandı: {video_path}")
+        return None
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    detector = SimpleDetector()
+    quiet = open(os.devnull, 'w')
+    
+    def step():
+        ret, frame = cap.read()
+        if not ret:  # Kısa videoda başa sar
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = cap.read()
+        with contextlib.redirect_stdout(quiet):
+            detector.process_image(frame)
+    
+    try:
+        result = measure_steady_state(step, frames)
+    finally:
+        cap.release()
+        quiet.close()
+    return _check_budget(f"Video döngüsü ({Path(video_path).name}, {frame_count} kare)", result,
+                         peak_budget_mb, growth_budget_kb)
+
+def run_budget_tests() -> bool:
+    """Tüm bütçe testleri; atlanan testler başarısız sayılmaz"""
+    results = [test_matching_memory_budget(), test_video_memory_budget()]
+    return all(result is not False for result in results)
+
+if __name__ == "__main__":
+    print("🚢 Bellek Profili")
+    print("=" * 40)
+    start = time.perf_counter()
+    print(profile_pipeline().report())
+    print(f"  ({time.perf_counter() - start:.1f} s)")
+    print()
+    run_budget_tests()
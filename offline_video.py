@@ -0,0 +1,217 @@
+"""
+Paralel Çevrimdışı Video İşleme
+===============================
+Kayıtlı videoları (data/videos/*.mp4) zaman parçalarına böler, her süreci
+kendi parçasının başına konumlandırır (CAP_PROP_POS_FRAMES) ve parçaları
+paralel işler.
+
+Her parça sonraki parçanın ilk birkaç karesini de işler (örtüşme). Bu
+karelerde iki parçanın kutuları IoU ile eşleştirilerek takip kimlikleri
+birleştirilir; sonuç tek, sıralı bir zaman çizelgesidir.
+"""
+
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from tracker import greedy_iou_pairs, iou_matrix
+
+def split_segments(frame_count: int, num_segments: int, overlap: int = 5) -> List[Tuple[int, int, int]]:
+    """(başlangıç, bitiş, işlenecek son kare + 1) parçaları; son değer örtüşmeyi içerir"""
+    num_segments = max(1, min(num_segments, frame_count))
+    bounds = np.linspace(0, frame_count, num_segments + 1).astype(int)
+    return [(int(start), int(end), int(min(end + overlap, frame_count)))
+            for start, end in zip(bounds[:-1], bounds[1:])]
+
+def video_info(video_path) -> Tuple[int, float]:
+    """Kare sayısı ve fps"""
+    import cv2
+    
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        return 0, 0.0
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    cap.release()
+    return max(frame_count, 0), fps
+
+def _process_segment(video_path: str, start: int, stop: int, fps: float) -> List[dict]:
+    """Süreç işi: [start, stop) karelerini tespit, takip ve eşleştirme ile işler"""
+    import cv2
+    from ais_matcher import create_sample_ais_data
+    from simple_detector import SimpleDetector
+    from tracker import IoUTracker
+    
+    detector = SimpleDetector()
+    tracker = IoUTracker()
+    ais_targets = create_sample_ais_data(5)  # detect_ships_manual en fazla 5 tespit döndürür
+    
+    cap = cv2.VideoCapture(video_path)
+    if start > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    
+    frame_detections = []
+    for frame_index in range(start, stop):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame_detections.append(tracker.update(detector.detect_ships_manual(frame), frame_index))
+    cap.release()
+    
+    # Eşleştirme parçanın tüm kareleri için tek çağrıda; create_sample_ais_data(n) ile aynı ilk n gemi
+    frame_matches = detector.matcher.match_targets_batch(
+        frame_detections, [ais_targets[:len(detections)] for detections in frame_detections], detector.own_position)
+    
+    records = []
+    for frame_index, detections, matches in zip(range(start, stop), frame_detections, frame_matches):
+        records.append({
+            'frame': frame_index,
+            'time': frame_index / fps,
+            'detections': [(d.track_id, *map(int, d.bbox), float(d.confidence)) for d in detections],
+            'matches': [(int(ais.mmsi), d.track_id, float(confidence)) for ais, d, confidence in matches],
+        })
+    return records
+
+def stitch_tracks(previous: List[dict], current: List[dict], iou_threshold: float = 0.5) -> dict:
+    """Örtüşen karelerde IoU oylamasıyla current'ın yerel takip kimliğini previous'ınkine eşler"""
+    previous_by_frame = {record['frame']: record for record in previous}
+    votes = Counter()
+    for record in current:
+        other = previous_by_frame.get(record['frame'])
+        if other is None:
+            break  # Örtüşme bitti
+        boxes_a = np.array([d[1:5] for d in other['detections']], dtype=float).reshape(-1, 4)
+        boxes_b = np.array([d[1:5] for d in record['detections']], dtype=float).reshape(-1, 4)
+        for i, j in greedy_iou_pairs(iou_matrix(boxes_a, boxes_b), iou_threshold):
+            votes[(record['detections'][j][0], other['detections'][i][0])] += 1
+    
+    # En çok oy alan çiftten başlayarak birebir eşleme
+    mapping, used = {}, set()
+    for (local_id, previous_id), _ in votes.most_common():
+        if local_id in mapping or previous_id in used:
+            continue
+        mapping[local_id] = previous_id
+        used.add(previous_id)
+    return mapping
+
+def merge_segments(segments: List[Tuple[Tuple[int, int, int], List[dict]]]) -> Tuple[List[dict], int]:
+    """Parça sonuçlarını tek zaman çizelgesinde birleştirir, takip kimliklerini küresel yapar"""
+    timeline = []
+    next_id = 1
+    previous_records = None
+    
+    for (start, end, _), records in segments:
+        # Önceki parçanın örtüşme kareleri (küresel kimlikli) ile bu parçanın ilk kareleri
+        stitched = stitch_tracks(previous_records, records) if previous_records else {}
+        mapping = {}
+        for record in records:
+            for detection in record['detections']:
+                local_id = detection[0]
+                if local_id not in mapping:
+                    if local_id in stitched:
+                        mapping[local_id] = stitched[local_id]
+                    else:
+                        mapping[local_id] = next_id
+                        next_id += 1
+        
+        relabeled = []
+        for record in records:
+            relabeled.append(dict(
+                record,
+                detections=[(mapping[d[0]], *d[1:]) for d in record['detections']],
+                matches=[(mmsi, mapping[track_id], confidence) for mmsi, track_id, confidence in record['matches']]))
+        
+        # Örtüşme kareleri sonraki parçaya aittir
+        timeline.extend(record for record in relabeled if start <= record['frame'] < end)
+        previous_records = [record for record in relabeled if record['frame'] >= end]
+    
+    track_count = len({d[0] for record in timeline for d in record['detections']})
+    return timeline, track_count
+
+def process_video_offline(video_path, workers: Optional[int] = None, num_segments: Optional[int] = None,
+                          overlap: int = 5, max_frames: Optional[int] = None) -> dict:
+    """Videoyu parçalara bölüp paralel işler; sıralı zaman çizelgesi döndürür"""
+    start_time = time.perf_counter()
+    frame_count, fps = video_info(video_path)
+    if frame_count == 0:
+        print(f"Video açılamadı: {video_path}")
+        return {'frames': [], 'tracks': 0, 'elapsed': 0.0}
+    if max_frames is not None:
+        frame_count = min(frame_count, max_frames)
+    
+    workers = workers or os.cpu_count() or 1
+    segments = split_segments(frame_count, num_segments or workers, overlap)
+    
+    if workers == 1:
+        results = [_process_segment(str(video_path), start, stop, fps) for start, _, stop in segments]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_process_segment, str(video_path), start, stop, fps)
+                       for start, _, stop in segments]
+            results = [future.result() for future in futures]
+    
+    timeline, track_count = merge_segments(list(zip(segments, results)))
+    return {
+        'video': str(video_path),
+        'fps': fps,
+        'frames': timeline,
+        'tracks': track_count,
+        'segments': len(segments),
+        'workers': workers,
+        'elapsed': time.perf_counter() - start_time,
+    }
+
+def save_timeline(result: dict, output_path):
+    """Zaman çizelgesini kare başına bir satır JSON olarak yazar"""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for record in result['frames']:
+            f.write(json.dumps(record) + '\n')
+
+def test_offline_parity(video_path="data/videos/4.mp4", segments: int = 4, max_frames: int = 200):
+    """Parçalı sonuçları tek parçalı (sıralı) işleme ile karşılaştırır"""
+    sequential = process_video_offline(video_path, workers=1, num_segments=1, max_frames=max_frames)
+    parallel = process_video_offline(video_path, workers=1, num_segments=segments, max_frames=max_frames)
+    
+    # Kareler ve kutular birebir aynı olmalı (konumlandırma doğru)
+    box_mismatch, id_pairs = 0, Counter()
+    for a, b in zip(sequential['frames'], parallel['frames']):
+        if a['frame'] != b['frame'] or [d[1:] for d in a['detections']] != [d[1:] for d in b['detections']]:
+            box_mismatch += 1
+            continue
+        id_pairs.update((da[0], db[0]) for da, db in zip(a['detections'], b['detections']))
+    
+    # Takip kimliği uyumu: her parçalı kimliğin en sık eşlendiği sıralı kimlikle aynı olan tespit oranı.
+    # Parça başındaki takipçi geçmişsiz başladığı için sınırdaki kopmuş takiplerde küçük fark olabilir.
+    best = Counter()
+    for (_, par_id), count in id_pairs.items():
+        best[par_id] = max(best[par_id], count)
+    total = sum(id_pairs.values())
+    agreement = sum(best.values()) / total if total else 1.0
+    ok = len(sequential['frames']) == len(parallel['frames']) and box_mismatch == 0 and agreement >= 0.95
+    
+    print(f"{'✅' if ok else '❌'} Parçalı/sıralı uyum: {len(parallel['frames'])}/{len(sequential['frames'])} kare, "
+          f"{box_mismatch} farklı kare, takip kimliği uyumu {agreement:.1%} "
+          f"({sequential['tracks']} sıralı / {parallel['tracks']} parçalı takip)")
+    return ok
+
+def benchmark_offline(video_path="data/videos/4.mp4", worker_counts=(1, 2, 4), max_frames: Optional[int] = None):
+    """Süreç sayısına göre duvar saati süresi ve hızlanma"""
+    print(f"🎬 {video_path} (CPU: {os.cpu_count()})")
+    baseline = None
+    for workers in worker_counts:
+        result = process_video_offline(video_path, workers=workers, max_frames=max_frames)
+        baseline = baseline or result['elapsed']
+        print(f"  {workers} süreç: {len(result['frames'])} kare, {result['elapsed']:.2f} s, "
+              f"{len(result['frames']) / result['elapsed']:.1f} kare/s, hızlanma x{baseline / result['elapsed']:.2f}, "
+              f"{result['tracks']} takip")
+
+if __name__ == "__main__":
+    print("🚢 Paralel Çevrimdışı Video İşleme")
+    print("=" * 40)
+    test_offline_parity()
+    benchmark_offline()
@@ -0,0 +1,237 @@
+"""
+AIS Güdümlü İlgi Bölgesi (ROI) Tespiti
+======================================
+Normal akışta tespit tüm karede çalışır, AIS hedefleri sonradan eşleştirilir.
+Bu modda sıra tersine döner: AIS hedefleri kareye projekte edilir, her
+hedefin etrafına menzile ve rapor yaşına göre büyüyen bir belirsizlik payı
+eklenir ve dedektör sadece bu pencerelerde çalışır.
+
+- Pencere yarı genişliği: gemi boyu payı (fx * boy / menzil) + konum payı
+  (fx * (taban pay + sürüklenme hızı * rapor yaşı) / menzil)
+- Çakışan pencereler birleştirilir; toplam alan karenin max_coverage oranını
+  aşarsa tüm kare taranır (kalabalık sahnede pencere yükü kazandırmaz).
+- full_scan_every karede bir tüm kare taranır: AIS'i kapalı ("karanlık")
+  gemiler bu taramalarda bulunur ve sonraki karelerde kendi pencereleriyle
+  (her karede biraz genişleyerek) izlenir.
+"""
+
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ais_matcher import AISMatcher, AISTarget, DetectedShip
+
+def merge_windows(windows) -> np.ndarray:
+    """Çakışan (x0, y0, x1, y1) pencereleri kapsayan pencerede birleştirir; çakışma kalmayana kadar tekrarlar"""
+    windows = np.asarray(windows, dtype=np.int64).reshape(-1, 4).tolist()
+    merged = True
+    while merged:
+        merged = False
+        result = []
+        for box in windows:
+            for other in result:
+                if box[0] < other[2] and box[2] > other[0] and box[1] < other[3] and box[3] > other[1]:
+                    other[:] = [min(box[0], other[0]), min(box[1], other[1]), max(box[2], other[2]), max(box[3], other[3])]
+                    merged = True
+                    break
+            else:
+                result.append(box)
+        windows = result
+    return np.array(windows, dtype=np.int64).reshape(-1, 4)
+
+def window_area(windows: np.ndarray) -> int:
+    windows = np.asarray(windows, dtype=np.int64).reshape(-1, 4)
+    return int(((windows[:, 2] - windows[:, 0]) * (windows[:, 3] - windows[:, 1])).sum())
+
+class AISGuidedROI:
+    """AIS projeksiyonundan tespit pencereleri, periyodik tam tarama ve karanlık gemi takibi"""
+    
+    def __init__(self, matcher: Optional[AISMatcher] = None, full_scan_every: int = 30, size_tolerance: float = 2.0,
+                 base_margin_m: float = 30.0, drift_m_per_s: float = 8.0, vertical_margin: int = 48,
+                 min_size: Tuple[int, int] = (96, 64), max_coverage: float = 0.5, dark_margin: int = 32,
+                 dark_growth: int = 4, dark_max_age: Optional[int] = None):
+        self.matcher = matcher or AISMatcher()
+        self.full_scan_every = full_scan_every  # 0 ise periyodik tam tarama yapılmaz
+        self.size_tolerance = size_tolerance  # Gemi görünür boyunun katı (açı ve boy hatası için)
+        self.base_margin_m = base_margin_m  # AIS konum hatası (metre)
+        self.drift_m_per_s = drift_m_per_s  # Rapor yaşı başına ek konum belirsizliği (~15 knot)
+        self.vertical_margin = vertical_margin  # Ufuk çizgisi (cy) etrafında dikey pay (piksel)
+        self.min_size = min_size  # En küçük pencere (genişlik, yükseklik)
+        self.max_coverage = max_coverage
+        self.dark_margin = dark_margin  # Karanlık gemi kutusu etrafındaki pay
+        self.dark_growth = dark_growth  # Son tam taramadan bu yana her karede payın artışı
+        self.dark_max_age = dark_max_age if dark_max_age is not None else max(full_scan_every, 1)
+        
+        self.dark_boxes = np.zeros((0, 4), dtype=np.int64)  # Son tam taramada AIS ile eşleşmeyen tespitler
+        self.dark_frame = 0
+        self.frames = 0
+        self.full_scans = 0
+        self.pixels = 0  # Dedektörün işlediği piksel
+        self.frame_pixels = 0  # Her karede tüm kare taransaydı
+        self.elapsed = 0.0
+    
+    def should_full_scan(self, frame_index: int) -> bool:
+        return self.full_scan_every > 0 and frame_index % self.full_scan_every == 0
+    
+    def ais_windows(self, ais_targets: List[AISTarget], own_position: Tuple[float, float], frame_shape,
+                    ages=None) -> np.ndarray:
+        """Her görünür AIS hedefi için (x0, y0, x1, y1) pencere; ages: saniye cinsinden rapor yaşları"""
+        height, width = frame_shape[:2]
+        if not ais_targets:
+            return np.zeros((0, 4), dtype=np.int64)
+        
+        lats = np.array([target.lat for target in ais_targets], dtype=float)
+        lons = np.array([target.lon for target in ais_targets], dtype=float)
+        lengths = np.array([target.length for target in ais_targets], dtype=float)
+        ages = np.zeros(len(ais_targets)) if ages is None else np.asarray(ages, dtype=float)
+        distance, bearing = self.matcher.ais_polar(lats, lons, own_position)
+        pixel_x, valid = self.matcher.polar_to_pixel(distance, bearing)
+        
+        matcher = self.matcher
+        distance = np.maximum(distance, 1.0)
+        ship_width = matcher.fx * lengths / distance
+        half_width = self.size_tolerance * ship_width / 2 + matcher.fx * (self.base_margin_m + self.drift_m_per_s * ages) / distance
+        half_width = np.maximum(half_width, self.min_size[0] / 2)
+        # Dikey: gemi yüksekliği (boyun ~1/4'ü) ve ufuk payı
+        half_height = np.maximum(self.size_tolerance * matcher.fy * 0.25 * lengths / distance / 2 + self.vertical_margin,
+                                 self.min_size[1] / 2)
+        
+        windows = np.stack([pixel_x - half_width, matcher.cy - half_height, pixel_x + half_width, matcher.cy + half_height], axis=1)
+        windows = windows[valid]
+        windows = np.clip(np.round(windows), 0, [width, height, width, height]).astype(np.int64)
+        return windows[(windows[:, 2] > windows[:, 0]) & (windows[:, 3] > windows[:, 1])]
+    
+    def dark_windows(self, frame_index: int, frame_shape) -> np.ndarray:
+        """Karanlık gemilerin pencereleri; pay son tam taramadan bu yana her karede büyür"""
+        age = frame_index - self.dark_frame
+        if not len(self.dark_boxes) or age > self.dark_max_age:
+            return np.zeros((0, 4), dtype=np.int64)
+        height, width = frame_shape[:2]
+        margin = self.dark_margin + self.dark_growth * age
+        x, y, w, h = self.dark_boxes.T
+        windows = np.stack([x - margin, y - margin, x + w + margin, y + h + margin], axis=1)
+        return np.clip(windows, 0, [width, height, width, height])
+    
+    def windows(self, ais_targets: List[AISTarget], own_position: Tuple[float, float], frame_shape,
+                frame_index: int, ages=None) -> Optional[np.ndarray]:
+        """Bu karede taranacak pencereler; None: tüm kare taranmalı"""
+        if self.should_full_scan(frame_index):
+            return None
+        windows = np.concatenate([self.ais_windows(ais_targets, own_position, frame_shape, ages),
+                                  self.dark_windows(frame_index, frame_shape)])
+        windows = merge_windows(windows)
+        if window_area(windows) > self.max_coverage * frame_shape[0] * frame_shape[1]:
+            return None
+        return windows
+    
+    def remember_unmatched(self, detections: List[DetectedShip], matches, frame_index: int):
+        """Tam taramada AIS ile eşleşmeyen tespitler (matches: MatchResult) karanlık gemi olarak saklanır"""
+        unmatched = np.ones(len(detections), dtype=bool)
+        unmatched[matches['det_index']] = False
+        self.dark_boxes = np.array([detection.bbox for detection, keep in zip(detections, unmatched) if keep],
+                                   dtype=np.int64).reshape(-1, 4)
+        self.dark_frame = frame_index
+    
+    def record(self, frame_shape, windows: Optional[np.ndarray], elapsed: float):
+        frame_pixels = frame_shape[0] * frame_shape[1]
+        self.frames += 1
+        self.full_scans += windows is None
+        self.pixels += frame_pixels if windows is None else window_area(windows)
+        self.frame_pixels += frame_pixels
+        self.elapsed += elapsed
+    
+    def print_summary(self):
+        if not self.frames:
+            return
+        fraction = self.pixels / max(self.frame_pixels, 1)
+        print(f"🎯 AIS güdümlü ROI: {self.frames} kare ({self.full_scans} tam tarama), "
+              f"taranan piksel %{fraction * 100:.1f} ({1 / max(fraction, 1e-9):.1f}x az), "
+              f"tespit {self.elapsed / self.frames * 1000:.1f} ms/kare, {len(self.dark_boxes)} karanlık gemi")
+
+def synthetic_sea_scene(matcher: AISMatcher, own_position: Tuple[float, float], frame_shape=(2160, 3840),
+                        num_ais: int = 6, num_dark: int = 1, seed: int = 0):
+    """AIS projeksiyonu konumlarına çizilmiş gemiler ve AIS'siz gemiler içeren sentetik deniz karesi;
+    (kare, AIS hedefleri, gerçek kutular, karanlık kutu indeksleri) döndürür"""
+    import cv2
+    
+    rng = np.random.default_rng(seed)
+    height, width = frame_shape
+    # Gökyüzünden denize yumuşak geçiş (keskin ufuk çizgisi tüm gemileri tek kontura bağlardı) ve hafif gürültü
+    rows = np.linspace(0, 1, height)[:, None, None]
+    background = (1 - rows) * np.array([200, 180, 160]) + rows * np.array([110, 80, 40])
+    frame = np.clip(background + rng.normal(0, 3, (height, width, 1)), 0, 255).astype(np.uint8)
+    
+    # Gemiler birbirine binmesin diye yatayda şeritlere yerleştirilir
+    lanes = rng.permutation(np.linspace(0.08, 0.92, num_ais + num_dark))
+    targets, boxes = [], []
+    for lane, u in enumerate(lanes):
+        distance = rng.uniform(1500, 4000)
+        length = rng.uniform(80, 180)
+        bearing = np.arctan((u * width - matcher.cx) / matcher.fx)
+        lat = own_position[0] + distance * np.cos(bearing) / 111000
+        lon = own_position[1] + distance * np.sin(bearing) / 111000
+        # Gemi, eşleştiricinin kendi projeksiyonunun gösterdiği yere çizilir
+        distance, bearing = matcher.ais_polar([lat], [lon], own_position)
+        pixel_x = matcher.polar_to_pixel(distance, bearing)[0][0]
+        distance = distance[0]
+        w = int(matcher.fx * length / distance * 0.8)
+        h = max(int(w * 0.3), 30)
+        # AIS konum hatası kadar kayma (pencere payının içinde kalmalı)
+        x = int(pixel_x - w / 2 + rng.uniform(-1, 1) * matcher.fx * 20 / distance)
+        y = matcher.cy - h // 2
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (30, 30, 30), -1)
+        cv2.rectangle(frame, (x + w // 3, y - h // 2), (x + 2 * w // 3, y), (230, 230, 230), -1)
+        boxes.append((x, y - h // 2, w, h + h // 2))
+        if lane < num_ais:
+            targets.append(AISTarget(230000000 + lane, lat, lon, length, length / 6))
+    return frame, targets, boxes, list(range(num_ais, num_ais + num_dark))
+
+def benchmark_roi(frames: int = 60, full_scan_every: int = 30, frame_shape=(2160, 3840), num_ais: int = 6,
+                  num_dark: int = 1, seed: int = 0):
+    """Sentetik 4K seyrek sahnede tüm kare ve AIS güdümlü ROI: taranan piksel, süre, gemi yakalama"""
+    from simple_detector import SimpleDetector
+    from tracker import iou_matrix
+    
+    height, width = frame_shape
+    matcher = AISMatcher(camera_params={'fx': 3200, 'fy': 3200, 'cx': width // 2, 'cy': height // 2})
+    own_position = (40.0, 32.0)
+    frame, ais_targets, truth, dark = synthetic_sea_scene(matcher, own_position, frame_shape, num_ais, num_dark, seed)
+    ages = np.random.default_rng(seed).uniform(0, 10, (frames, len(ais_targets)))  # AIS rapor yaşları (s)
+    
+    def recall(detections, indices):
+        iou = iou_matrix([truth[i] for i in indices], [d.bbox for d in detections])
+        return int((iou.max(axis=1) >= 0.3).sum()) if iou.size else 0
+    
+    detector = SimpleDetector(top_k=20)
+    detector.matcher = matcher
+    print(f"🎯 AIS güdümlü ROI karşılaştırması: {width}x{height}, {len(ais_targets)} AIS'li + {len(dark)} AIS'siz gemi, "
+          f"{frames} kare")
+    
+    start = time.perf_counter()
+    found_ais = found_dark = 0
+    for _ in range(frames):
+        detections = detector.detect_ships_manual(frame)
+        found_ais += recall(detections, range(len(ais_targets)))
+        found_dark += recall(detections, dark)
+    full_ms = (time.perf_counter() - start) / frames * 1000
+    print(f"  tüm kare     {full_ms:7.1f} ms/kare, piksel %100.0, AIS'li yakalama {found_ais}/{frames * len(ais_targets)}, "
+          f"AIS'siz {found_dark}/{frames * len(dark)}")
+    
+    roi = AISGuidedROI(matcher, full_scan_every=full_scan_every)
+    found_ais = found_dark = 0
+    for frame_index in range(frames):
+        _, detections = detector.process_roi(frame, frame_index, roi, ais_targets, ages[frame_index], own_position)
+        found_ais += recall(detections, range(len(ais_targets)))
+        found_dark += recall(detections, dark)
+    roi_ms = roi.elapsed / frames * 1000
+    fraction = roi.pixels / roi.frame_pixels
+    print(f"  AIS ROI      {roi_ms:7.1f} ms/kare, piksel %{fraction * 100:.1f} ({1 / fraction:.1f}x az), "
+          f"AIS'li yakalama {found_ais}/{frames * len(ais_targets)}, AIS'siz {found_dark}/{frames * len(dark)} "
+          f"({roi.full_scans} tam tarama), {full_ms / roi_ms:.1f}x hızlı")
+    return fraction
+
+if __name__ == "__main__":
+    print("🚢 AIS Güdümlü ROI Tespiti")
+    print("=" * 40)
+    benchmark_roi()
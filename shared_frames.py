@@ -0,0 +1,253 @@
+"""
+Paylaşımlı Bellek ile Kare Taşıma
+=================================
+Kareleri tespit süreçlerine pickle ile göndermek yerine
+multiprocessing.shared_memory üzerinde sabit boyutlu yuvalar (slot) kullanır.
+
+- Üretici kareyi doğrudan boş bir yuvaya çözer (cap.read(yuva)).
+- Süreçlere sadece yuva indeksi ve kare numarası gider.
+- Süreç işini bitirince yuvayı boş yuva kuyruğuna geri bırakır; tüm yuvalar
+  doluysa üretici bekler (geri basınç).
+
+benchmark_transport aynı işi pickle'lı kuyrukla karşılaştırır.
+"""
+
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+class SharedFramePool:
+    """Sabit boyutlu kare yuvaları ve boş yuva kuyruğu"""
+    
+    def __init__(self, num_slots: int, frame_shape: Tuple[int, ...], dtype=np.uint8, context=None, name: str = None):
+        self.num_slots = num_slots
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.frame_nbytes = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+        
+        # name verilirse mevcut havuza bağlanılır (süreç tarafı)
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.frame_nbytes * num_slots)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.frames = np.ndarray((num_slots,) + self.frame_shape, dtype=self.dtype, buffer=self.shm.buf)
+        
+        self.free_slots = None
+        if self.owner:
+            self.free_slots = (context or mp).Queue()
+            for slot in range(num_slots):
+                self.free_slots.put(slot)
+    
+    def attach_info(self) -> dict:
+        """Süreçlerin havuza bağlanması için gereken bilgi (pickle edilebilir)"""
+        return {'name': self.shm.name, 'num_slots': self.num_slots, 'frame_shape': self.frame_shape,
+                'dtype': self.dtype.str}
+    
+    @classmethod
+    def attach(cls, info: dict) -> "SharedFramePool":
+        return cls(info['num_slots'], info['frame_shape'], info['dtype'], name=info['name'])
+    
+    def acquire(self, timeout: Optional[float] = None) -> int:
+        """Boş yuva indeksi (yoksa bekler)"""
+        return self.free_slots.get(timeout=timeout)
+    
+    def close(self):
+        self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+def _detect_boxes(detector, frame):
+    return [detection.bbox for detection in detector.detect_ships_manual(frame)]
+
+def _shared_worker(pool_info, free_slots, tasks, results, detect: bool):
+    """Süreç: yuva indeksini alır, kareyi kopyalamadan işler, yuvayı geri bırakır"""
+    from simple_detector import SimpleDetector
+    
+    detector = SimpleDetector() if detect else None
+    pool = SharedFramePool.attach(pool_info)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            slot, frame_index = task
+            boxes = _detect_boxes(detector, pool.frames[slot]) if detect else float(pool.frames[slot, 0, 0, 0])
+            free_slots.put(slot)  # Yuva geri dönüşüme
+            results.put((frame_index, boxes))
+    finally:
+        pool.close()
+
+def _pickle_worker(tasks, results, detect: bool):
+    """Süreç: kareyi kuyruktan (pickle ile kopyalanmış) alır"""
+    from simple_detector import SimpleDetector
+    
+    detector = SimpleDetector() if detect else None
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        frame_index, frame = task
+        boxes = _detect_boxes(detector, frame) if detect else float(frame[0, 0, 0])
+        results.put((frame_index, boxes))
+
+def _frame_source(video_path, max_frames, synthetic_shape):
+    """Video kaynağı (cv2) veya sentetik kare üretici; (kare şekli, okuma fonksiyonu) döndürür"""
+    if synthetic_shape is not None:
+        template = np.random.default_rng(0).integers(0, 255, synthetic_shape, dtype=np.uint8)
+        count = [0]
+        
+        def read(out=None):
+            if count[0] >= max_frames:
+                return False, None
+            count[0] += 1
+            if out is None:
+                return True, template.copy()  # Çözülmüş yeni kare gibi
+            np.copyto(out, template)
+            return True, out
+        return synthetic_shape, read, lambda: None
+    
+    import cv2
+    cap = cv2.VideoCapture(str(video_path))
+    shape = (int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+    remaining = [max_frames if max_frames is not None else float('inf')]
+    
+    def read(out=None):
+        if remaining[0] <= 0:
+            return False, None
+        remaining[0] -= 1
+        return cap.read(out) if out is not None else cap.read()
+    return shape, read, cap.release
+
+def _wait_workers(call, processes, poll: float = 1.0):
+    """call(timeout=poll) işlemini süreçler çalıştıkça tekrarlar; süreç hatayla bittiyse veya
+    hepsi bittiyse RuntimeError (ölen süreç yüzünden sonsuza kadar beklenmez)"""
+    while True:
+        try:
+            return call(timeout=poll)
+        except (queue.Empty, queue.Full):
+            failed = [process for process in processes if process.exitcode not in (None, 0)]
+            if failed or not any(process.is_alive() for process in processes):
+                codes = [process.exitcode for process in (failed or processes)]
+                raise RuntimeError(f"tespit süreci beklenmedik şekilde bitti (çıkış kodu {codes})")
+
+def _stop_workers(processes):
+    """Hata sonrası hâlâ görev bekleyen süreçleri sonlandırır (join takılmasın)"""
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+def run_shared(video_path=None, workers: int = 2, num_slots: Optional[int] = None, max_frames: Optional[int] = None,
+               detect: bool = True, synthetic_shape=None) -> dict:
+    """Paylaşımlı bellek yuvalarıyla çok süreçli tespit"""
+    context = mp.get_context('spawn')
+    shape, read, release = _frame_source(video_path, max_frames, synthetic_shape)
+    pool = SharedFramePool(num_slots or workers * 2, shape, context=context)
+    tasks, results = context.Queue(), context.Queue()
+    processes = [context.Process(target=_shared_worker, args=(pool.attach_info(), pool.free_slots, tasks, results, detect))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    
+    try:
+        start = time.perf_counter()
+        outputs, frame_index = {}, 0
+        while True:
+            slot = _wait_workers(pool.acquire, processes)
+            ret, _ = read(pool.frames[slot])  # Doğrudan yuvaya çöz
+            if not ret:
+                pool.free_slots.put(slot)
+                break
+            tasks.put((slot, frame_index))
+            frame_index += 1
+            while not results.empty():
+                index, boxes = results.get()
+                outputs[index] = boxes
+        
+        for _ in processes:
+            tasks.put(None)
+        while len(outputs) < frame_index:
+            index, boxes = _wait_workers(results.get, processes)
+            outputs[index] = boxes
+        elapsed = time.perf_counter() - start
+    except BaseException:
+        _stop_workers(processes)
+        raise
+    finally:
+        for process in processes:
+            process.join()
+        release()
+        pool.close()
+    
+    return {'frames': [outputs[i] for i in range(frame_index)], 'elapsed': elapsed, 'frame_shape': shape}
+
+def run_pickled(video_path=None, workers: int = 2, max_frames: Optional[int] = None, detect: bool = True,
+                synthetic_shape=None, max_pending: Optional[int] = None) -> dict:
+    """Kareleri pickle'lı kuyrukla gönderen karşılaştırma sürümü"""
+    context = mp.get_context('spawn')
+    shape, read, release = _frame_source(video_path, max_frames, synthetic_shape)
+    tasks, results = context.Queue(maxsize=max_pending or workers * 2), context.Queue()
+    processes = [context.Process(target=_pickle_worker, args=(tasks, results, detect)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    
+    try:
+        start = time.perf_counter()
+        outputs, frame_index = {}, 0
+        while True:
+            ret, frame = read()
+            if not ret:
+                break
+            _wait_workers(lambda timeout: tasks.put((frame_index, frame), timeout=timeout), processes)
+            frame_index += 1
+            while not results.empty():
+                index, boxes = results.get()
+                outputs[index] = boxes
+        
+        for _ in processes:
+            tasks.put(None)
+        while len(outputs) < frame_index:
+            index, boxes = _wait_workers(results.get, processes)
+            outputs[index] = boxes
+        elapsed = time.perf_counter() - start
+    except BaseException:
+        _stop_workers(processes)
+        raise
+    finally:
+        for process in processes:
+            process.join()
+        release()
+    
+    return {'frames': [outputs[i] for i in range(frame_index)], 'elapsed': elapsed, 'frame_shape': shape}
+
+def benchmark_transport(video_path="data/videos/4.mp4", workers: int = 2, max_frames: int = 200,
+                        synthetic_frames: int = 300):
+    """Pickle kuyruğu ile paylaşımlı bellek: 4K sentetik taşıma ve 4.mp4 üzerinde tespit"""
+    print(f"📦 Kare taşıma karşılaştırması ({workers} süreç)")
+    
+    shape = (2160, 3840, 3)
+    for name, runner in (("pickle kuyruğu", run_pickled), ("paylaşımlı bellek", run_shared)):
+        result = runner(workers=workers, max_frames=synthetic_frames, detect=False, synthetic_shape=shape)
+        fps = len(result['frames']) / result['elapsed']
+        print(f"  4K taşıma  {name:<18} {fps:8.1f} kare/s ({fps * np.prod(shape) / 1e9:.2f} GB/s)")
+    
+    outputs = {}
+    for name, runner in (("pickle kuyruğu", run_pickled), ("paylaşımlı bellek", run_shared)):
+        result = runner(video_path, workers=workers, max_frames=max_frames)
+        outputs[name] = result['frames']
+        print(f"  {video_path} tespit  {name:<18} {len(result['frames']) / result['elapsed']:8.1f} kare/s "
+              f"({len(result['frames'])} kare, {result['frame_shape'][1]}x{result['frame_shape'][0]})")
+    
+    same = outputs["pickle kuyruğu"] == outputs["paylaşımlı bellek"]
+    print(f"  {'✅' if same else '❌'} İki taşıma ile tespitler {'aynı' if same else 'farklı'}")
+    return same
+
+if __name__ == "__main__":
+    print("🚢 Paylaşımlı Bellek Kare Taşıma")
+    print("=" * 40)
+    benchmark_transport()
@@ -0,0 +1,240 @@
+"""
+Sentetik Yük ve Dayanıklılık (Soak) Testi
+=========================================
+Hareket eden gemiler, bunların gürültülü/kesintili AIS raporları ve mevcut
+kamera modeliyle tutarlı tespitler üretir; bunları AISMatcher eşleştirme
+hattından istenen hızda geçirir.
+
+Raporlananlar: işlem hızı, kare gecikmesi yüzdelikleri, bellek büyümesi ve
+gerçek kimliklere göre eşleştirme doğruluğu.
+"""
+
+import math
+import os
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from ais_matcher import AISMatcher, AISTarget, DetectedShip
+
+def current_rss_mb() -> Optional[float]:
+    """Sürecin anlık bellek kullanımı (MB); ölçülemezse None"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError, AttributeError):
+        return None
+
+class VesselScenario:
+    """Gemi hareketleri, AIS raporları ve kamera tespitleri üreten senaryo"""
+    
+    def __init__(self, num_vessels: int = 2000, max_detections: int = 60, seed: int = 0,
+                 own_position=(40.0, 32.0), camera_params: dict = None, max_range_m: float = 15000.0,
+                 detection_range_m: float = 8000.0, ais_interval=(2.0, 10.0), position_noise_m: float = 10.0,
+                 dropout: float = 0.1, pixel_noise: float = 5.0, miss_rate: float = 0.05,
+                 false_positive_rate: float = 0.05, camera_height_m: float = 20.0):
+        camera_params = camera_params or {'fx': 1600, 'fy': 1600, 'cx': 960, 'cy': 540}
+        self.camera = AISMatcher(camera_params)  # Tespitler matcher'ın kamera modeliyle projekte edilir
+        self.fx, self.fy = camera_params['fx'], camera_params['fy']
+        self.cx, self.cy = camera_params['cx'], camera_params['cy']
+        self.own_lat, self.own_lon = own_position
+        self.lon_scale = 111000 * math.cos(math.radians(self.own_lat))  # Matcher ile aynı düzlem yaklaşımı
+        
+        self.max_detections = max_detections
+        self.detection_range = detection_range_m
+        self.ais_interval = ais_interval  # AIS rapor aralığı (s), gemiye göre değişir
+        self.position_noise = position_noise_m  # GPS gürültüsü (m)
+        self.dropout = dropout  # Raporun kaybolma olasılığı
+        self.pixel_noise = pixel_noise  # Tespit merkezi gürültüsü (piksel)
+        self.miss_rate = miss_rate  # Görünür geminin tespit edilmeme olasılığı
+        self.false_positive_rate = false_positive_rate  # Kare başına tespitlerin bu oranı kadar sahte tespit
+        self.camera_height = camera_height_m
+        self.rng = np.random.default_rng(seed)
+        
+        n = num_vessels
+        rng = self.rng
+        self.mmsi = 200000000 + np.arange(n)
+        self.position = np.column_stack((rng.uniform(-max_range_m, max_range_m, n),
+                                         rng.uniform(200, max_range_m, n)))  # Doğu, kuzey (m)
+        self.heading = rng.uniform(0, 2 * np.pi, n)
+        self.speed = rng.uniform(0, 8, n)  # m/s
+        self.length = rng.uniform(20, 300, n)
+        self.width = self.length / rng.uniform(5, 8, n)
+        self.height = self.length * rng.uniform(0.15, 0.3, n)  # Su üstü yükseklik
+        self.max_range = max_range_m
+        
+        # Son AIS raporu (gürültülü konum), hiç rapor yoksa NaN
+        self.report_position = np.full((n, 2), np.nan)
+        self.report_interval = rng.uniform(*ais_interval, n)
+        self.next_report = rng.uniform(0, self.report_interval)
+        self.time = 0.0
+    
+    def step(self, dt: float):
+        """Gemileri ilerletir ve zamanı gelen AIS raporlarını (kayıplarla) üretir"""
+        self.time += dt
+        self.heading += self.rng.normal(0, 0.01, len(self.heading)) * dt
+        velocity = np.column_stack((np.sin(self.heading), np.cos(self.heading))) * self.speed[:, None]
+        self.position += velocity * dt
+        
+        # Sahneden çıkan gemiler karşı kenardan geri döner (gemi sayısı sabit)
+        self.position[:, 0] = (self.position[:, 0] + self.max_range) % (2 * self.max_range) - self.max_range
+        self.position[:, 1] = (self.position[:, 1] - 200) % (self.max_range - 200) + 200
+        
+        due = self.time >= self.next_report
+        if due.any():
+            received = due & (self.rng.random(len(due)) >= self.dropout)
+            noise = self.rng.normal(0, self.position_noise, (int(received.sum()), 2))
+            self.report_position[received] = self.position[received] + noise
+            self.next_report[due] += self.report_interval[due]
+    
+    def to_lat_lon(self, position: np.ndarray):
+        return self.own_lat + position[:, 1] / 111000, self.own_lon + position[:, 0] / self.lon_scale
+    
+    def ais_targets(self) -> List[AISTarget]:
+        """Şu ana kadar raporu alınmış gemilerin son AIS bilgileri"""
+        reported = np.flatnonzero(~np.isnan(self.report_position[:, 0]))
+        lats, lons = self.to_lat_lon(self.report_position[reported])
+        return [AISTarget(int(self.mmsi[i]), float(lat), float(lon), float(self.length[i]), float(self.width[i]))
+                for i, lat, lon in zip(reported.tolist(), lats.tolist(), lons.tolist())]
+    
+    def detections(self) -> List[DetectedShip]:
+        """Gerçek konumların kamera modeliyle tutarlı tespitleri (true_mmsi ile); sahte tespitlerde None"""
+        x, y = self.position[:, 0], self.position[:, 1]
+        ranges = np.hypot(x, y)
+        pixel_x, valid = self.camera.project_ais_arrays(*self.to_lat_lon(self.position), (self.own_lat, self.own_lon))
+        visible = valid & (pixel_x >= 0) & (pixel_x < 2 * self.cx) & (ranges <= self.detection_range)
+        visible &= self.rng.random(len(visible)) >= self.miss_rate
+        
+        # En yakın gemiler en büyük kutuları verir; kare başına en fazla max_detections
+        num_false = int(round(self.max_detections * self.false_positive_rate))
+        index = np.flatnonzero(visible)
+        index = index[np.argsort(ranges[index], kind='stable')][:self.max_detections - num_false]
+        
+        # Görünür boy: gemi yönüne göre boy ve genişlik karışımı
+        relative = self.heading[index] - np.arctan2(x[index], y[index])
+        apparent = np.abs(self.length[index] * np.sin(relative)) + np.abs(self.width[index] * np.cos(relative))
+        r = ranges[index]
+        w = np.maximum(self.fx * apparent / r, 4)
+        h = np.maximum(self.fy * self.height[index] / r, 3)
+        center_x = pixel_x[index] + self.rng.normal(0, self.pixel_noise, len(index))
+        bottom = self.cy + self.fy * self.camera_height / r  # Su hattı ufkun altında, uzaklaştıkça ufka yaklaşır
+        
+        detections = []
+        for i, cx, bottom_y, bw, bh in zip(index.tolist(), center_x.tolist(), bottom.tolist(), w.tolist(), h.tolist()):
+            detection = DetectedShip((int(cx - bw / 2), int(bottom_y - bh), int(bw), int(bh)),
+                                     confidence=float(self.rng.uniform(0.6, 1.0)))
+            detection.true_mmsi = int(self.mmsi[i])
+            detections.append(detection)
+        
+        for _ in range(num_false):
+            bw, bh = self.rng.uniform(20, 200), self.rng.uniform(10, 80)
+            detection = DetectedShip((int(self.rng.uniform(0, 2 * self.cx - bw)), int(self.rng.uniform(self.cy, 2 * self.cy - bh)),
+                                      int(bw), int(bh)), confidence=float(self.rng.uniform(0.3, 0.7)))
+            detection.true_mmsi = None
+            detections.append(detection)
+        return detections
+
+def run_simulation(scenario: VesselScenario, matcher: AISMatcher = None, rate_hz: float = 10.0,
+                   duration_s: float = 60.0, realtime: bool = True, match_store=None, report_every_s: float = 60.0) -> dict:
+    """Senaryoyu eşleştirme hattından rate_hz hızında geçirir ve ölçümleri döndürür"""
+    matcher = matcher or AISMatcher()
+    own_position = (scenario.own_lat, scenario.own_lon)
+    dt = 1.0 / rate_hz
+    num_frames = int(round(duration_s * rate_hz))
+    
+    latencies = np.empty(num_frames)
+    memory = []  # (kare, MB)
+    matched = correct = detectable = false_matches = 0
+    
+    start = time.perf_counter()
+    next_report = report_every_s
+    for frame in range(num_frames):
+        if realtime:
+            delay = start + frame * dt - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        
+        scenario.step(dt)
+        frame_start = time.perf_counter()
+        ais_targets = scenario.ais_targets()
+        detections = scenario.detections()
+        matches = matcher.match_targets(ais_targets, detections, own_position)
+        if match_store is not None:
+            match_store.add_matches(matches, camera="sim", ts=scenario.time, frame=frame)
+        latencies[frame] = time.perf_counter() - frame_start
+        
+        # Doğruluk: gerçek kimliği olan ve AIS raporu bulunan tespitler yakalanabilir sayılır
+        reported = {target.mmsi for target in ais_targets}
+        detectable += sum(1 for d in detections if d.true_mmsi in reported)
+        matched += len(matches)
+        for ais, detection, _ in matches:
+            if detection.true_mmsi is None:
+                false_matches += 1
+            elif ais.mmsi == detection.true_mmsi:
+                correct += 1
+        
+        if frame % max(int(rate_hz * 10), 1) == 0:
+            memory.append((frame, current_rss_mb()))
+        if time.perf_counter() - start >= next_report:
+            next_report += report_every_s
+            print(f"  ⏳ {frame + 1}/{num_frames} kare, p95 {np.percentile(latencies[:frame + 1], 95) * 1000:.1f} ms, "
+                  f"bellek {memory[-1][1] or 0:.1f} MB")
+    
+    elapsed = time.perf_counter() - start
+    memory.append((num_frames, current_rss_mb()))
+    latencies_ms = latencies * 1000
+    
+    # Bellek büyümesi: ilk %10 ısınma sayılır, sonrasına doğru eğimi (MB/saat)
+    samples = [(f, m) for f, m in memory if m is not None]
+    warm = [s for s in samples if s[0] >= num_frames * 0.1] or samples
+    growth_mb = warm[-1][1] - warm[0][1] if warm else 0.0
+    slope = 0.0
+    if len(warm) >= 2 and warm[-1][0] > warm[0][0]:
+        frames, values = np.array(warm, dtype=float).T
+        slope = float(np.polyfit(frames / rate_hz / 3600, values, 1)[0])
+    
+    return {
+        'frames': num_frames,
+        'vessels': len(scenario.mmsi),
+        'elapsed_s': elapsed,
+        'fps': num_frames / elapsed if elapsed > 0 else float('inf'),
+        'latency_p50_ms': float(np.percentile(latencies_ms, 50)),
+        'latency_p95_ms': float(np.percentile(latencies_ms, 95)),
+        'latency_p99_ms': float(np.percentile(latencies_ms, 99)),
+        'latency_max_ms': float(latencies_ms.max()),
+        'over_budget': int((latencies > dt).sum()),
+        'memory_start_mb': warm[0][1] if warm else None,
+        'memory_end_mb': warm[-1][1] if warm else None,
+        'memory_growth_mb': growth_mb,
+        'memory_slope_mb_per_h': slope,
+        'matches': matched,
+        'precision': correct / matched if matched else 0.0,
+        'recall': correct / detectable if detectable else 0.0,
+        'false_positive_matches': false_matches,
+    }
+
+def print_report(result: dict, rate_hz: float):
+    print(f"📈 {result['frames']} kare, {result['vessels']} gemi: {result['elapsed_s']:.1f} s, {result['fps']:.1f} kare/s "
+          f"(hedef {rate_hz:g})")
+    print(f"  Gecikme: p50 {result['latency_p50_ms']:.1f} ms, p95 {result['latency_p95_ms']:.1f}, "
+          f"p99 {result['latency_p99_ms']:.1f}, en fazla {result['latency_max_ms']:.1f}; "
+          f"kare süresini aşan: {result['over_budget']}")
+    if result['memory_start_mb'] is not None:
+        print(f"  Bellek: {result['memory_start_mb']:.1f} -> {result['memory_end_mb']:.1f} MB "
+              f"({result['memory_growth_mb']:+.1f} MB, {result['memory_slope_mb_per_h']:+.1f} MB/saat)")
+    print(f"  Doğruluk: {result['matches']} eşleştirme, kesinlik {result['precision']:.1%}, "
+          f"duyarlılık {result['recall']:.1%}, sahte tespite eşleşme {result['false_positive_matches']}")
+
+if __name__ == "__main__":
+    print("🚢 Sentetik Yük Testi")
+    print("=" * 40)
+    for gating in (None, True):
+        print(f"\nKademeli eleme: {'açık' if gating else 'kapalı'}")
+        result = run_simulation(VesselScenario(), AISMatcher(gating=gating), rate_hz=10.0, duration_s=30.0, realtime=False)
+        print_report(result, 10.0)
@@ -0,0 +1,219 @@
+"""
+Döşemeli Paralel Tespit
+=======================
+data/ klasöründeki kareler 3840x2160. detect_ships_manual bu kareyi tek parça
+halinde tek çekirdekte işler. Bu modda ufuk bandı (gemiler etiketlerde
+yüksekliğin %42-61'i arasında) örtüşen dikey sütun döşemelerine bölünür
+(varsayılan: iş parçacığı başına bir sütun); Canny, kontur ve skor her
+döşemede bir iş parçacığı havuzunda çalışır (OpenCV bu çağrılarda GIL'i
+bırakır).
+
+Döşeme sınırlarında (dikiş) birleştirme:
+- Döşeme içinde kalan kutu tek parça tespitle aynıdır.
+- Bir iç dikişe değen kutu kesilmiş sayılır. Komşu döşemede tamamı görünen
+  kutunun içinde kalıyorsa atılır.
+- Kalan kesik parçalar (örtüşmeden geniş gemiler) farklı döşemelerde
+  kesişiyorlarsa gruplanır; grubun birleşik bölgesi küçük bir payla yeniden
+  aranır. Böylece kontur ve skor tek parça tespitle aynı olur. Bu bölgeler
+  seyrek ve küçüktür.
+- Son olarak tüm kutular her zamanki NMS + top_k seçiminden geçer (döşeme
+  örtüşmesindeki kopyalar burada elenir).
+
+Kare başına gecikme çekirdek sayısıyla birlikte düşer; fazladan iş sadece
+sütun örtüşmeleridir. Ufuk bandı taranan pikseli ayrıca ~2.5 kat azaltır.
+Tek çekirdekte kazanç sadece banttan gelir.
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
+
+from tracker import intersection_matrix
+
+# Etiketlerdeki gemi merkezleri yüksekliğin 0.42-0.61'i arasında; pay ile
+HORIZON_BAND = (0.3, 0.7)
+SEAM_TOLERANCE = 2  # Dikişe bu kadar pikselden yakın kutu kesik sayılır
+SEAM_MIN_PART = 10  # Dikiş parçası boyut eşiğine takılmaz ama bundan kısa kenarlı gürültü atılır
+SEAM_MARGIN = 16  # Dikiş bölgesi yeniden aranırken her yöne eklenen pay (piksel)
+
+def tile_windows(frame_shape, tiles: int = 4, overlap: int = 256,
+                 band: Optional[Tuple[float, float]] = HORIZON_BAND) -> Tuple[np.ndarray, np.ndarray]:
+    """Bandı komşuları overlap kadar örtüşen tiles sütuna böler: pencereler (x0, y0, x1, y1) ve her pencerenin
+    hangi kenarının iç dikiş olduğu (sol, üst, sağ, alt); band: taranacak satırlar (yüksekliğin oranı), None ise tüm kare"""
+    height, width = frame_shape[:2]
+    top, bottom = (0, height) if band is None else (int(band[0] * height), int(round(band[1] * height)))
+    # Örtüşmeden dar sütun işi artırır ama gemiyi tam göstermez
+    tiles = max(1, min(tiles, (width - overlap) // max(overlap, 1)))
+    tile_width = math.ceil((width + (tiles - 1) * overlap) / tiles)
+    starts = np.linspace(0, width - tile_width, tiles).round().astype(np.int64)
+    
+    windows = np.column_stack([starts, np.full(tiles, top), starts + tile_width, np.full(tiles, bottom)])
+    # Kare ve bant kenarları dikiş değildir (orada kesilen kutu tek parça tespitte de kesiktir)
+    inner = np.column_stack([windows[:, 0] > 0, np.zeros(tiles, bool), windows[:, 2] < width, np.zeros(tiles, bool)])
+    return windows, inner
+
+def seam_cut(boxes: np.ndarray, window, inner) -> np.ndarray:
+    """Döşeme koordinatlarındaki (x, y, w, h) kutulardan bir iç dikişe değenler"""
+    x0, y0, x1, y1 = window
+    left, top, right, bottom = inner
+    return ((left & (boxes[:, 0] <= SEAM_TOLERANCE))
+            | (top & (boxes[:, 1] <= SEAM_TOLERANCE))
+            | (right & (boxes[:, 0] + boxes[:, 2] >= x1 - x0 - SEAM_TOLERANCE))
+            | (bottom & (boxes[:, 1] + boxes[:, 3] >= y1 - y0 - SEAM_TOLERANCE)))
+
+def seam_regions(boxes: np.ndarray, cut: np.ndarray, tiles: np.ndarray, min_size: Tuple[int, int] = (0, 0),
+                 containment_threshold: float = 0.8) -> np.ndarray:
+    """Kesik parçalardan komşu döşemede tamamı görünen gemilere ait olmayanları, farklı döşemelerde
+    kesişenlerle gruplar; min_size'dan büyük grupların birleşik bölgeleri (x0, y0, x1, y1)"""
+    boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+    whole, parts = np.flatnonzero(~cut), np.flatnonzero(cut)
+    if not len(parts):
+        return np.zeros((0, 4), dtype=np.int64)
+    
+    areas = boxes[parts, 2] * boxes[parts, 3]
+    contained = (intersection_matrix(boxes[parts], boxes[whole]) / np.maximum(areas, 1)[:, None]).max(axis=1, initial=0)
+    parts = parts[contained <= containment_threshold]
+    
+    # Farklı döşemelerde kesişen parçalar aynı gemidir (birleşim-bul)
+    overlaps = intersection_matrix(boxes[parts], boxes[parts]) > 0
+    overlaps &= tiles[parts][:, None] != tiles[parts][None, :]
+    group = list(range(len(parts)))
+    
+    def root(i):
+        while group[i] != i:
+            group[i] = group[group[i]]
+            i = group[i]
+        return i
+    
+    for i, j in zip(*np.nonzero(np.triu(overlaps, 1))):
+        group[root(i)] = root(j)
+    
+    roots = np.array([root(i) for i in range(len(parts))], dtype=np.int64)
+    regions = []
+    for r in np.unique(roots):
+        members = boxes[parts[roots == r]]
+        regions.append((members[:, 0].min(), members[:, 1].min(),
+                        (members[:, 0] + members[:, 2]).max(), (members[:, 1] + members[:, 3]).max()))
+    regions = np.array(regions, dtype=np.int64).reshape(-1, 4)
+    # Parçaların birleşimi konturun tamamını kapsar; bundan küçük bölgede gemi boyutunda kontur olamaz
+    return regions[(regions[:, 2] - regions[:, 0] > min_size[0]) & (regions[:, 3] - regions[:, 1] > min_size[1])]
+
+class TiledDetection:
+    """Döşeme geometrisi (kare boyutu başına önbellekli) ve döşemeleri çalıştıran iş parçacığı havuzu"""
+    
+    def __init__(self, tiles: Optional[int] = None, overlap: int = 256, band: Optional[Tuple[float, float]] = HORIZON_BAND,
+                 workers: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.tiles = tiles or self.workers  # Çekirdek başına bir sütun: fazladan iş sadece örtüşmeler
+        self.overlap = overlap  # En geniş gemiden büyükse gemi en az bir döşemede tam görünür
+        self.band = band
+        self._executor = None
+        self._layouts = {}
+        self.frames = 0
+        self.elapsed = 0.0
+    
+    def layout(self, frame_shape) -> Tuple[np.ndarray, np.ndarray]:
+        key = tuple(frame_shape[:2])
+        if key not in self._layouts:
+            self._layouts[key] = tile_windows(key, self.tiles, self.overlap, self.band)
+        return self._layouts[key]
+    
+    def map(self, function, *iterables) -> list:
+        """function'ı döşemelerde havuzda çalıştırır (tek iş parçacığında doğrudan)"""
+        if self.workers == 1:
+            return list(map(function, *iterables))
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tile")
+        return list(self._executor.map(function, *iterables))
+    
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def record(self, elapsed: float):
+        self.frames += 1
+        self.elapsed += elapsed
+    
+    def print_summary(self):
+        if self.frames:
+            band = "tüm kare" if self.band is None else f"bant {self.band[0]:g}-{self.band[1]:g}"
+            print(f"🧩 Döşemeli tespit: {self.tiles} döşeme, {self.overlap}px örtüşme, {band}, "
+                  f"{self.workers} iş parçacığı, ort. {self.elapsed / self.frames * 1000:.1f} ms/kare")
+
+def benchmark_tiling(data_dir="data", repeats: int = 3, worker_counts=None, overlap: int = 256,
+                     scenes: int = 6):
+    """Tek parça ve döşemeli tespit: 4K etiketli görüntülerde ms/kare, sentetik 4K sahnelerde tek parça
+    tespitlerle birebir aynılık ve gemi yakalama"""
+    from pathlib import Path
+    import cv2
+    from ais_matcher import AISMatcher
+    from roi_detection import synthetic_sea_scene
+    from simple_detector import SimpleDetector
+    from tracker import iou_matrix
+    
+    images = [cv2.imread(str(path)) for path in sorted(Path(data_dir, "txt").glob("*.jpg"))]
+    matcher = AISMatcher(camera_params={'fx': 3200, 'fy': 3200, 'cx': 1920, 'cy': 1080})
+    synthetic = [synthetic_sea_scene(matcher, (40.0, 32.0), (2160, 3840), num_ais=12, num_dark=2, seed=seed)
+                 for seed in range(scenes)]
+    frames = images or [frame for frame, *_ in synthetic]
+    
+    cpus = os.cpu_count() or 1
+    worker_counts = worker_counts or sorted({1, 2, 4, cpus})
+    height, width = frames[0].shape[:2]
+    print(f"🧩 Döşemeli tespit karşılaştırması: {len(frames)} {'görüntü' if images else 'sentetik kare'} "
+          f"({width}x{height}) ile süre, {len(synthetic)} sentetik sahne ile parite; {cpus} CPU")
+    
+    def run(detector):
+        detector.detect_ships_manual(frames[0])  # Isınma (havuz, döşeme düzeni)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for frame in frames:
+                detector.detect_ships_manual(frame)
+        elapsed = (time.perf_counter() - start) / (repeats * len(frames)) * 1000
+        return elapsed, [detector.detect_ships_manual(frame) for frame, *_ in synthetic]
+    
+    def recall(results):
+        found = total = 0
+        for (_, _, truth, _), detections in zip(synthetic, results):
+            iou = iou_matrix(truth, [d.bbox for d in detections])
+            found += int((iou.max(axis=1) >= 0.3).sum()) if iou.size else 0
+            total += len(truth)
+        return f"{found}/{total}"
+    
+    top_k = 20
+    base_ms, reference = run(SimpleDetector(top_k=top_k))
+    print(f"  {'tek parça':<26} {base_ms:7.1f} ms/kare  gemi yakalama {recall(reference)}")
+    
+    timings = {}
+    for band in (None, HORIZON_BAND):
+        for workers in worker_counts:
+            with TiledDetection(None, overlap, band, workers) as tiling:
+                elapsed, results = run(SimpleDetector(top_k=top_k, tiling=tiling))
+            timings[(band, workers)] = elapsed
+            same = sum([d.bbox for d in a] == [d.bbox for d in b] for a, b in zip(results, reference))
+            name = f"{'tüm kare' if band is None else 'ufuk bandı'}, {workers} iş parçacığı"
+            print(f"  {name:<26} {elapsed:7.1f} ms/kare  ({base_ms / elapsed:.2f}x)  gemi yakalama {recall(results)}, "
+                  f"tek parçayla aynı {same}/{len(synthetic)} sahne")
+    
+    # Dar örtüşme: gemilerin çoğu dikişte bölünür, birleştirme yolu sınanır
+    detector = SimpleDetector(top_k=top_k, tiling=TiledDetection(12, 32, None, 1))
+    results = [detector.detect_ships_manual(frame) for frame, *_ in synthetic]
+    same = sum([d.bbox for d in a] == [d.bbox for d in b] for a, b in zip(results, reference))
+    print(f"  {'dikiş testi (12 x 32px)':<26} gemi yakalama {recall(results)}, tek parçayla aynı {same}/{len(synthetic)} sahne")
+    return base_ms, timings
+
+if __name__ == "__main__":
+    print("🚢 Döşemeli Paralel Tespit")
+    print("=" * 40)
+    benchmark_tiling()
@@ -0,0 +1,113 @@
+"""
+Basit IoU Takipçisi
+===================
+Tespitleri kareler arasında IoU ile ilişkilendirir ve sabit hız varsayımıyla
+tespit yapılmayan karelerde kutuları tahmin eder (ara değer/öteleme).
+"""
+
+from typing import List
+
+import numpy as np
+
+from ais_matcher import DetectedShip
+
+def intersection_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """(x, y, w, h) kutu dizileri arasındaki kesişim alanları"""
+    boxes_a = np.asarray(boxes_a, dtype=float).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=float).reshape(-1, 4)
+    
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 0] + boxes_a[:, None, 2], boxes_b[None, :, 0] + boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 1] + boxes_a[:, None, 3], boxes_b[None, :, 1] + boxes_b[None, :, 3])
+    
+    return np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """(x, y, w, h) kutu dizileri arasındaki IoU matrisi"""
+    boxes_a = np.asarray(boxes_a, dtype=float).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=float).reshape(-1, 4)
+    
+    intersection = intersection_matrix(boxes_a, boxes_b)
+    union = (boxes_a[:, 2] * boxes_a[:, 3])[:, None] + (boxes_b[:, 2] * boxes_b[:, 3])[None, :] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-9), 0.0)
+
+def greedy_iou_pairs(iou: np.ndarray, threshold: float):
+    """En yüksek IoU'dan başlayarak eşik üstündeki çiftleri birer kez eşleştirir"""
+    rows, cols = np.nonzero(iou >= threshold)
+    order = np.argsort(-iou[rows, cols], kind='stable')
+    used_rows, used_cols, pairs = set(), set(), []
+    for k in order:
+        i, j = rows[k], cols[k]
+        if i in used_rows or j in used_cols:
+            continue
+        used_rows.add(i)
+        used_cols.add(j)
+        pairs.append((int(i), int(j)))
+    return pairs
+
+class Track:
+    """Takip edilen tek gemi kutusu"""
+    
+    def __init__(self, track_id: int, bbox, confidence: float, frame_index: int):
+        self.id = track_id
+        self.bbox = np.asarray(bbox, dtype=float)
+        self.velocity = np.zeros(4)  # Kare başına (x, y, w, h) değişimi
+        self.confidence = confidence
+        self.last_frame = frame_index
+        self.hits = 1
+    
+    def predict(self, frame_index: int) -> np.ndarray:
+        """Sabit hızla frame_index karesindeki kutu"""
+        return self.bbox + self.velocity * (frame_index - self.last_frame)
+
+class IoUTracker:
+    """Tespitleri IoU ile takiplere bağlayan, aradaki karelerde kutu tahmin eden takipçi"""
+    
+    def __init__(self, iou_threshold: float = 0.3, max_missed: int = 15, smoothing: float = 0.5):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed  # Bu kadar kare görülmeyen takip silinir
+        self.smoothing = smoothing  # Hız güncellemesinde yeni ölçümün ağırlığı
+        self.tracks: List[Track] = []
+        self._next_id = 1
+    
+    def update(self, detections: List[DetectedShip], frame_index: int) -> List[DetectedShip]:
+        """Yeni tespitleri takiplere bağlar; tespitlere track_id ekler"""
+        predicted = np.array([track.predict(frame_index) for track in self.tracks]).reshape(-1, 4)
+        boxes = np.array([detection.bbox for detection in detections], dtype=float).reshape(-1, 4)
+        pairs = greedy_iou_pairs(iou_matrix(predicted, boxes), self.iou_threshold)
+        
+        matched = set()
+        for i, j in pairs:
+            track = self.tracks[i]
+            steps = max(frame_index - track.last_frame, 1)
+            velocity = (boxes[j] - track.bbox) / steps
+            track.velocity = self.smoothing * velocity + (1 - self.smoothing) * track.velocity
+            track.bbox = boxes[j]
+            track.confidence = detections[j].confidence
+            track.last_frame = frame_index
+            track.hits += 1
+            detections[j].track_id = track.id
+            matched.add(j)
+        
+        for j, detection in enumerate(detections):
+            if j not in matched:
+                track = Track(self._next_id, boxes[j], detection.confidence, frame_index)
+                self._next_id += 1
+                self.tracks.append(track)
+                detection.track_id = track.id
+        
+        self.tracks = [track for track in self.tracks if frame_index - track.last_frame <= self.max_missed]
+        return detections
+    
+    def predict(self, frame_index: int) -> List[DetectedShip]:
+        """Tespit yapılmayan karede takiplerin tahmini kutuları"""
+        detections = []
+        for track in self.tracks:
+            x, y, w, h = track.predict(frame_index)
+            if w <= 0 or h <= 0:
+                continue
+            detection = DetectedShip((int(round(x)), int(round(y)), int(round(w)), int(round(h))), track.confidence)
+            detection.track_id = track.id
+            detections.append(detection)
+        return detections
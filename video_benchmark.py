@@ -0,0 +1,321 @@
+"""
+Uçtan Uca Video Hız Ölçümü
+==========================
+SimpleDetector.run_video'yu paketteki videolarda (ve verilen kliplerde)
+penceresiz, ısınmadan sonra sabit kare sayısıyla çalıştırır. Her video ayrı
+süreçte ve birkaç kez ölçülür (medyan raporlanır); tepe RSS ve CPU süresi
+diğer videolardan etkilenmez.
+
+Ölçülenler:
+- aşama başına kare gecikmesi (çözme, tespit, eşleştirme, çıktı) ort/p50/p95/p99/max
+- sürekli kare/s (ısınma hariç duvar saati), CPU kullanımı ve kare başına CPU süresi
+- tepe RSS, toplam tespit ve eşleştirme sayısı (çıktı değişimi kontrolü)
+
+Sonuç JSON raporuna (varsayılan: geçici dizin) yazılır. Taban rapor verilirse
+aşama gecikmeleri, kare/s, CPU ve RSS karşılaştırılır; tolerans ve tekrarlar
+arasındaki yayılım (gürültü) aşılırsa gerileme olarak bildirilir. Farklı
+ayarlarla veya farklı makinede alınmış taban karşılaştırılmaz; çok az kare
+ölçüldüyse süreler kapı olarak kullanılmaz.
+"""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+REPORT_VERSION = 1
+DEFAULT_VIDEOS = ("data/videos/1.mp4", "data/videos/4.mp4")
+DEFAULT_REPORT = str(Path(tempfile.gettempdir()) / "video_bench.json")
+# Bu alanlar farklıysa ölçümler karşılaştırılamaz (sürüm farkları sadece uyarı)
+COMPARABLE_PLATFORM = ('machine', 'cpus')
+MIN_GATE_FRAMES = 100  # Bundan az ölçülen karede süre farkları gerileme sayılmaz
+
+class PipelineProfiler:
+    """run_video aşama süreleri: kare başında begin, aşama sonlarında lap, kare sonunda end
+    (ilk warmup kare istatistiklere girmez; zamanlayıcı/ROI modunda 'eşleştirme' tespiti de içerir)"""
+    
+    def __init__(self, warmup: int = 0):
+        self.warmup = warmup
+        self.frames = 0  # Isınma dahil tamamlanan kare
+        self.stages = {}  # aşama -> kare başına süre listesi (s)
+        self.totals = []
+        self.detections = 0
+        self.matches = 0
+        self.wall_start = self.wall_end = None
+        self.cpu_start = self.cpu_end = None
+        self._frame = {}
+        self._start = self._mark = 0.0
+    
+    def begin(self):
+        if self.wall_start is None and self.frames >= self.warmup:
+            self.wall_start = time.perf_counter()
+            self.cpu_start = time.process_time()  # Tüm iş parçacıkları dahil süreç CPU süresi
+        self._frame = {}
+        self._start = self._mark = time.perf_counter()
+    
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        self._frame[stage] = self._frame.get(stage, 0.0) + now - self._mark
+        self._mark = now
+    
+    def end(self, stage: str, detections: int = 0, matches: int = 0):
+        self.lap(stage)
+        self.frames += 1
+        if self.frames <= self.warmup:
+            return
+        for name, elapsed in self._frame.items():
+            self.stages.setdefault(name, []).append(elapsed)
+        self.totals.append(self._mark - self._start)
+        self.detections += detections
+        self.matches += matches
+        self.wall_end = self._mark
+        self.cpu_end = time.process_time()
+    
+    def summary(self) -> dict:
+        measured = len(self.totals)
+        wall = (self.wall_end - self.wall_start) if measured else 0.0
+        cpu = (self.cpu_end - self.cpu_start) if measured else 0.0
+        return {
+            'frames': measured,
+            'warmup': min(self.frames, self.warmup),
+            'fps': measured / wall if wall > 0 else 0.0,
+            'cpu_percent': 100 * cpu / wall if wall > 0 else 0.0,
+            'cpu_ms_per_frame': cpu / measured * 1000 if measured else 0.0,
+            'latency_ms': {'toplam': latency_stats(self.totals),
+                           **{name: latency_stats(values) for name, values in self.stages.items()}},
+            'detections': self.detections,
+            'matches': self.matches,
+        }
+
+def latency_stats(values) -> dict:
+    """Süre listesinin (s) ms cinsinden dağılımı"""
+    ms = np.asarray(values, dtype=float) * 1000
+    if not len(ms):
+        return {}
+    p50, p95, p99 = np.percentile(ms, (50, 95, 99)).tolist()
+    return {'ort': float(ms.mean()), 'p50': p50, 'p95': p95, 'p99': p99, 'max': float(ms.max())}
+
+def _measure_video(video_path: str, frames: int, warmup: int, render: bool, result_queue):
+    """Ayrı süreçte run_video; sonuç sözlüğü (veya {'error': ...}) kuyruğa yazılır"""
+    import contextlib
+    import resource
+    import cv2
+    from simple_detector import SimpleDetector
+    
+    try:
+        cap = cv2.VideoCapture(video_path)
+        ret, frame = cap.read()
+        cap.release()
+        if not ret:
+            result_queue.put({'error': "kare okunamadı (dosya yok veya codec desteklenmiyor)"})
+            return
+        
+        detector = SimpleDetector()
+        profiler = PipelineProfiler(warmup)
+        # run_video ve AIS yüklemesi her karede mesaj yazar; ölçüme terminal çıktısı karışmasın
+        with open(os.devnull, 'w') as quiet, contextlib.redirect_stdout(quiet):
+            detector.run_video(video_path, display=False, max_frames=warmup + frames, render=render, profiler=profiler)
+        
+        result = profiler.summary()
+        result['resolution'] = [frame.shape[1], frame.shape[0]]
+        result['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        result_queue.put(result)
+    except Exception as e:
+        result_queue.put({'error': f"{type(e).__name__}: {e}"})
+
+def measure_video(video_path, frames: int = 300, warmup: int = 30, render: bool = True) -> dict:
+    """Tek videoyu ayrı süreçte ölçer"""
+    import multiprocessing as mp
+    import queue
+    
+    context = mp.get_context('spawn')
+    result_queue = context.Queue()
+    process = context.Process(target=_measure_video, args=(str(video_path), frames, warmup, render, result_queue))
+    process.start()
+    while True:
+        try:
+            result = result_queue.get(timeout=1.0)
+            break
+        except queue.Empty:
+            if not process.is_alive():
+                result = {'error': f"ölçüm süreci beklenmedik şekilde bitti (çıkış kodu {process.exitcode})"}
+                break
+    process.join()
+    return result
+
+def _metrics(result: dict) -> dict:
+    """Karşılaştırılan sayısal ölçümler: isim -> değer"""
+    metrics = {'fps': result['fps'], 'cpu_percent': result['cpu_percent'],
+               'cpu_ms_per_frame': result['cpu_ms_per_frame'], 'peak_rss_mb': result['peak_rss_mb']}
+    for stage, stats in result['latency_ms'].items():
+        for key, value in stats.items():
+            metrics[f"{stage} {key}"] = value
+    return metrics
+
+def median_result(runs: List[dict]) -> dict:
+    """Tekrarlanan ölçümlerin medyanı; 'spread' her ölçümün tekrarlar arasındaki yayılımı (max - min)"""
+    if any('error' in run for run in runs):
+        return next(run for run in runs if 'error' in run)
+    result = json.loads(json.dumps(runs[0]))
+    values = {name: [_metrics(run).get(name, 0.0) for run in runs] for name in _metrics(runs[0])}
+    for name, samples in values.items():
+        median = float(np.median(samples))
+        if ' ' in name:
+            stage, key = name.rsplit(' ', 1)
+            result['latency_ms'][stage][key] = median
+        else:
+            result[name] = median
+    result['repeats'] = len(runs)
+    result['spread'] = {name: float(max(samples) - min(samples)) for name, samples in values.items()}
+    # Tespit/eşleştirme sayısı kareler aynı olduğu için tekrarlar arasında değişmemeli
+    if len({(run['detections'], run['matches']) for run in runs}) > 1:
+        result['unstable_output'] = [(run['detections'], run['matches']) for run in runs]
+    return result
+
+def build_report(results: dict, settings: dict) -> dict:
+    """Video sonuçları + ortam bilgisi (farklı makinedeki taban karşılaştırılmaz)"""
+    import platform
+    import cv2
+    
+    return {
+        'version': REPORT_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'platform': {'python': platform.python_version(), 'machine': platform.machine(), 'cpus': os.cpu_count(),
+                     'opencv': cv2.__version__, 'numpy': np.__version__},
+        'settings': settings,
+        'videos': results,
+    }
+
+def _write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def _change(old: float, new: float) -> str:
+    return f"{(new - old) / old * 100:+.1f}%" if old else "  yeni"
+
+def incomparable_reason(baseline: dict, report: dict) -> Optional[str]:
+    """Taban bu raporla karşılaştırılamıyorsa nedeni (ayar veya makine farkı), karşılaştırılabiliyorsa None"""
+    if baseline.get('settings') != report['settings']:
+        return f"taban farklı ayarlarla alınmış: {baseline.get('settings')} (şimdi {report['settings']})"
+    old_platform = baseline.get('platform') or {}
+    for key in COMPARABLE_PLATFORM:
+        if old_platform.get(key) != report['platform'][key]:
+            return f"taban farklı makinede alınmış: {key} {old_platform.get(key)} (şimdi {report['platform'][key]})"
+    return None
+
+def compare_reports(baseline: dict, report: dict, tolerance: float = 0.15, tail_tolerance: float = 0.30,
+                    min_delta_ms: float = 0.5, min_delta_mb: float = 10.0) -> List[str]:
+    """Tabana göre gerilemeler (boş liste: gerileme yok); küçük mutlak farklar ve tekrarlar arasındaki
+    yayılımdan küçük farklar gürültü sayılır, p95 daha geniş tail_tolerance ile karşılaştırılır
+    (önce incomparable_reason ile karşılaştırılabilirlik kontrol edilmeli)"""
+    if baseline.get('platform') != report['platform']:
+        print(f"  ⚠️ Taban farklı yazılım sürümleriyle alınmış: {baseline.get('platform')}")
+    
+    regressions = []
+    
+    def check(video, key, name, old, new, worse, floor, unit, gate=True, relative=tolerance):
+        # Gürültü payı: iki raporun yayılımlarından büyüğü (tek ölçümlü raporda 0)
+        noise = max(old.get('spread', {}).get(key, 0.0), new.get('spread', {}).get(key, 0.0))
+        old_value, new_value = _metrics(old)[key], _metrics(new)[key]
+        regressed = worse * (new_value - old_value) > max(relative * abs(old_value), floor, noise)
+        mark = ('❌' if gate else '⚠️') if regressed else '✅'
+        print(f"    {mark} {name:<22} {old_value:>9.2f} -> {new_value:>9.2f} {unit:<6} {_change(old_value, new_value)}"
+              f"{f'  (±{noise:.2f})' if noise else ''}")
+        if regressed and gate:
+            regressions.append(f"{video}: {name} {old_value:.2f} -> {new_value:.2f} {unit}")
+    
+    for video, result in report['videos'].items():
+        old = baseline.get('videos', {}).get(video)
+        if old is None or 'error' in old or 'error' in result:
+            print(f"  {video}: karşılaştırılamadı (tabanda yok veya ölçülemedi)")
+            continue
+        # Çok az karede yüzdelikler ve kare/s tek tük yavaş karelerle oynar; süreler sadece bilgi
+        gate = min(old['frames'], result['frames']) >= MIN_GATE_FRAMES
+        print(f"  {video}" + ("" if gate else f" (⚠️ {min(old['frames'], result['frames'])} kare < {MIN_GATE_FRAMES}: "
+                                             f"süre farkları gerileme sayılmaz)"))
+        check(video, 'fps', "kare/s", old, result, -1, 0.0, "kare/s", gate)
+        check(video, 'cpu_ms_per_frame', "CPU / kare", old, result, 1, min_delta_ms, "ms", gate)
+        check(video, 'peak_rss_mb', "tepe RSS", old, result, 1, min_delta_mb, "MB")
+        for stage, stats in result['latency_ms'].items():
+            if not old['latency_ms'].get(stage) or not stats:
+                continue
+            for percentile, relative in (('p50', tolerance), ('p95', tail_tolerance)):
+                check(video, f"{stage} {percentile}", f"{stage} {percentile}", old, result, 1, min_delta_ms, "ms",
+                      gate, relative)
+        # Aynı kareler aynı sonucu vermeli; fark davranış değişikliğidir
+        if (old['detections'], old['matches']) != (result['detections'], result['matches']):
+            print(f"    ❌ çıktı değişti: {old['detections']}/{old['matches']} -> "
+                  f"{result['detections']}/{result['matches']} (tespit/eşleştirme)")
+            regressions.append(f"{video}: tespit/eşleştirme sayısı değişti")
+    return regressions
+
+def benchmark_video(videos=None, frames: int = 300, warmup: int = 30, render: bool = True,
+                    report_path: Optional[str] = DEFAULT_REPORT, baseline_path: Optional[str] = None,
+                    save_baseline: bool = False, tolerance: float = 0.15, repeats: int = 3) -> bool:
+    """Videoları repeats kez ölçer (medyan), raporu yazar, taban varsa karşılaştırır (gerileme yoksa True;
+    taban farklı ayar veya makineden ise karşılaştırmadan False)"""
+    videos = list(videos or DEFAULT_VIDEOS)
+    print(f"🎬 Uçtan uca video ölçümü: {frames} kare (+{warmup} ısınma) x {repeats} tekrar (medyan), "
+          f"çizim {'açık' if render else 'kapalı'}, penceresiz")
+    
+    results = {}
+    for video in videos:
+        runs = [measure_video(video, frames, warmup, render)]
+        while len(runs) < repeats and 'error' not in runs[-1]:
+            runs.append(measure_video(video, frames, warmup, render))
+        result = median_result(runs)
+        results[video] = result
+        name = Path(video).name
+        if 'error' in result:
+            print(f"  ⚠️ {name}: {result['error']}")
+            continue
+        width, height = result['resolution']
+        short = f" (video {result['frames']} karede bitti)" if result['frames'] < frames else ""
+        print(f"  {name}: {width}x{height}, {result['frames']} kare{short}, {result['fps']:.1f} kare/s, "
+              f"CPU %{result['cpu_percent']:.0f} ({result['cpu_ms_per_frame']:.1f} ms/kare), "
+              f"tepe RSS {result['peak_rss_mb']:.0f} MB, {result['detections']} tespit / {result['matches']} eşleştirme")
+        if 'unstable_output' in result:
+            print(f"    ⚠️ tekrarlar farklı tespit/eşleştirme sayısı verdi: {result['unstable_output']}")
+        for stage, stats in result['latency_ms'].items():
+            if stats:
+                print(f"    {stage:<11} ort {stats['ort']:7.2f}  p50 {stats['p50']:7.2f}  p95 {stats['p95']:7.2f}  "
+                      f"p99 {stats['p99']:7.2f}  max {stats['max']:7.2f} ms")
+    
+    report = build_report(results, {'frames': frames, 'warmup': warmup, 'render': render, 'repeats': repeats})
+    if report_path:
+        _write_json(report_path, report)
+        print(f"📝 Rapor: {report_path}")
+    
+    if baseline_path is None:
+        return True
+    if save_baseline or not Path(baseline_path).exists():
+        _write_json(baseline_path, report)
+        print(f"📌 Taban kaydedildi: {baseline_path}")
+        return True
+    
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    reason = incomparable_reason(baseline, report)
+    if reason is not None:
+        print(f"❌ Tabanla karşılaştırılamaz: {reason}")
+        print("  Aynı ayarlarla çalıştırın veya tabanı yenileyin (--save-baseline)")
+        return False
+    print(f"📊 Tabanla karşılaştırma ({baseline_path}, tolerans %{tolerance * 100:g}, p95 için %{tolerance * 200:g})")
+    regressions = compare_reports(baseline, report, tolerance, tail_tolerance=2 * tolerance)
+    if regressions:
+        print(f"❌ {len(regressions)} gerileme:")
+        for line in regressions:
+            print(f"  - {line}")
+    else:
+        print("✅ Gerileme yok")
+    return not regressions
+
+if __name__ == "__main__":
+    import sys
+    print("🚢 Uçtan Uca Video Ölçümü")
+    print("=" * 40)
+    benchmark_video(sys.argv[1:] or None)
@@ -0,0 +1,195 @@
+"""
+Arka Planda Video Kaydı
+=======================
+run_video'nun çizilmiş karelerini kaydeder. Kodlama (cv2.VideoWriter) döngünün
+içinde değil, ayrı bir kodlayıcı iş parçacığında yapılır; döngü kareyi sınırlı
+bir kuyruğa bırakır ve devam eder. OpenCV kodlama sırasında GIL'i bıraktığı
+için iş parçacığı yeterlidir.
+
+Kodlayıcı geride kalıp kuyruk dolduğunda politika belirler:
+- drop: yeni kare atılır, döngü hiç beklemez (varsayılan)
+- block: döngü yer açılana kadar bekler (geri basınç, kare kaybı yok)
+
+Kuyruğa bırakılan kare kopyalanmaz; çağıran taraf kareyi sonra değiştirmemelidir.
+"""
+
+import queue
+import threading
+import time
+from typing import Optional, Tuple
+
+import cv2
+
+POLICIES = ('drop', 'block')
+
+class VideoRecorder:
+    """Sınırlı kuyruk ve kodlayıcı iş parçacığı ile video kaydedici"""
+    
+    def __init__(self, path: str, fps: Optional[float] = None, codec: str = 'mp4v', size: Optional[Tuple[int, int]] = None,
+                 max_pending: int = 32, policy: str = 'drop'):
+        if policy not in POLICIES:
+            raise ValueError(f"Bilinmeyen politika: {policy} ({', '.join(POLICIES)})")
+        self.path = str(path)
+        self.fps = fps  # None ise ilk kareye kadar run_video kaynak FPS'ini verir (yoksa 30)
+        self.codec = codec  # FourCC, ör. mp4v, XVID, MJPG
+        self.size = size  # (genişlik, yükseklik); None ise ilk karenin boyutu
+        self.policy = policy
+        
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._writer = None
+        self.submitted = 0  # Döngünün verdiği kare
+        self.written = 0  # Kodlanan kare
+        # Her sayacı tek iş parçacığı artırır (kilitsiz += yarışı olmasın); toplamı dropped verir
+        self.dropped_full = 0  # Döngü tarafında atılan kare (kuyruk dolu ya da kaydedici durmuş)
+        self.dropped_error = 0  # Kodlayıcı tarafında hata yüzünden atılan kare
+        self.blocked_time = 0.0  # block politikasında döngünün beklediği süre (s)
+        self.encode_time = 0.0  # Kodlayıcının kare başına harcadığı toplam süre (s)
+        self.error = None
+        
+        self._thread = threading.Thread(target=self._encode_loop, name="video-recorder", daemon=True)
+        self._thread.start()
+    
+    @property
+    def dropped(self) -> int:
+        """Atılan toplam kare"""
+        return self.dropped_full + self.dropped_error
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def write(self, frame) -> bool:
+        """Kareyi kodlama kuyruğuna bırakır; drop politikasında kuyruk doluysa False"""
+        self.submitted += 1
+        if self.error is not None:
+            self.dropped_full += 1
+            return False
+        if self.policy == 'drop':
+            try:
+                self._queue.put_nowait(frame)
+            except queue.Full:
+                self.dropped_full += 1
+                return False
+            return True
+        
+        start = time.perf_counter()
+        self._queue.put(frame)
+        self.blocked_time += time.perf_counter() - start
+        return True
+    
+    def _open(self, frame):
+        height, width = frame.shape[:2]
+        self.size = self.size or (width, height)
+        writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.codec), self.fps or 30.0, self.size)
+        if not writer.isOpened():
+            raise RuntimeError(f"Video yazıcı açılamadı: {self.path} ({self.codec})")
+        return writer
+    
+    def _encode_loop(self):
+        """Kodlayıcı iş parçacığı: gerekirse yeniden boyutlandırır ve yazar"""
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                break
+            if self.error is not None:
+                self.dropped_error += 1  # Yazıcı hata verdiyse kuyruk sadece boşaltılır
+                continue
+            try:
+                start = time.perf_counter()
+                if self._writer is None:
+                    self._writer = self._open(frame)
+                if (frame.shape[1], frame.shape[0]) != self.size:
+                    frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+                self._writer.write(frame)
+                self.encode_time += time.perf_counter() - start
+                self.written += 1
+            except Exception as e:
+                self.error = e
+                self.dropped_error += 1
+                print(f"⚠️ Video kaydı durdu: {e}")
+        if self._writer is not None:
+            self._writer.release()
+    
+    def close(self):
+        """Kuyruktaki kareleri kodlar ve dosyayı kapatır"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+    
+    def encoder_fps(self) -> float:
+        """Kodlayıcının kendi hızı (kare/s, sadece kodlama süresine göre)"""
+        return self.written / self.encode_time if self.encode_time > 0 else 0.0
+    
+    def report(self) -> str:
+        size = f"{self.size[0]}x{self.size[1]}" if self.size else "-"
+        text = (f"{self.written}/{self.submitted} kare yazıldı ({size}, {self.codec}), {self.dropped} atıldı, "
+                f"kodlayıcı {self.encoder_fps():.1f} kare/s")
+        if self.policy == 'block':
+            text += f", döngü {self.blocked_time * 1000:.0f} ms bekledi"
+        return text
+
+def benchmark_recorder(video_path="data/videos/4.mp4", max_frames: int = 200, codec: str = 'mp4v', output_dir=None):
+    """Kayıtsız, döngü içinde VideoWriter ve arka plan kaydedici (drop/block): işleme hızı ve kodlayıcı hızı"""
+    import os
+    import tempfile
+    from pathlib import Path
+    from simple_detector import SimpleDetector
+    
+    frames = []
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        print(f"⚠️ Video açılamadı: {video_path}")
+        return
+    
+    detector = SimpleDetector()
+    height, width = frames[0].shape[:2]
+    
+    def annotate(frame):
+        result = frame.copy()
+        for detection in detector.detect_ships_manual(frame):
+            x, y, w, h = detection.bbox
+            cv2.rectangle(result, (x, y), (x + w, y + h), (255, 0, 0), 2)
+        return result
+    
+    print(f"🎬 Video kaydı karşılaştırması: {video_path}, {len(frames)} kare ({width}x{height}, {codec})")
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(output_dir or tmp)
+        
+        start = time.perf_counter()
+        for frame in frames:
+            annotate(frame)
+        base_fps = len(frames) / (time.perf_counter() - start)
+        print(f"  {'kayıtsız':<22} {base_fps:7.1f} kare/s")
+        
+        writer = cv2.VideoWriter(str(out_dir / "inline.mp4"), cv2.VideoWriter_fourcc(*codec), fps, (width, height))
+        start = time.perf_counter()
+        for frame in frames:
+            writer.write(annotate(frame))
+        inline_fps = len(frames) / (time.perf_counter() - start)
+        writer.release()
+        print(f"  {'döngü içinde yazma':<22} {inline_fps:7.1f} kare/s")
+        
+        for policy in POLICIES:
+            path = out_dir / f"recorder_{policy}.mp4"
+            recorder = VideoRecorder(str(path), fps=fps, codec=codec, policy=policy)
+            start = time.perf_counter()
+            for frame in frames:
+                recorder.write(annotate(frame))
+            loop_fps = len(frames) / (time.perf_counter() - start)
+            recorder.close()
+            print(f"  {'arka plan (' + policy + ')':<22} {loop_fps:7.1f} kare/s  ({recorder.report()}, "
+                  f"{os.path.getsize(path) / 1e6:.1f} MB)")
+
+if __name__ == "__main__":
+    print("🚢 Arka Planda Video Kaydı")
+    print("=" * 40)
+    benchmark_recorder()